@@ -1,28 +1,79 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+import time
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
+from typing import Optional
+from uuid import UUID
 
 from app.schemas.claim import (
+    ClaimBatchCreateRequest,
+    ClaimBatchCreateResponse,
+    ClaimBatchResult,
     ClaimCreateRequest,
     ClaimCreateResponse,
+    ClaimLineResponse,
+    ClaimResponse,
 )
-from app.db.session import get_session
+from app.core.config import settings
+from app.core.metrics import observe_claim_stage
+from app.core.rate_limiter import ingest_limit, ingest_limit_disabled, limiter
+from app.db.session import SessionRunner, get_session, get_session_runner
+from app.repositories.claim_repo import ClaimRepository
+from app.repositories.claim_service_line_repo import ClaimServiceLineRepository
+from app.services.claim_export import EXPORT_FORMATS, stream_export
 from app.services.claim_service import ClaimService
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/claims", tags=["Claims"])
 
+def _create_claim(session: Session, payload: dict) -> UUID:
+    with session.begin():
+        service = ClaimService(session)
+        claim_id = service.process_claim(payload).id
+        commit_started = time.perf_counter()
+    observe_claim_stage("commit", time.perf_counter() - commit_started)
+    return claim_id
+
+
+def _create_claims_batch(session: Session, payloads: list[dict]) -> list[UUID | ValueError]:
+    with session.begin():
+        service = ClaimService(session)
+        outcomes = [
+            outcome if isinstance(outcome, ValueError) else outcome.id
+            for outcome in service.process_claims(payloads)
+        ]
+        commit_started = time.perf_counter()
+    observe_claim_stage("commit", time.perf_counter() - commit_started)
+    return outcomes
+
+
+def _get_claim(session: Session, claim_id: UUID) -> Optional[ClaimResponse]:
+    claim = ClaimRepository(session).get_by_id(claim_id)
+    if claim is None:
+        return None
+
+    lines = ClaimServiceLineRepository(session).get_by_claim_id(claim_id)
+    return ClaimResponse(
+        claim_id=claim.id,
+        claim_reference=claim.claim_reference,
+        created_at=claim.created_at,
+        lines=[ClaimLineResponse.model_validate(line, from_attributes=True) for line in lines],
+    )
+
+
 @router.post("/", response_model=ClaimCreateResponse)
-def create_claim(
-    request: ClaimCreateRequest,
-    session: Session = Depends(get_session),
+@limiter.limit(ingest_limit, exempt_when=ingest_limit_disabled)
+async def create_claim(
+    request: Request,
+    claim: ClaimCreateRequest,
+    db: SessionRunner = Depends(get_session_runner),
 ):
     try:
-        with session.begin():
-            service = ClaimService(session)
-            claim = service.process_claim(request.model_dump())
-        logger.info(f"Successfully processed claim {claim.id}")
-        return ClaimCreateResponse(claim_id=claim.id)
+        claim_id = await db.run(_create_claim, claim.model_dump())
+        logger.info(f"Successfully processed claim {claim_id}")
+        return ClaimCreateResponse(claim_id=claim_id)
     except ValueError as e:
         # validation errors
         logger.warning(f"Validation error: {str(e)}")
@@ -33,3 +84,107 @@ def create_claim(
             status_code=500,
             detail="Failed to process claim",
         )
+
+
+@router.post("/batch", response_model=ClaimBatchCreateResponse)
+@limiter.limit(ingest_limit, exempt_when=ingest_limit_disabled)
+async def create_claims_batch(
+    request: Request,
+    batch: ClaimBatchCreateRequest,
+    db: SessionRunner = Depends(get_session_runner),
+):
+    """
+    Ingests many claims in one transaction.
+
+    Claims failing validation are reported per index and skipped; the
+    remaining claims are committed together.
+    """
+    try:
+        outcomes = await db.run(
+            _create_claims_batch,
+            [claim.model_dump() for claim in batch.claims],
+        )
+    except Exception as e:
+        logger.exception(f"Failed to process claim batch: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to process claim batch",
+        )
+
+    results = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, ValueError):
+            results.append(ClaimBatchResult(index=index, error=str(outcome)))
+        else:
+            results.append(ClaimBatchResult(index=index, claim_id=outcome))
+
+    failed = sum(1 for result in results if result.error is not None)
+    logger.info(
+        f"Processed claim batch: {len(results) - failed} succeeded, {failed} failed"
+    )
+    return ClaimBatchCreateResponse(
+        processed=len(results) - failed,
+        failed=failed,
+        results=results,
+    )
+
+
+# Declared before /{claim_id} so "export" is not parsed as a claim id
+@router.get("/export")
+def export_claim_lines(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    session: Session = Depends(get_session),
+):
+    """
+    Streams every claim line (optionally within inclusive service dates)
+    as NDJSON or CSV, ordered by line id.
+
+    Rows come from a server-side cursor in batches of `export_batch_size`
+    and are written out as they arrive, so memory stays flat however many
+    rows are exported.
+
+    Unlike the other claim routes this one does not go through
+    SessionRunner, and stays on the sync engine in async mode too. The
+    cursor has to stay open across every chunk of the response, long after
+    the route returns, while SessionRunner.run (and AsyncSession.run_sync)
+    only lends a connection for the duration of one call. StreamingResponse
+    pulls each batch from this sync generator on the threadpool, so the
+    event loop never waits on the database; the session dependency only
+    provides the engine (which tests override).
+    """
+    if from_date is not None and to_date is not None and from_date > to_date:
+        raise HTTPException(status_code=422, detail="from must not be after to")
+
+    media_type, _ = EXPORT_FORMATS[format]
+    # The stream opens its own connection: the request session is closed
+    # before the response body is sent
+    body = stream_export(
+        session.get_bind(),
+        format,
+        settings.export_batch_size,
+        from_date,
+        to_date,
+    )
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="claim_lines.{format}"'},
+    )
+
+
+@router.get("/{claim_id}", response_model=ClaimResponse)
+async def get_claim(
+    claim_id: UUID,
+    db: SessionRunner = Depends(get_session_runner),
+):
+    """
+    Returns a claim and its service lines.
+
+    One primary key lookup on claims and one seek on ix_claim_lines_claim_id.
+    """
+    claim = await db.run(_get_claim, claim_id)
+    if claim is None:
+        raise HTTPException(status_code=404, detail="Claim not found")
+    return claim
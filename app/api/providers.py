@@ -1,24 +1,110 @@
-from fastapi import APIRouter, Depends, Request
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from datetime import date, datetime, time, timedelta
+from sqlmodel import Session
+from typing import Optional
 
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from app.core.rate_limiter import limiter
+from app.core.rate_limiter import limiter, read_limit
 from app.core.config import settings
-from app.db.session import get_session
-from app.models.provider_aggregate import ProviderNetFeeAggregate
-from app.schemas.provider import TopProviderResponse
+from app.db.session import SessionRunner, get_session_runner
+from app.repositories.claim_service_line_repo import ClaimServiceLineRepository
+from app.repositories.provider_aggregate_repo import ProviderAggregateRepository
+from app.schemas.provider import ProviderLineResponse, TopProviderResponse
+from app.services.leaderboard_cache import leaderboard_cache
 
 router = APIRouter(prefix="/providers", tags=["Providers"])
 
 
+def _top_providers(
+    session: Session,
+    limit: int,
+    after_total: Optional[int] = None,
+    after_npi: Optional[str] = None,
+) -> list[TopProviderResponse]:
+    repo = ProviderAggregateRepository(session)
+    results = repo.get_top(limit, after_total, after_npi)
+
+    return [
+        TopProviderResponse(
+            provider_npi=provider_npi,
+            total_net_fee_cents=total_net_fee_cents,
+        )
+        for provider_npi, total_net_fee_cents in results
+    ]
+
+
+def _top_providers_in_window(
+    session: Session,
+    limit: int,
+    from_date: Optional[date],
+    to_date: Optional[date],
+    after_total: Optional[int] = None,
+    after_npi: Optional[str] = None,
+) -> list[TopProviderResponse]:
+    repo = ProviderAggregateRepository(session)
+    results = repo.get_top_in_window(limit, from_date, to_date, after_total, after_npi)
+
+    return [
+        TopProviderResponse(
+            provider_npi=provider_npi,
+            total_net_fee_cents=total_net_fee_cents,
+        )
+        for provider_npi, total_net_fee_cents in results
+    ]
+
+
+def _provider_lines(
+    session: Session,
+    provider_npi: str,
+    limit: int,
+    from_date: Optional[date],
+    to_date: Optional[date],
+    after_service_date: Optional[datetime],
+    after_id: Optional[int],
+) -> list[ProviderLineResponse]:
+    repo = ClaimServiceLineRepository(session)
+    results = repo.get_for_provider(
+        provider_npi,
+        limit,
+        from_time=datetime.combine(from_date, time.min) if from_date else None,
+        # `to` is an inclusive date; the repository bound is exclusive
+        to_time=datetime.combine(to_date + timedelta(days=1), time.min) if to_date else None,
+        after_service_date=after_service_date,
+        after_id=after_id,
+    )
+
+    return [
+        ProviderLineResponse(
+            id=line_id,
+            claim_id=claim_id,
+            service_date=service_date,
+            submitted_procedure=submitted_procedure,
+            net_fee_cents=net_fee_cents,
+        )
+        for line_id, claim_id, service_date, submitted_procedure, net_fee_cents in results
+    ]
+
+
 @router.get(
     "/top",
     response_model=list[TopProviderResponse],
-    summary="Get top 10 providers by net fees",
+    summary="Get top providers by net fees",
     description="""
-    Returns the top 10 provider NPIs ranked by total net fees generated.
+    Returns provider NPIs ranked by total net fees generated (top 10 by default).
+
+    ### Paging
+
+    `limit` sets the page size (up to `top_providers_max_limit`). To fetch the
+    next page, pass the last row's `total_net_fee_cents` and `provider_npi` as
+    `after_total` and `after_npi`. Ties are ordered by `provider_npi`.
+
+    ### Time Windows
+
+    `from` and `to` (inclusive service dates) restrict the ranking to net fees
+    for lines serviced in that window. Either bound may be omitted. Windowed
+    rankings sum the per-day `provider_net_fee_daily` buckets.
 
     ### Implementation Overview
 
@@ -29,8 +115,12 @@ router = APIRouter(prefix="/providers", tags=["Providers"])
     ### Performance Characteristics
 
     - **Write Path**: O(1) per claim line (indexed upsert by provider_npi)
-    - **Read Path**: O(P log P), where P is the number of unique providers
+    - **Read Path**: O(limit) per page via keyset seek on the
+      `(total_net_fee_cents DESC, provider_npi)` index, at any depth
     - Avoids expensive runtime aggregation over claim lines
+    - The first `leaderboard_cache_size` rows are cached in-process for
+      `leaderboard_cache_ttl_seconds` and invalidated as soon as this process
+      commits new aggregate deltas
 
     ### Consistency & Concurrency
 
@@ -42,31 +132,99 @@ router = APIRouter(prefix="/providers", tags=["Providers"])
     This endpoint is rate-limited to prevent abuse and ensure predictable performance.
     """,
 )
-@limiter.limit(f"{settings.rate_limit_per_minute}/minute")
-def top_providers(
+@limiter.limit(read_limit)
+async def top_providers(
     request: Request, 
-    session: Session = Depends(get_session),
+    limit: int = Query(10, ge=1, le=settings.top_providers_max_limit),
+    after_total: Optional[int] = None,
+    after_npi: Optional[str] = None,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    db: SessionRunner = Depends(get_session_runner),
 ):
     """
-    Returns the top 10 provider NPIs by total net fees.
+    Returns provider NPIs by total net fees, one keyset page at a time.
     
     The implementation uses a pre-aggregated table that is updated
-    incrementally during claim processing, allowing for O(P log P) query
-    performance where P is the number of providers (typically much smaller
-    than the number of claim lines).
+    incrementally during claim processing, and a composite ranking index so
+    each page costs O(limit) regardless of how deep the client pages.
     """
-    stmt = (
-        select(ProviderNetFeeAggregate)
-        .order_by(ProviderNetFeeAggregate.total_net_fee_cents.desc())
-        .limit(10)
-    )
+    if (after_total is None) != (after_npi is None):
+        raise HTTPException(
+            status_code=422,
+            detail="after_total and after_npi must be provided together",
+        )
 
-    results = session.exec(stmt).all()
+    if from_date is not None or to_date is not None:
+        if from_date is not None and to_date is not None and from_date > to_date:
+            raise HTTPException(status_code=422, detail="from must not be after to")
+        return await db.run(
+            _top_providers_in_window,
+            limit,
+            from_date,
+            to_date,
+            after_total,
+            after_npi,
+        )
 
-    return [
-        TopProviderResponse(
-            provider_npi=row.provider_npi,
-            total_net_fee_cents=row.total_net_fee_cents,
+    if after_total is not None or limit > settings.leaderboard_cache_size:
+        return await db.run(_top_providers, limit, after_total, after_npi)
+
+    cached = leaderboard_cache.get()
+    if cached is None:
+        generation = leaderboard_cache.generation
+        cached = await db.run(_top_providers, settings.leaderboard_cache_size)
+        leaderboard_cache.set(cached, generation)
+    return cached[:limit]
+
+
+@router.get(
+    "/{provider_npi}/lines",
+    response_model=list[ProviderLineResponse],
+    summary="List a provider's claim lines",
+    description="""
+    Returns a provider's claim lines, newest service date first.
+
+    ### Paging
+
+    `limit` sets the page size (up to `provider_lines_max_limit`). To fetch the
+    next page, pass the last row's `service_date` and `id` as
+    `after_service_date` and `after_id`.
+
+    ### Time Windows
+
+    `from` and `to` are inclusive service dates; either may be omitted.
+
+    ### Performance Characteristics
+
+    Served by the `(provider_npi, service_date, id)` index, which includes
+    every returned column, so each page is an index-only range scan of
+    `limit` entries at any depth.
+    """,
+)
+async def provider_lines(
+    provider_npi: str,
+    limit: int = Query(100, ge=1, le=settings.provider_lines_max_limit),
+    after_service_date: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    db: SessionRunner = Depends(get_session_runner),
+):
+    if (after_service_date is None) != (after_id is None):
+        raise HTTPException(
+            status_code=422,
+            detail="after_service_date and after_id must be provided together",
         )
-        for row in results
-    ]
+    if from_date is not None and to_date is not None and from_date > to_date:
+        raise HTTPException(status_code=422, detail="from must not be after to")
+
+    return await db.run(
+        _provider_lines,
+        provider_npi,
+        limit,
+        from_date,
+        to_date,
+        after_service_date,
+        after_id,
+    )
@@ -0,0 +1,108 @@
+"""
+Backfill historical claims with PostgreSQL COPY.
+
+Usage:
+    python -m app.cli.backfill claims.csv
+    python -m app.cli.backfill claims.jsonl --format jsonl --errors rejected.jsonl
+    cat claims.csv | python -m app.cli.backfill -
+    python -m app.cli.backfill --rebuild-only
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services.backfill import READERS, ClaimBackfillLoader
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", nargs="?", help="Input file, or '-' for stdin")
+    parser.add_argument(
+        "--format",
+        choices=sorted(READERS),
+        help="Input format (defaults to the file extension)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=settings.backfill_chunk_size)
+    parser.add_argument("--errors", help="Write rejected claims as JSONL to this file")
+    rebuild = parser.add_mutually_exclusive_group()
+    rebuild.add_argument(
+        "--skip-aggregate-rebuild",
+        action="store_true",
+        help="Do not rebuild provider_net_fee_aggregate after loading",
+    )
+    rebuild.add_argument(
+        "--rebuild-only",
+        action="store_true",
+        help="Load nothing; rebuild the all-time and daily provider aggregates from claim_lines",
+    )
+    args = parser.parse_args(argv)
+    if args.path is None and not args.rebuild_only:
+        parser.error("path is required unless --rebuild-only is given")
+    return args
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper(), logging.INFO),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    args = parse_args(argv)
+
+    if "postgresql" not in str(engine.url):
+        logger.error("COPY backfill requires a PostgreSQL DATABASE_URL")
+        return 2
+
+    if args.rebuild_only:
+        raw = engine.raw_connection()
+        try:
+            rebuilt = ClaimBackfillLoader(raw.driver_connection, args.chunk_size).rebuild_aggregates()
+        finally:
+            raw.close()
+        logger.info(f"Rebuilt {rebuilt} provider aggregates")
+        return 0
+
+    fmt = args.format or args.path.rsplit(".", 1)[-1].lower()
+    if fmt not in READERS:
+        logger.error(f"Cannot infer input format from {args.path}; pass --format")
+        return 2
+
+    stream = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+    errors = open(args.errors, "w", encoding="utf-8") if args.errors else None
+
+    def on_error(index: int, message: str) -> None:
+        logger.warning(f"Rejected claim #{index}: {message}")
+        if errors is not None:
+            errors.write(json.dumps({"index": index, "error": message}) + "\n")
+
+    raw = engine.raw_connection()
+    try:
+        loader = ClaimBackfillLoader(raw.driver_connection, args.chunk_size)
+        started = time.perf_counter()
+        stats = loader.load(READERS[fmt](stream), on_error=on_error)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Loaded {stats.claims_loaded} claims / {stats.lines_loaded} lines "
+            f"in {stats.chunks} chunks ({stats.lines_loaded / max(elapsed, 1e-9):.0f} lines/s), "
+            f"rejected {stats.claims_rejected} claims"
+        )
+        if not args.skip_aggregate_rebuild:
+            stats.aggregates_rebuilt = loader.rebuild_aggregates()
+            logger.info(f"Rebuilt {stats.aggregates_rebuilt} provider aggregates")
+    finally:
+        raw.close()
+        if stream is not sys.stdin:
+            stream.close()
+        if errors is not None:
+            errors.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
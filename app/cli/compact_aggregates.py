@@ -0,0 +1,53 @@
+"""
+Fold sharded provider aggregate rows back into provider_net_fee_aggregate.
+
+Only needed when AGGREGATE_SHARD_COUNT > 1. Run it from cron, or keep it
+running with --interval.
+
+Usage:
+    python -m app.cli.compact_aggregates
+    python -m app.cli.compact_aggregates --interval 60
+"""
+import argparse
+import logging
+import sys
+import time
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.session import engine
+from app.repositories.provider_aggregate_repo import ProviderAggregateRepository
+
+logger = logging.getLogger(__name__)
+
+
+def compact_once() -> int:
+    with Session(engine) as session:
+        with session.begin():
+            return ProviderAggregateRepository(session).fold_shards()
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper(), logging.INFO),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--interval",
+        type=float,
+        help="Repeat every N seconds instead of running once",
+    )
+    args = parser.parse_args(argv)
+
+    while True:
+        folded = compact_once()
+        logger.info(f"Folded shard rows for {folded} providers")
+        if not args.interval:
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Export claim_lines as NDJSON or CSV with a server-side cursor.
+
+Usage:
+    python -m app.cli.export_claims --output claim_lines.ndjson
+    python -m app.cli.export_claims --format csv --from 2024-01-01 --to 2024-01-31 > january.csv
+"""
+import argparse
+import logging
+import sys
+import time
+from datetime import date
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services.claim_export import EXPORT_FORMATS, stream_export
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("--output", default="-", help="Output file, or '-' for stdout")
+    parser.add_argument(
+        "--from",
+        dest="from_date",
+        type=date.fromisoformat,
+        help="First service date to include (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_date",
+        type=date.fromisoformat,
+        help="Last service date to include (YYYY-MM-DD)",
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.export_batch_size)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper(), logging.INFO),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        # stdout may carry the export itself
+        stream=sys.stderr,
+    )
+    args = parse_args(argv)
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        started = time.perf_counter()
+        size = 0
+        for chunk in stream_export(engine, args.format, args.batch_size, args.from_date, args.to_date):
+            output.write(chunk)
+            size += len(chunk)
+        logger.info(f"Exported {size} characters in {time.perf_counter() - started:.1f}s")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Publish transactional outbox events to the payments sink.
+
+Runs outbox_concurrency worker threads, each claiming batches of
+outbox_batch_size events with FOR UPDATE SKIP LOCKED. Stop with
+SIGINT/SIGTERM; in-flight batches finish before exit.
+
+Usage:
+    python -m app.cli.outbox_worker
+    python -m app.cli.outbox_worker --concurrency 8 --batch-size 500
+"""
+import argparse
+import logging
+import signal
+import sys
+import threading
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services.payments_integration import (
+    OutboxProcessor,
+    PaymentsPublisher,
+    build_sink,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper(), logging.INFO),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=settings.outbox_concurrency)
+    parser.add_argument("--batch-size", type=int, default=settings.outbox_batch_size)
+    args = parser.parse_args(argv)
+
+    try:
+        sink = build_sink(settings.outbox_sink, settings.outbox_file_path)
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+
+    processor = OutboxProcessor(
+        session_factory=lambda: Session(engine),
+        publisher=PaymentsPublisher(sink),
+        batch_size=args.batch_size,
+        max_attempts=settings.outbox_max_attempts,
+        backoff_base_seconds=settings.outbox_backoff_base_seconds,
+        backoff_max_seconds=settings.outbox_backoff_max_seconds,
+    )
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    workers = [
+        threading.Thread(
+            target=processor.run,
+            args=(stop, settings.outbox_poll_interval_seconds),
+            name=f"outbox-worker-{i}",
+        )
+        for i in range(args.concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    logger.info(f"Started {len(workers)} outbox workers")
+
+    for worker in workers:
+        worker.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
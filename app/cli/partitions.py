@@ -0,0 +1,76 @@
+"""
+Create upcoming claim_lines partitions or detach old ones.
+
+Only applies when claim_lines was created with CLAIM_LINES_PARTITIONED=true.
+Run `ensure` from cron (e.g. daily) so next month's partition always exists
+before the first line for it arrives.
+
+Usage:
+    python -m app.cli.partitions ensure
+    python -m app.cli.partitions ensure --months-ahead 6
+    python -m app.cli.partitions detach --before 2022-01-01
+"""
+import argparse
+import logging
+import sys
+from datetime import date
+
+from app.core.config import settings
+from app.db.partitions import (
+    detach_claim_line_partitions,
+    ensure_claim_line_partitions,
+)
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper(), logging.INFO),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ensure = commands.add_parser("ensure", help="Create missing monthly partitions")
+    ensure.add_argument(
+        "--months-ahead",
+        type=int,
+        default=settings.claim_lines_partition_months_ahead,
+    )
+    ensure.add_argument(
+        "--months-back",
+        type=int,
+        default=settings.claim_lines_partition_months_back,
+    )
+
+    detach = commands.add_parser("detach", help="Detach partitions for old months")
+    detach.add_argument(
+        "--before",
+        type=date.fromisoformat,
+        required=True,
+        help="Detach partitions whose month ends on or before this date (YYYY-MM-DD)",
+    )
+    args = parser.parse_args(argv)
+
+    if engine.dialect.name != "postgresql":
+        logger.error("claim_lines partitioning requires PostgreSQL")
+        return 1
+
+    with engine.begin() as conn:
+        if args.command == "ensure":
+            try:
+                names = ensure_claim_line_partitions(conn, args.months_back, args.months_ahead)
+            except ValueError as e:
+                logger.error(f"{e}; it was created before CLAIM_LINES_PARTITIONED was enabled")
+                return 1
+            logger.info(f"Created {len(names)} partitions: {', '.join(names) or '-'}")
+        else:
+            names = detach_claim_line_partitions(conn, args.before)
+            logger.info(f"Detached {len(names)} partitions: {', '.join(names) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Check provider_net_fee_aggregate against claim_lines and repair drift.
+
+Safe to run online (e.g. nightly from cron): reads are lock-free snapshot
+reads over NPI-range chunks, and only mismatched aggregate rows are
+updated, each chunk in its own short transaction. Exits with status 1
+when drift was found, so schedulers can alert on it.
+
+Usage:
+    python -m app.cli.reconcile_aggregates
+    python -m app.cli.reconcile_aggregates --dry-run --chunk-size 5000
+"""
+import argparse
+import logging
+import sys
+import time
+from dataclasses import asdict
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services.aggregate_reconciler import reconcile_aggregates
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper(), logging.INFO),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.reconcile_chunk_size,
+        help="Providers per chunk",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report drift without patching aggregates",
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        stats = reconcile_aggregates(session, args.chunk_size, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - started
+
+    logger.info(
+        f"Checked {stats.providers_checked} providers in {stats.chunks} chunks "
+        f"({elapsed:.1f}s): {' '.join(f'{k}={v}' for k, v in asdict(stats).items())}"
+    )
+    return 1 if stats.mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
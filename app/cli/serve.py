@@ -0,0 +1,93 @@
+"""
+Serve the API with several uvicorn worker processes.
+
+Runs WEB_WORKERS processes (0 = one per core). Each worker sizes its
+connection pool from DATABASE_CONNECTION_BUDGET divided by the worker
+count, so adding workers never exceeds the budget. The schema is created
+once here, before the workers start, rather than by all of them at once.
+
+Usage:
+    python -m app.cli.serve
+    python -m app.cli.serve --workers 8 --port 8000
+"""
+import argparse
+import logging
+import os
+import sys
+
+import uvicorn
+from prometheus_client import multiprocess
+
+# Imported for its side effect: registers every model, so init_db below
+# creates all tables before the workers start
+import app.main  # noqa: F401
+from app.core.config import settings
+from app.core.metrics import MULTIPROC_DIR_ENV
+from app.db.init_db import init_db
+from app.db.session import ENGINES_PER_WORKER, engine, pool_options, worker_count
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper(), logging.INFO),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.web_workers,
+        help="Worker processes (0 = one per core)",
+    )
+    parser.add_argument("--host", default=settings.web_host)
+    parser.add_argument("--port", type=int, default=settings.web_port)
+    args = parser.parse_args(argv)
+
+    settings.web_workers = args.workers
+    workers = worker_count()
+    # Workers read their settings from the environment
+    os.environ["WEB_WORKERS"] = str(workers)
+
+    try:
+        pool = pool_options(ENGINES_PER_WORKER)
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+    logger.info(
+        f"Starting {workers} workers; per worker and engine: "
+        f"{pool.get('pool_size', 'no pool')} connections, "
+        f"overflow {pool.get('max_overflow', 0)}"
+    )
+
+    multiproc_dir = os.environ.get(MULTIPROC_DIR_ENV)
+    if multiproc_dir:
+        # Series left by a previous run would be summed into this one
+        for name in os.listdir(multiproc_dir):
+            if name.endswith(".db"):
+                os.remove(os.path.join(multiproc_dir, name))
+    elif workers > 1:
+        logger.warning(
+            f"{MULTIPROC_DIR_ENV} is not set: /metrics only reports the worker serving each scrape"
+        )
+
+    init_db()
+    # Workers must not inherit the launcher's connections, nor redo init_db
+    engine.dispose()
+    os.environ["SKIP_INIT_DB"] = "1"
+    if multiproc_dir:
+        # The launcher's own pool gauges must not count towards the workers'
+        multiprocess.mark_process_dead(os.getpid())
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        log_level=settings.log_level.lower(),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -18,9 +20,116 @@ class Settings(BaseSettings):
     database_url: str = (
         "postgresql+psycopg://postgres:postgres@db:5432/claims"
     )
+    # Serve requests through create_async_engine instead of the threadpool
+    database_async: bool = False
+    # Defaults to database_url; psycopg URLs work for both engines
+    async_database_url: Optional[str] = None
+    # Connections per worker process, used when no budget is set
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    # Total connections all web workers may hold together. When set, each
+    # worker's pool is sized to budget // web_workers (split between the
+    # sync and async engines) with no overflow, so scaling workers never
+    # exceeds it. Leave headroom below max_connections for CLIs and admin
+    database_connection_budget: Optional[int] = None
+    # "null" opens a connection per checkout (NullPool), for running behind
+    # PgBouncer, which does the pooling
+    database_pool: Literal["queue", "null"] = "queue"
+    # psycopg prepares statements server-side after repeated use; turn off
+    # behind PgBouncer in transaction mode, where those break
+    database_prepared_statements: bool = True
+
+    # Serving (python -m app.cli.serve): worker processes, 0 = one per core
+    web_workers: int = 1
+    web_host: str = "0.0.0.0"
+    web_port: int = 8000
+    # Set by the launcher, which creates the schema once before forking;
+    # workers then skip init_db at startup
+    skip_init_db: bool = False
+
+    # Claim ingestion
+    # "uuid7" ids are time ordered, keeping claims / claim_lines index
+    # inserts on the rightmost B-tree pages; "uuid4" ids are fully random
+    claim_id_strategy: Literal["uuid4", "uuid7"] = "uuid7"
+    claim_batch_max_size: int = 1000
+    backfill_chunk_size: int = 50_000
+    # Amounts with digits past the cent: "reject" (400), or round with
+    # "half_up", "half_even" or "truncate"
+    money_rounding: Literal["reject", "half_up", "half_even", "truncate"] = "reject"
+    # "numpy" computes net fees and per-provider sums on int64 arrays for
+    # inputs of at least net_fee_numpy_min_lines lines (batches, large claims)
+    net_fee_engine: Literal["python", "numpy"] = "python"
+    net_fee_numpy_min_lines: int = 1000
+    # Rows fetched per server-side cursor round trip by the claim_lines export
+    export_batch_size: int = 10_000
+    # Treat claim_reference as an idempotency key: replays return the
+    # original claim_id (init_db adds a unique index on claim_reference)
+    claim_idempotency_enabled: bool = False
+    # PostgreSQL only: partition claim_lines by month of service_date.
+    # Applies when init_db creates the table; an existing table is kept
+    claim_lines_partitioned: bool = False
+    # Monthly partitions kept ahead of / behind the current month
+    claim_lines_partition_months_ahead: int = 3
+    claim_lines_partition_months_back: int = 12
+
+    # Provider aggregates: spread each provider's increments over this many
+    # sub-rows to avoid hot-row lock contention (1 disables sharding)
+    aggregate_shard_count: int = 1
+    # "sync" updates aggregates inside each claim transaction; "ledger" appends
+    # to provider_fee_delta and a background flusher folds it periodically
+    aggregate_write_mode: Literal["sync", "ledger"] = "sync"
+    # Upper bound on leaderboard staleness in ledger mode
+    aggregate_flush_interval_seconds: float = 5.0
+    aggregate_flush_batch_size: int = 10_000
+    # Providers per chunk in the aggregate drift check (reconcile_aggregates)
+    reconcile_chunk_size: int = 1000
+
+    # Transactional outbox (payments notifications). Off by default: every
+    # claim then writes no event. The worker only publishes to a sink that
+    # is configured explicitly
+    outbox_enabled: bool = False
+    outbox_sink: Optional[Literal["memory", "file"]] = None
+    outbox_file_path: str = "outbox_events.jsonl"
+    outbox_batch_size: int = 100
+    outbox_concurrency: int = 4
+    outbox_poll_interval_seconds: float = 1.0
+    outbox_max_attempts: int = 10
+    outbox_backoff_base_seconds: float = 1.0
+    outbox_backoff_max_seconds: float = 300.0
+
+    # Top providers ranking
+    top_providers_max_limit: int = 1000
+
+    # Page size cap for GET /providers/{npi}/lines
+    provider_lines_max_limit: int = 1000
+
+    # Top providers leaderboard cache (max staleness; 0 disables caching)
+    leaderboard_cache_ttl_seconds: float = 5.0
+    # Number of leading rows cached; first pages up to this size are served from it
+    leaderboard_cache_size: int = 100
 
     # Rate limiting
+    # Read budget per client for GET /providers/top
     rate_limit_per_minute: int = 10
+    # Ingest budget per client for POST /claims/ and /claims/batch
+    # (0 disables it)
+    rate_limit_ingest_per_minute: int = 0
+    # "memory://" counts per process. Shared across workers and instances:
+    # "database://" (rate_limit_counters table in this database) or
+    # "redis://host:6379" (needs the redis package)
+    rate_limit_storage_uri: str = "memory://"
+    # "fixed-window" or "sliding-window-counter"
+    rate_limit_strategy: Literal["fixed-window", "sliding-window-counter"] = "fixed-window"
+    # database:// only: how often local hits are written and shared counts
+    # re-read (bounds overshoot across workers; 0 writes every hit through,
+    # a blocking round trip on the event loop of async routes)
+    rate_limit_sync_interval_seconds: float = 0.1
+
+    # Per-request SQL statement counts, DB time and rows as X-DB-* response
+    # headers, and N+1 warnings (see app/db/query_stats.py)
+    query_stats_enabled: bool = False
+    # Executions of one statement in a request that log a possible N+1
+    query_stats_repeat_threshold: int = 10
 
     # Logging
     log_level: str = "INFO"
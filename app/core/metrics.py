@@ -0,0 +1,214 @@
+"""
+Prometheus metrics, served at GET /metrics.
+
+- http_request_duration_seconds: latency per method, route template and
+  status, recorded by RequestMetricsMiddleware.
+- claim_stage_duration_seconds: time per stage of claim ingestion
+  (validation, money parsing, net fees, inserts, aggregate upsert,
+  outbox, commit). Batches record each claim's validation stages and the
+  batch's write stages once.
+- db_pool_checkout_wait_seconds and db_pool_* gauges: time to get a
+  connection from the pool (including opening one), and pool occupancy.
+- rate_limit_rejections_total: 429s per route.
+- leaderboard_cache_lookups_total and
+  leaderboard_cache_invalidations_total: hits and misses of the
+  /providers/top cache, and how often commits dropped its entry.
+
+With several worker processes, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory shared by the workers so a scrape of any worker reports all of
+them; python -m app.cli.serve clears it on start.
+"""
+import os
+import time
+from typing import Callable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Sub-millisecond resolution: most stages and pool waits are well below 1 ms
+FAST_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+REQUEST_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=REQUEST_BUCKETS,
+)
+
+CLAIM_STAGES = (
+    "validation",
+    "money_parsing",
+    "net_fees",
+    "claim_insert",
+    "line_insert",
+    "aggregate_upsert",
+    "outbox",
+    "commit",
+)
+CLAIM_STAGE_LATENCY = Histogram(
+    "claim_stage_duration_seconds",
+    "Time spent in each stage of claim ingestion",
+    ["stage"],
+    buckets=FAST_BUCKETS,
+)
+# Resolved once: labels() costs a lock and a dict lookup per call
+_STAGE_HISTOGRAMS = {stage: CLAIM_STAGE_LATENCY.labels(stage) for stage in CLAIM_STAGES}
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the pool, including opening one",
+    ["engine"],
+    buckets=FAST_BUCKETS,
+)
+POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured pool size",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond the pool size (negative: pool not yet full)",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections",
+    "Requests rejected by the rate limiter",
+    ["route"],
+)
+
+
+LEADERBOARD_CACHE_LOOKUPS = Counter(
+    "leaderboard_cache_lookups",
+    "Top providers cache lookups by result",
+    ["result"],
+)
+LEADERBOARD_CACHE_HITS = LEADERBOARD_CACHE_LOOKUPS.labels("hit")
+LEADERBOARD_CACHE_MISSES = LEADERBOARD_CACHE_LOOKUPS.labels("miss")
+LEADERBOARD_CACHE_INVALIDATIONS = Counter(
+    "leaderboard_cache_invalidations",
+    "Top providers cache entries dropped by committed aggregate writes",
+)
+
+
+def time_claim_stage(stage: str):
+    """Context manager recording the duration of one claim ingestion stage."""
+    return _STAGE_HISTOGRAMS[stage].time()
+
+
+def observe_claim_stage(stage: str, seconds: float) -> None:
+    _STAGE_HISTOGRAMS[stage].observe(seconds)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records checkout waits and occupancy."""
+
+    engine_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.labels(self.engine_label).observe(time.perf_counter() - started)
+            self._record_occupancy()
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self._record_occupancy()
+
+    def _record_occupancy(self) -> None:
+        POOL_SIZE.labels(self.engine_label).set(self.size())
+        POOL_CHECKED_OUT.labels(self.engine_label).set(self.checkedout())
+        POOL_OVERFLOW.labels(self.engine_label).set(self.overflow())
+
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+_route_templates: dict[Callable, str] = {}
+
+
+def route_label(scope: dict) -> str:
+    """
+    The matched route's path template (e.g. /claims/{claim_id}), so labels
+    do not grow with ids in paths; "unmatched" when no route matched.
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    template = _route_templates.get(endpoint)
+    if template is None:
+        for route in scope["app"].routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                template = route.path
+                break
+        else:
+            template = "unmatched"
+        _route_templates[endpoint] = template
+    return template
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware timing each HTTP request to its last body byte."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_LATENCY.labels(
+                scope["method"], route_label(scope), str(status)
+            ).observe(time.perf_counter() - started)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Returns (exposition body, content type) for a scrape."""
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
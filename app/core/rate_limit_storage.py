@@ -0,0 +1,376 @@
+"""
+A `limits` storage backend that shares counters through the database.
+
+Registered as the "database://" scheme, so RATE_LIMIT_STORAGE_URI=database://
+makes every worker and instance count against the same rate_limit_counters
+rows (in the application database) instead of a per-process dict.
+
+Writing every hit through would put a database round trip on every
+limited request. Instead each process keeps a local view of every window:
+the shared count as of the last sync, plus hits it has not written yet.
+Requests are decided from that view in memory. A background thread writes
+all pending hits in one multi-row upsert every `sync_interval` seconds and
+reads back the shared counts. A window is synced inline only when the
+process first sees it, or when its view is older than `sync_interval`.
+So hot keys cost no round trip, and other workers' hits become visible
+within one interval. Clients can overshoot a limit by at most the hits
+other processes accept during one interval. sync_interval=0 writes every
+hit through.
+
+Inline syncs are blocking database calls on the thread that checks the
+limit. For async routes slowapi checks limits on the event loop, so each
+inline sync stalls that worker's loop for one round trip: once per key
+and interval with the default sync_interval, but on every hit with
+sync_interval=0, which should therefore only back sync routes.
+
+Local state stays bounded: expired windows are dropped at each flush (and
+by purges when there is no flusher), and keys share a fixed set of lock
+stripes rather than a lock each.
+
+Supports the fixed-window and sliding-window-counter strategies.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from math import floor
+from typing import Callable, Optional
+
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+from sqlalchemy import case, delete, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models.rate_limit_counter import RateLimitCounter
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = RateLimitCounter.__table__
+
+# Expired rows are deleted at most this often, by the flusher thread (or
+# by incr when there is none)
+PURGE_INTERVAL_SECONDS = 60.0
+
+# Keys map onto this many locks
+LOCK_STRIPES = 64
+
+
+@dataclass
+class _Window:
+    # Shared count at the last sync (including this process's synced hits)
+    count: int
+    expires_at: float
+    expiry: int
+    synced_at: float
+    # Hits accepted locally and not yet written
+    pending: int = 0
+
+
+class DatabaseStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    STORAGE_SCHEME = ["database"]
+
+    def __init__(
+        self,
+        uri: Optional[str] = None,
+        wrap_exceptions: bool = False,
+        engine: Optional[Engine] = None,
+        sync_interval: float = 0.1,
+        clock: Callable[[], float] = time.time,
+        **options,
+    ):
+        if engine is None:
+            from app.db.session import engine
+        self.engine = engine
+        self.sync_interval = float(sync_interval)
+        self.clock = clock
+        self.windows: dict[str, _Window] = {}
+        self.locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._purged_at = clock()
+        self._purge_lock = threading.Lock()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self) -> type[Exception]:
+        return SQLAlchemyError
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = self.clock()
+        with self._lock(key):
+            window = self.windows.get(key)
+            if self._fresh(window, now):
+                window.pending += amount
+                window.expiry = expiry
+                self._start_flusher()
+                return window.count + window.pending
+
+            # First hit seen for this window, or the view is stale: write
+            # through, carrying any hits still pending for the same window
+            if window is not None and now < window.expires_at:
+                amount += window.pending
+            count, expires_at = self._upsert({key: (amount, expiry)}, now)[key]
+            self.windows[key] = _Window(count, expires_at, expiry, now)
+        if self.sync_interval <= 0:
+            # No flusher thread prunes windows or purges rows
+            self._maybe_purge(now)
+        return count
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        """Takes back locally accepted hits (sliding window race handling)."""
+        with self._lock(key):
+            window = self.windows.get(key)
+            if window is None:
+                return 0
+            window.pending -= amount
+            return max(window.count + window.pending, 0)
+
+    def get(self, key: str) -> int:
+        now = self.clock()
+        with self._lock(key):
+            window = self.windows.get(key)
+            if not self._fresh(window, now):
+                window = self._read(key, now)
+            return window.count + window.pending if window else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = self.clock()
+        with self._lock(key):
+            window = self.windows.get(key)
+            if window is None or now >= window.expires_at:
+                window = self._read(key, now)
+            return window.expires_at if window else now
+
+    def check(self) -> bool:
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except SQLAlchemyError:
+            return False
+
+    def reset(self) -> int:
+        self.windows.clear()
+        with self.engine.begin() as conn:
+            return conn.execute(delete(COUNTERS)).rowcount
+
+    def clear(self, key: str) -> None:
+        with self._lock(key):
+            self.windows.pop(key, None)
+            with self.engine.begin() as conn:
+                conn.execute(delete(COUNTERS).where(COUNTERS.c.key == key))
+
+    def acquire_sliding_window_entry(
+        self,
+        key: str,
+        limit: int,
+        expiry: int,
+        amount: int = 1,
+    ) -> bool:
+        if amount > limit:
+            return False
+        previous_count, previous_ttl, current_count, _ = self.get_sliding_window(key, expiry)
+        if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+            return False
+
+        # Current windows live for two periods: they are the next one's
+        # previous window
+        now = self.clock()
+        _, current_key = self.sliding_window_keys(key, expiry, now)
+        current_count = self.incr(current_key, 2 * expiry, amount)
+        if floor(previous_count * previous_ttl / expiry + current_count) > limit:
+            # Lost a race with a concurrent hit
+            self.decr(current_key, amount)
+            return False
+        return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        now = self.clock()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self.get(previous_key)
+        current_count = self.get(current_key)
+        previous_ttl = (
+            (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        )
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, self.clock())
+        self.clear(previous_key)
+        self.clear(current_key)
+
+    def flush(self) -> int:
+        """
+        Writes all pending hits in one statement and refreshes those
+        windows from the shared counts. Returns the number of keys written.
+        """
+        now = self.clock()
+        batch: dict[str, tuple[int, int]] = {}
+        for key, window in list(self.windows.items()):
+            with self._lock(key):
+                if now >= window.expires_at:
+                    self._drop(key, window)
+                    continue
+                if window.pending:
+                    batch[key] = (window.pending, window.expiry)
+                    window.count += window.pending
+                    window.pending = 0
+        if not batch:
+            return 0
+
+        try:
+            shared = self._upsert(batch, now)
+        except Exception:
+            # Put the hits back so the next round retries them
+            for key, (amount, _) in batch.items():
+                with self._lock(key):
+                    window = self.windows.get(key)
+                    if window is not None:
+                        window.count -= amount
+                        window.pending += amount
+            raise
+        for key, (count, expires_at) in shared.items():
+            with self._lock(key):
+                window = self.windows.get(key)
+                if window is not None:
+                    # Hits accepted during the write stay pending
+                    window.count = count
+                    window.expires_at = expires_at
+                    window.synced_at = now
+        return len(batch)
+
+    def purge_expired(self) -> int:
+        """
+        Drops expired local windows and deletes expired rows; returns how
+        many rows were deleted.
+        """
+        now = self.clock()
+        for key, window in list(self.windows.items()):
+            if now >= window.expires_at:
+                with self._lock(key):
+                    self._drop(key, window)
+        with self.engine.begin() as conn:
+            return conn.execute(
+                delete(COUNTERS).where(COUNTERS.c.expires_at <= now)
+            ).rowcount
+
+    def close(self) -> None:
+        """Stops the flusher thread after writing pending hits."""
+        self._stopped.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+    def _lock(self, key: str) -> threading.Lock:
+        return self.locks[hash(key) % LOCK_STRIPES]
+
+    def _drop(self, key: str, window: _Window) -> None:
+        """Forgets `window` unless another thread replaced it; hold the key's lock."""
+        if self.windows.get(key) is window:
+            del self.windows[key]
+
+    def _maybe_purge(self, now: float) -> None:
+        if now - self._purged_at < PURGE_INTERVAL_SECONDS:
+            return
+        if not self._purge_lock.acquire(blocking=False):
+            # Another thread is purging
+            return
+        try:
+            self._purged_at = now
+            self.purge_expired()
+        finally:
+            self._purge_lock.release()
+
+    def _fresh(self, window: Optional[_Window], now: float) -> bool:
+        return (
+            window is not None
+            and now < window.expires_at
+            and now - window.synced_at < self.sync_interval
+        )
+
+    def _read(self, key: str, now: float) -> Optional[_Window]:
+        """Reloads one window from the shared row, keeping local pending hits."""
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(COUNTERS.c.count, COUNTERS.c.expires_at).where(
+                    COUNTERS.c.key == key, COUNTERS.c.expires_at > now
+                )
+            ).first()
+        window = self.windows.get(key)
+        if row is None:
+            if window is not None and now >= window.expires_at:
+                del self.windows[key]
+                return None
+            return window
+        if window is None or now >= window.expires_at:
+            window = _Window(row.count, row.expires_at, int(row.expires_at - now), now)
+            self.windows[key] = window
+        else:
+            window.count = row.count
+            window.expires_at = row.expires_at
+            window.synced_at = now
+        return window
+
+    def _upsert(
+        self,
+        hits: dict[str, tuple[int, int]],
+        now: float,
+    ) -> dict[str, tuple[int, float]]:
+        """
+        Adds (amount, expiry) hits per key in one INSERT ... ON CONFLICT,
+        restarting windows that have expired. Returns the resulting
+        (count, expires_at) per key.
+        """
+        insert = pg_insert if self.engine.dialect.name == "postgresql" else sqlite_insert
+        stmt = insert(COUNTERS).values([
+            {"key": key, "count": amount, "expires_at": now + expiry}
+            # Sorted keys fix the row lock order across workers
+            for key, (amount, expiry) in sorted(hits.items())
+        ])
+        expired = COUNTERS.c.expires_at <= now
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[COUNTERS.c.key],
+            set_={
+                "count": case(
+                    (expired, stmt.excluded.count),
+                    else_=COUNTERS.c.count + stmt.excluded.count,
+                ),
+                "expires_at": case(
+                    (expired, stmt.excluded.expires_at),
+                    else_=COUNTERS.c.expires_at,
+                ),
+            },
+        ).returning(COUNTERS.c.key, COUNTERS.c.count, COUNTERS.c.expires_at)
+
+        with self.engine.begin() as conn:
+            return {
+                row.key: (row.count, row.expires_at)
+                for row in conn.execute(stmt)
+            }
+
+    def _start_flusher(self) -> None:
+        if self._flusher is not None or self.sync_interval <= 0:
+            return
+        with self._flusher_lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._run_flusher,
+                    name="rate-limit-flusher",
+                    daemon=True,
+                )
+                self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        while not self._stopped.wait(self.sync_interval):
+            try:
+                self.flush()
+                self._maybe_purge(self.clock())
+            except Exception:
+                # Keep counting locally; the next round retries the batch
+                logger.exception("Failed to sync rate limit counters")
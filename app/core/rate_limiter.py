@@ -1,4 +1,33 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address)
+from app.core.config import settings
+# Registers the "database://" storage scheme
+from app.core import rate_limit_storage  # noqa: F401
+
+
+def _storage_options() -> dict:
+    if settings.rate_limit_storage_uri.startswith("database://"):
+        return {"sync_interval": settings.rate_limit_sync_interval_seconds}
+    return {}
+
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.rate_limit_storage_uri,
+    storage_options=_storage_options(),
+    strategy=settings.rate_limit_strategy,
+)
+
+
+# Per-route budgets, read from settings on each request
+def read_limit() -> str:
+    return f"{settings.rate_limit_per_minute}/minute"
+
+
+def ingest_limit() -> str:
+    return f"{max(settings.rate_limit_ingest_per_minute, 1)}/minute"
+
+
+def ingest_limit_disabled() -> bool:
+    return settings.rate_limit_ingest_per_minute <= 0
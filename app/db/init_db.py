@@ -1,6 +1,74 @@
+import logging
+
+from sqlalchemy import text
 from sqlmodel import SQLModel
+from app.core.config import settings
+from app.db.partitions import (
+    CLAIM_LINES_TABLE,
+    claim_lines_is_partitioned,
+    create_partitioned_claim_lines,
+    ensure_claim_line_partitions,
+)
 from app.db.session import engine
+from app.repositories.claim_repo import CLAIM_REFERENCE_INDEX, CLAIM_REFERENCE_UNIQUE_INDEX
+
+logger = logging.getLogger(__name__)
+
+# Indexes made redundant by newer ones; dropped so upgraded databases stop
+# maintaining them on every insert
+SUPERSEDED_INDEXES = (
+    # ix_claim_lines_provider_service_date leads with provider_npi
+    "ix_claim_lines_provider_npi",
+)
 
 def init_db():
+    partitioned = settings.claim_lines_partitioned and engine.dialect.name == "postgresql"
+
+    if partitioned:
+        # claim_lines references claims, so everything else goes first
+        SQLModel.metadata.create_all(engine, tables=[
+            table for table in SQLModel.metadata.sorted_tables
+            if table.name != CLAIM_LINES_TABLE
+        ])
+        with engine.begin() as conn:
+            create_partitioned_claim_lines(conn)
+
     SQLModel.metadata.create_all(engine)
 
+    redundant = list(SUPERSEDED_INDEXES)
+    if settings.claim_idempotency_enabled:
+        # Fails if duplicate claim_references were ingested before the
+        # mode was enabled; those must be resolved first
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {CLAIM_REFERENCE_UNIQUE_INDEX} "
+                "ON claims (claim_reference)"
+            ))
+        # The unique index serves every claim_reference lookup
+        redundant.append(CLAIM_REFERENCE_INDEX)
+
+    # create_all skips indexes on tables that already exist
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in redundant:
+                index.create(engine, checkfirst=True)
+
+    with engine.begin() as conn:
+        for name in redundant:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+    if partitioned:
+        with engine.begin() as conn:
+            if claim_lines_is_partitioned(conn):
+                ensure_claim_line_partitions(
+                    conn,
+                    settings.claim_lines_partition_months_back,
+                    settings.claim_lines_partition_months_ahead,
+                )
+            else:
+                # Created before partitioning was enabled; converting it
+                # means copying every row, so it is kept as it is
+                logger.warning(
+                    f"{CLAIM_LINES_TABLE} is not partitioned; "
+                    "CLAIM_LINES_PARTITIONED only applies when the table is created"
+                )
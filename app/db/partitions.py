@@ -0,0 +1,207 @@
+"""
+Monthly range partitioning of claim_lines by service_date (PostgreSQL only).
+
+With CLAIM_LINES_PARTITIONED=true, init_db creates claim_lines as a
+PARTITION BY RANGE (service_date) table with one partition per calendar
+month, named claim_lines_pYYYY_MM, plus a claim_lines_default partition
+for service dates outside the managed range. The primary key becomes
+(id, service_date) because PostgreSQL requires the partition key in
+every unique constraint.
+
+Partitions are created ahead of time by ensure_claim_line_partitions
+(at startup and from app.cli.partitions); old months are archived by
+detaching them, which is a catalog update instead of a bulk DELETE.
+"""
+import re
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import (
+    ForeignKeyConstraint,
+    MetaData,
+    PrimaryKeyConstraint,
+    Table,
+    inspect,
+    text,
+)
+from sqlalchemy.engine import Connection
+
+from app.models.claim import Claim
+from app.models.claim_line import ClaimLine
+
+CLAIM_LINES_TABLE = ClaimLine.__tablename__
+DEFAULT_PARTITION = f"{CLAIM_LINES_TABLE}_default"
+
+_PARTITION_NAME = re.compile(rf"^{CLAIM_LINES_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+LIST_PARTITIONS_SQL = """
+SELECT child.relname
+FROM pg_inherits
+JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+WHERE parent.relname = :table
+"""
+
+IS_PARTITIONED_SQL = """
+SELECT 1
+FROM pg_partitioned_table
+JOIN pg_class ON pg_class.oid = pg_partitioned_table.partrelid
+WHERE pg_class.relname = :table
+"""
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{CLAIM_LINES_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Returns the month a partition covers, or None for other tables."""
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def months_between(first: date, last: date) -> list[date]:
+    """Every month from first to last inclusive."""
+    months = []
+    month = month_start(first)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def partitioned_claim_lines_table() -> Table:
+    """
+    A copy of the claim_lines table definition, partitioned by month.
+
+    Columns and indexes come from the ClaimLine model so the two cannot
+    drift; only the primary key and the PARTITION BY clause differ.
+    """
+    source = ClaimLine.__table__
+    metadata = MetaData()
+    # The referenced table must be in the same MetaData to render the foreign key
+    Claim.__table__.to_metadata(metadata)
+
+    columns = []
+    for column in source.columns:
+        copy = column._copy()
+        copy.primary_key = False
+        if copy.name == "id":
+            # Composite primary keys don't get SERIAL by default
+            copy.autoincrement = True
+        columns.append(copy)
+
+    return Table(
+        CLAIM_LINES_TABLE,
+        metadata,
+        *columns,
+        PrimaryKeyConstraint("id", "service_date"),
+        *(
+            ForeignKeyConstraint([fk.parent.name], [fk.target_fullname])
+            for fk in source.foreign_keys
+        ),
+        postgresql_partition_by="RANGE (service_date)",
+    )
+
+
+def create_partition_sql(month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+        f"PARTITION OF {CLAIM_LINES_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def create_partitioned_claim_lines(conn: Connection) -> bool:
+    """
+    Creates claim_lines as a partitioned table if it doesn't exist yet.
+
+    Returns False when claim_lines already exists; an existing plain table
+    is left alone, since converting it means copying every row.
+    """
+    if inspect(conn).has_table(CLAIM_LINES_TABLE):
+        return False
+
+    partitioned_claim_lines_table().create(conn)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} "
+        f"PARTITION OF {CLAIM_LINES_TABLE} DEFAULT"
+    ))
+    return True
+
+
+def claim_lines_is_partitioned(conn: Connection) -> bool:
+    """Whether claim_lines exists as a partitioned table (not a plain one)."""
+    return bool(list(conn.execute(text(IS_PARTITIONED_SQL), {"table": CLAIM_LINES_TABLE})))
+
+
+def list_claim_line_partitions(conn: Connection) -> dict[str, date]:
+    """Monthly partitions currently attached to claim_lines, by name."""
+    rows = conn.execute(text(LIST_PARTITIONS_SQL), {"table": CLAIM_LINES_TABLE})
+    partitions = {}
+    for (name,) in rows:
+        month = partition_month(name)
+        if month is not None:
+            partitions[name] = month
+    return partitions
+
+
+def ensure_claim_line_partitions(
+    conn: Connection,
+    months_back: int,
+    months_ahead: int,
+    today: Optional[date] = None,
+) -> list[str]:
+    """
+    Creates the monthly partitions from `months_back` months before the
+    current month to `months_ahead` months after it. Returns the names of
+    the partitions that were missing.
+
+    Rows already sitting in the default partition for a missing month make
+    PostgreSQL refuse the new partition; create partitions before loading
+    data for those months.
+
+    Raises ValueError if claim_lines is a plain table, e.g. one created
+    before CLAIM_LINES_PARTITIONED was enabled.
+    """
+    if not claim_lines_is_partitioned(conn):
+        raise ValueError(f"{CLAIM_LINES_TABLE} is not a partitioned table")
+
+    current = month_start(today or datetime.now().date())
+    existing = list_claim_line_partitions(conn)
+
+    created = []
+    for month in months_between(
+        add_months(current, -months_back), add_months(current, months_ahead)
+    ):
+        name = partition_name(month)
+        if name not in existing:
+            conn.execute(text(create_partition_sql(month)))
+            created.append(name)
+    return created
+
+
+def detach_claim_line_partitions(conn: Connection, before: date) -> list[str]:
+    """
+    Detaches every monthly partition that ends on or before `before`.
+
+    Detached partitions keep their data as standalone tables that can be
+    dumped and dropped. Returns the detached partition names.
+    """
+    detached = []
+    for name, month in sorted(list_claim_line_partitions(conn).items(), key=lambda item: item[1]):
+        if add_months(month, 1) <= before:
+            conn.execute(text(f"ALTER TABLE {CLAIM_LINES_TABLE} DETACH PARTITION {name}"))
+            detached.append(name)
+    return detached
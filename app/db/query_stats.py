@@ -0,0 +1,126 @@
+"""
+Per-request SQL statement counting and N+1 detection.
+
+Engine events record, for the request being tracked: statements sent,
+total time in the database, rows (as the driver reports them: rows
+affected, and rows returned where the driver counts them, e.g. psycopg),
+and how often each distinct statement ran. Tracking is scoped with a
+context variable, so it follows a request into the threadpool and into
+AsyncSession.run_sync.
+
+The listeners are only registered (on every engine) when
+QUERY_STATS_ENABLED is set at startup; otherwise statements pay no
+event dispatch at all. Tests instrument their own engine.
+
+With QUERY_STATS_ENABLED=true, QueryStatsMiddleware tracks every HTTP
+request, adds X-DB-Statements, X-DB-Time-Ms and X-DB-Rows response
+headers, and logs a warning when one statement runs at least
+QUERY_STATS_REPEAT_THRESHOLD times in a request (a likely N+1).
+Tests use the headers, or track_queries() directly, to hold routes and
+services to a statement budget.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+    # Executions per distinct SQL text
+    executions: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run at least `threshold` times, most frequent first."""
+        return [
+            (statement, count)
+            for statement, count in self.executions.most_common()
+            if count >= threshold
+        ]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Records every statement executed in this context until exit."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None and context is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = getattr(context, "_query_stats_started", None)
+    if stats is None or started is None:
+        return
+    stats.statements += 1
+    stats.seconds += time.perf_counter() - started
+    if cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+    stats.executions[statement] += 1
+
+
+def instrument(target) -> None:
+    """Listens on an Engine, or on the Engine class for every engine."""
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+def uninstrument(target) -> None:
+    """Removes the listeners added by instrument(target)."""
+    event.remove(target, "before_cursor_execute", _before_cursor_execute)
+    event.remove(target, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware reporting each request's QueryStats."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.query_stats_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_stats(message):
+                if message["type"] == "http.response.start":
+                    # Streamed bodies keep querying after this point; their
+                    # headers only cover the work done before streaming
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Statements"] = str(stats.statements)
+                    headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.2f}"
+                    headers["X-DB-Rows"] = str(stats.rows)
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+        for statement, count in stats.repeated(settings.query_stats_repeat_threshold):
+            logger.warning(
+                f"Possible N+1 in {scope['method']} {scope['path']}: "
+                f"{count} executions of {' '.join(statement.split())[:200]}"
+            )
@@ -1,15 +1,123 @@
+import os
+from typing import Any, Callable, TypeVar
+
+from fastapi import Depends
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import SQLModel, create_engine, Session
+from starlette.concurrency import run_in_threadpool
+
 from app.core.config import settings
+from app.core.metrics import TimedAsyncQueuePool, TimedQueuePool
+from app.db import query_stats
+
+T = TypeVar("T")
+
+def worker_count() -> int:
+    """Web worker processes sharing the connection budget."""
+    return settings.web_workers or os.cpu_count() or 1
+
+
+def pool_options(engines: int = 1) -> dict:
+    """
+    Pool arguments for one of the `engines` engines each worker creates.
+
+    With a connection budget, the budget is split evenly across workers
+    and engines and the pools get no overflow, so the total number of
+    connections stays within it however many workers are started.
+    """
+    if settings.database_pool == "null":
+        return {"poolclass": NullPool}
+    if settings.database_connection_budget is None:
+        return {
+            "pool_size": settings.database_pool_size,
+            "max_overflow": settings.database_max_overflow,
+        }
+
+    pool_size = settings.database_connection_budget // (worker_count() * engines)
+    if pool_size < 1:
+        raise ValueError(
+            f"DATABASE_CONNECTION_BUDGET={settings.database_connection_budget} is too small "
+            f"for {worker_count()} workers with {engines} engine(s) each"
+        )
+    return {"pool_size": pool_size, "max_overflow": 0}
+
+
+def connect_args(url: str) -> dict:
+    if not settings.database_prepared_statements and url.startswith("postgresql+psycopg"):
+        # None disables psycopg's automatic server-side prepares
+        return {"prepare_threshold": None}
+    return {}
+
+
+def _timed(options: dict, poolclass: type) -> dict:
+    # Timed pools feed the /metrics pool series; NullPool is kept as is
+    return options if "poolclass" in options else {"poolclass": poolclass, **options}
+
+
+# The sync engine also serves exports, init_db and the ledger flusher when
+# requests go through the async engine, so both take a share of the budget
+ENGINES_PER_WORKER = 2 if settings.database_async else 1
 
 engine = create_engine(
     settings.database_url,
     echo=False,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
     pool_recycle=3600,
+    connect_args=connect_args(settings.database_url),
+    **_timed(pool_options(ENGINES_PER_WORKER), TimedQueuePool),
+)
+
+# Per-request statement tracking. Set on the Engine class so every engine
+# reports, including the async engine's sync core; without the setting no
+# listener is registered and statements skip the event dispatch entirely
+if settings.query_stats_enabled:
+    query_stats.instrument(Engine)
+
+# Only built when async mode is enabled, so the async driver is optional
+async_engine = (
+    create_async_engine(
+        settings.async_database_url or settings.database_url,
+        echo=False,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        connect_args=connect_args(settings.async_database_url or settings.database_url),
+        **_timed(pool_options(ENGINES_PER_WORKER), TimedAsyncQueuePool),
+    )
+    if settings.database_async
+    else None
 )
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+class SessionRunner:
+    """
+    Runs sync ORM work against either a Session or an AsyncSession.
+
+    Routes hand it a callable taking a sync Session. With an AsyncSession
+    the callable runs on the async connection via run_sync, so the request
+    holds no thread while waiting on the database; with a Session it runs
+    on Starlette's threadpool. Repositories and services stay shared.
+    """
+
+    def __init__(self, session: Session | AsyncSession):
+        self.session = session
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+if settings.database_async:
+    async def get_session_runner():
+        async with AsyncSession(async_engine) as session:
+            yield SessionRunner(session)
+else:
+    def get_session_runner(session: Session = Depends(get_session)):
+        return SessionRunner(session)
@@ -1,15 +1,20 @@
+import asyncio
 import logging
 from fastapi import FastAPI
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from fastapi.responses import JSONResponse
 
+from app.core.metrics import RATE_LIMIT_REJECTIONS, RequestMetricsMiddleware, route_label
 from app.core.rate_limiter import limiter
 from app.core.config import settings
 from app.db.init_db import init_db
+from app.db.query_stats import QueryStatsMiddleware
+from app.services.aggregate_flusher import run_ledger_flusher
 from app.api.claims import router as claims_router
 from app.api.providers import router as providers_router
 from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
 
 # Configure logging
 logging.basicConfig(
@@ -25,13 +30,31 @@ app = FastAPI(
 
 @app.on_event("startup")
 def on_startup():
-    init_db()
+    if not settings.skip_init_db:
+        init_db()
+
+@app.on_event("startup")
+async def start_aggregate_flusher():
+    if settings.aggregate_write_mode == "ledger":
+        app.state.aggregate_flusher = asyncio.create_task(
+            run_ledger_flusher(settings.aggregate_flush_interval_seconds)
+        )
+
+@app.on_event("shutdown")
+async def stop_aggregate_flusher():
+    flusher = getattr(app.state, "aggregate_flusher", None)
+    if flusher is not None:
+        flusher.cancel()
 
 app.state.limiter = limiter
 app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+# Added last so it wraps everything, including rate limit rejections
+app.add_middleware(RequestMetricsMiddleware)
 
 @app.exception_handler(RateLimitExceeded)
 def rate_limit_handler(request, exc):
+    RATE_LIMIT_REJECTIONS.labels(route_label(request.scope)).inc()
     return JSONResponse(
         status_code=429,
         content={"detail": "Rate limit exceeded"},
@@ -40,3 +63,4 @@ def rate_limit_handler(request, exc):
 app.include_router(claims_router)
 app.include_router(providers_router)
 app.include_router(health_router)
+app.include_router(metrics_router)
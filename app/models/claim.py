@@ -1,8 +1,10 @@
 from sqlmodel import SQLModel, Field
-from uuid import UUID, uuid4
+from uuid import UUID
 from datetime import datetime, timezone
 from typing import Optional
 
+from app.core.ids import new_claim_id
+
 def utc_now() -> datetime:
     """Get current UTC datetime (timezone-aware)."""
     return datetime.now(timezone.utc)
@@ -10,7 +12,7 @@ def utc_now() -> datetime:
 class Claim(SQLModel, table=True):
     __tablename__ = "claims"
     
-    # Primary key - UUID is auto-generated
-    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    # Primary key - UUID is auto-generated (uuid7 by default, see claim_id_strategy)
+    id: UUID = Field(default_factory=new_claim_id, primary_key=True)
     claim_reference: Optional[str] = Field(default=None, index=True)
     created_at: datetime = Field(default_factory=utc_now)
@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from uuid import UUID
 from datetime import datetime, timezone
@@ -17,7 +18,7 @@ class ClaimLine(SQLModel, table=True):
     service_date: datetime
     plan_group: str
     subscriber_id: str
-    provider_npi: str = Field(index=True)
+    provider_npi: str
     submitted_procedure: str
     quadrant: Optional[str] = None
 
@@ -30,3 +31,17 @@ class ClaimLine(SQLModel, table=True):
     # Computed field
     net_fee_cents: int
     created_at: datetime = Field(default_factory=utc_now)
+
+
+# Serves GET /providers/{npi}/lines: an equality seek on provider_npi, then
+# keyset pages over (service_date, id). The INCLUDE columns are everything
+# that endpoint returns, so PostgreSQL answers it with an index-only scan.
+# It also serves every other provider_npi lookup, so that column has no
+# index of its own
+Index(
+    "ix_claim_lines_provider_service_date",
+    ClaimLine.provider_npi,
+    ClaimLine.service_date,
+    ClaimLine.id,
+    postgresql_include=["claim_id", "submitted_procedure", "net_fee_cents"],
+)
@@ -0,0 +1,43 @@
+from sqlalchemy import JSON, Column, Index
+from sqlmodel import SQLModel, Field
+from uuid import UUID
+from datetime import datetime, timezone
+from typing import Optional
+
+def utc_now() -> datetime:
+    """Get current UTC datetime (timezone-aware)."""
+    return datetime.now(timezone.utc)
+
+OUTBOX_PENDING = "PENDING"
+OUTBOX_PUBLISHED = "PUBLISHED"
+OUTBOX_FAILED = "FAILED"
+
+class OutboxEvent(SQLModel, table=True):
+    """
+    Transactional outbox row, written in the same transaction as its claim.
+
+    The outbox worker publishes PENDING rows and marks them PUBLISHED, or
+    reschedules them with backoff until outbox_max_attempts is reached
+    and they become FAILED.
+    """
+    __tablename__ = "outbox_events"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    event_type: str
+    aggregate_id: UUID
+    payload: dict = Field(sa_column=Column(JSON, nullable=False))
+    status: str = Field(default=OUTBOX_PENDING)
+    attempts: int = 0
+    last_error: Optional[str] = None
+    next_attempt_at: datetime = Field(default_factory=utc_now)
+    created_at: datetime = Field(default_factory=utc_now)
+    published_at: Optional[datetime] = None
+
+
+# Workers poll only due PENDING rows, oldest first
+Index(
+    "ix_outbox_events_pending",
+    OutboxEvent.next_attempt_at,
+    OutboxEvent.id,
+    postgresql_where=OutboxEvent.status == OUTBOX_PENDING,
+)
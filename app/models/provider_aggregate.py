@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from datetime import datetime, timezone
 
@@ -11,3 +12,11 @@ class ProviderNetFeeAggregate(SQLModel, table=True):
     provider_npi: str = Field(primary_key=True)
     total_net_fee_cents: int
     updated_at: datetime = Field(default_factory=utc_now)
+
+
+# Serves the ranking (and keyset pages of it) as an ordered index scan
+Index(
+    "ix_provider_net_fee_aggregate_ranking",
+    ProviderNetFeeAggregate.total_net_fee_cents.desc(),
+    ProviderNetFeeAggregate.provider_npi,
+)
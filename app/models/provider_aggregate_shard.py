@@ -0,0 +1,15 @@
+from sqlmodel import SQLModel, Field
+
+class ProviderNetFeeShard(SQLModel, table=True):
+    """
+    Partial net fee totals used when aggregate sharding is enabled.
+
+    A provider's all-time total is its ProviderNetFeeAggregate row plus
+    the sum of its shard rows; compaction folds shards back into the
+    aggregate and deletes them.
+    """
+    __tablename__ = "provider_net_fee_shard"
+
+    provider_npi: str = Field(primary_key=True)
+    shard: int = Field(primary_key=True)
+    total_net_fee_cents: int
@@ -0,0 +1,21 @@
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+from datetime import date
+
+class ProviderDailyNetFeeAggregate(SQLModel, table=True):
+    """Net fee totals per provider per service day, for windowed rankings."""
+    __tablename__ = "provider_net_fee_daily"
+
+    provider_npi: str = Field(primary_key=True)
+    bucket_date: date = Field(primary_key=True)
+    # Sub-row index when aggregate sharding is enabled; 0 otherwise
+    shard: int = Field(default=0, primary_key=True)
+    total_net_fee_cents: int
+
+
+# Window queries range-scan by day, then group by provider
+Index(
+    "ix_provider_net_fee_daily_bucket",
+    ProviderDailyNetFeeAggregate.bucket_date,
+    ProviderDailyNetFeeAggregate.provider_npi,
+)
@@ -0,0 +1,22 @@
+from sqlmodel import SQLModel, Field
+from datetime import date, datetime, timezone
+from typing import Optional
+
+def utc_now() -> datetime:
+    """Get current UTC datetime (timezone-aware)."""
+    return datetime.now(timezone.utc)
+
+class ProviderFeeDelta(SQLModel, table=True):
+    """
+    Append-only ledger of net fee deltas used in write-behind mode.
+
+    Claims insert rows here instead of updating aggregates; the flusher
+    folds them into the aggregate tables and deletes them.
+    """
+    __tablename__ = "provider_fee_delta"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    provider_npi: str
+    bucket_date: date
+    delta_cents: int
+    created_at: datetime = Field(default_factory=utc_now)
@@ -0,0 +1,16 @@
+from sqlmodel import SQLModel, Field
+
+
+class RateLimitCounter(SQLModel, table=True):
+    """
+    Shared rate limit windows for the "database://" limiter storage.
+
+    One row per limit key (route, client and window); expired rows are
+    reused by the next hit on the same key and purged periodically.
+    """
+    __tablename__ = "rate_limit_counters"
+
+    key: str = Field(primary_key=True)
+    count: int
+    # Unix timestamp; all workers compare against their wall clock
+    expires_at: float
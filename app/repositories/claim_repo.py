@@ -1,11 +1,22 @@
-from sqlmodel import Session
+from sqlalchemy import select as sa_select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
 from app.models.claim import Claim
 from uuid import UUID
 from typing import Optional
 
+# Plain index from the Claim model; init_db drops it in favour of the
+# unique one below
+CLAIM_REFERENCE_INDEX = "ix_claims_claim_reference"
+# Backs idempotent ingest; created by init_db when claim_idempotency_enabled
+CLAIM_REFERENCE_UNIQUE_INDEX = "uq_claims_claim_reference"
+
 class ClaimRepository:
     def __init__(self, session: Session):
         self.session = session
+        # Detect database type from engine URL
+        self.is_postgres = "postgresql" in str(session.bind.url)
 
     def create(self, claim: Claim) -> Claim:
         self.session.add(claim)
@@ -14,3 +25,61 @@ class ClaimRepository:
 
     def get_by_id(self, claim_id: UUID) -> Optional[Claim]:
         return self.session.get(Claim, claim_id)
+
+    def bulk_create(self, claims: list[Claim]) -> None:
+        self.session.add_all(claims)
+        self.session.flush()
+
+    def create_many_idempotent(self, claims: list[Claim]) -> dict[str, UUID]:
+        """
+        Inserts claims with INSERT ... ON CONFLICT (claim_reference) DO NOTHING.
+
+        Returns claim_reference -> stored claim id. A reference that already
+        existed maps to the original id; comparing it to the claim's own id
+        tells the caller whether the claim was a replay. All claims must have
+        a claim_reference.
+        """
+        if not claims:
+            return {}
+
+        rows = [
+            {"id": claim.id, "claim_reference": claim.claim_reference, "created_at": claim.created_at}
+            for claim in claims
+        ]
+        references = {claim.claim_reference for claim in claims}
+
+        if self.is_postgres:
+            # One round trip: the CTE inserts new references and the second
+            # branch returns ids of references committed before this statement
+            inserted = (
+                pg_insert(Claim)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["claim_reference"])
+                .returning(Claim.id, Claim.claim_reference)
+                .cte("inserted")
+            )
+            stmt = union_all(
+                sa_select(inserted.c.id, inserted.c.claim_reference),
+                sa_select(Claim.id, Claim.claim_reference).where(
+                    Claim.claim_reference.in_(references)
+                ),
+            )
+            stored = {reference: claim_id for claim_id, reference in self.session.execute(stmt)}
+        else:
+            stmt = (
+                sqlite_insert(Claim)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["claim_reference"])
+                .returning(Claim.id, Claim.claim_reference)
+            )
+            stored = {reference: claim_id for claim_id, reference in self.session.execute(stmt)}
+
+        missing = references - stored.keys()
+        if missing:
+            # Existing rows (SQLite), or rows committed by a concurrent
+            # transaction after this statement's snapshot (PostgreSQL)
+            stmt = select(Claim.id, Claim.claim_reference).where(
+                Claim.claim_reference.in_(missing)
+            )
+            stored.update({reference: claim_id for claim_id, reference in self.session.exec(stmt)})
+        return stored
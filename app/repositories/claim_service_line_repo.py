@@ -1,10 +1,94 @@
-from sqlmodel import Session
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import func, insert, tuple_
+from sqlmodel import Session, select
 from app.models.claim_line import ClaimLine
 
 class ClaimServiceLineRepository:
     def __init__(self, session: Session):
         self.session = session
 
-    def bulk_create(self, lines: list[ClaimLine]) -> None:
-        self.session.add_all(lines)
-        self.session.flush()
+    def bulk_insert_rows(self, rows: list[dict]) -> None:
+        """
+        Inserts claim lines as plain column dicts through a Core INSERT.
+
+        Skips the ORM unit of work entirely: no ClaimLine instances are
+        built or tracked, and the driver batches rows via executemany /
+        insertmanyvalues. Every row must carry all non-nullable columns,
+        including created_at, since Python-side defaults are not applied.
+        """
+        if not rows:
+            return
+        self.session.execute(insert(ClaimLine.__table__), rows)
+
+    def get_by_claim_id(self, claim_id: UUID) -> list[ClaimLine]:
+        stmt = select(ClaimLine).where(ClaimLine.claim_id == claim_id).order_by(ClaimLine.id)
+        return list(self.session.exec(stmt))
+
+    def get_for_provider(
+        self,
+        provider_npi: str,
+        limit: int,
+        from_time: Optional[datetime] = None,
+        to_time: Optional[datetime] = None,
+        after_service_date: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+    ) -> list[tuple]:
+        """
+        Returns a provider's lines, newest service date first, as
+        (id, claim_id, service_date, submitted_procedure, net_fee_cents).
+
+        Selects only columns held by ix_claim_lines_provider_service_date,
+        so PostgreSQL reads a backward index range and never the heap.
+        `from_time` is inclusive and `to_time` exclusive. Pass the last
+        row's service_date and id as the cursor for the next page.
+        """
+        stmt = select(
+            ClaimLine.id,
+            ClaimLine.claim_id,
+            ClaimLine.service_date,
+            ClaimLine.submitted_procedure,
+            ClaimLine.net_fee_cents,
+        ).where(ClaimLine.provider_npi == provider_npi)
+
+        if from_time is not None:
+            stmt = stmt.where(ClaimLine.service_date >= from_time)
+        if to_time is not None:
+            stmt = stmt.where(ClaimLine.service_date < to_time)
+        if after_service_date is not None:
+            stmt = stmt.where(
+                tuple_(ClaimLine.service_date, ClaimLine.id)
+                < tuple_(after_service_date, after_id)
+            )
+
+        stmt = stmt.order_by(ClaimLine.service_date.desc(), ClaimLine.id.desc()).limit(limit)
+        return list(self.session.exec(stmt))
+
+    def provider_npi_at_offset(self, after_npi: Optional[str], offset: int) -> Optional[str]:
+        """
+        Returns the `offset`-th distinct provider_npi (0-based) greater than
+        `after_npi`, or None if there are fewer. Used to cut NPI-range chunks.
+        """
+        stmt = select(ClaimLine.provider_npi).distinct()
+        if after_npi is not None:
+            stmt = stmt.where(ClaimLine.provider_npi > after_npi)
+        stmt = stmt.order_by(ClaimLine.provider_npi).offset(offset).limit(1)
+        return self.session.exec(stmt).first()
+
+    def net_fee_sums(self, after_npi: Optional[str], upto_npi: Optional[str]) -> dict[str, int]:
+        """
+        Sums net_fee_cents per provider for NPIs in (after_npi, upto_npi].
+
+        Only reads provider_npi and net_fee_cents, both held by
+        ix_claim_lines_provider_service_date, so PostgreSQL can answer with
+        an index-only scan of the range.
+        """
+        stmt = select(ClaimLine.provider_npi, func.sum(ClaimLine.net_fee_cents))
+        if after_npi is not None:
+            stmt = stmt.where(ClaimLine.provider_npi > after_npi)
+        if upto_npi is not None:
+            stmt = stmt.where(ClaimLine.provider_npi <= upto_npi)
+        stmt = stmt.group_by(ClaimLine.provider_npi)
+        return {provider_npi: int(total) for provider_npi, total in self.session.exec(stmt)}
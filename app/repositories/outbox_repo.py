@@ -0,0 +1,53 @@
+from sqlalchemy import insert
+from sqlmodel import Session, select
+from datetime import datetime
+
+from app.models.outbox_event import OUTBOX_PENDING, OutboxEvent, utc_now
+
+
+class OutboxRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add_many(self, event_type: str, events: list[tuple]) -> None:
+        """Inserts (aggregate_id, payload) events with one Core INSERT."""
+        if not events:
+            return
+        now = utc_now()
+        self.session.execute(
+            insert(OutboxEvent.__table__),
+            [
+                {
+                    "event_type": event_type,
+                    "aggregate_id": aggregate_id,
+                    "payload": payload,
+                    "status": OUTBOX_PENDING,
+                    "attempts": 0,
+                    "next_attempt_at": now,
+                    "created_at": now,
+                }
+                for aggregate_id, payload in events
+            ],
+        )
+
+    def claim_batch(self, limit: int, now: datetime) -> list[OutboxEvent]:
+        """
+        Locks up to `limit` due PENDING events, earliest due first.
+
+        FOR UPDATE SKIP LOCKED lets concurrent workers each take a disjoint
+        batch without waiting on one another. The locks are held until the
+        caller's transaction ends.
+        """
+        stmt = (
+            select(OutboxEvent)
+            .where(
+                OutboxEvent.status == OUTBOX_PENDING,
+                OutboxEvent.next_attempt_at <= now,
+            )
+            # Matches ix_outbox_events_pending, so the scan stops after
+            # `limit` due rows instead of sorting every due row by id
+            .order_by(OutboxEvent.next_attempt_at, OutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(self.session.exec(stmt).all())
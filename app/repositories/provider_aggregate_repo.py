@@ -1,8 +1,44 @@
+import random
+
+from sqlalchemy import and_, func, or_, text
 from sqlalchemy.dialects.postgresql import insert as pg_insert
-from sqlmodel import Session
-from datetime import datetime, timezone
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+from datetime import date, datetime, timezone
+from typing import Optional
 
+from app.core.config import settings
 from app.models.provider_aggregate import ProviderNetFeeAggregate
+from app.models.provider_aggregate_shard import ProviderNetFeeShard
+from app.models.provider_daily_aggregate import ProviderDailyNetFeeAggregate
+
+# Folds only shard rows it can lock immediately, so compaction never waits
+# on (or deadlocks with) in-flight claim transactions; skipped rows are
+# picked up by the next run.
+FOLD_SHARDS_SQL = text("""
+WITH folded AS (
+    DELETE FROM provider_net_fee_shard
+    WHERE (provider_npi, shard) IN (
+        SELECT provider_npi, shard FROM provider_net_fee_shard
+        ORDER BY provider_npi, shard
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING provider_npi, total_net_fee_cents
+)
+INSERT INTO provider_net_fee_aggregate (provider_npi, total_net_fee_cents, updated_at)
+SELECT provider_npi, SUM(total_net_fee_cents), now()
+FROM folded
+GROUP BY provider_npi
+ORDER BY provider_npi
+ON CONFLICT (provider_npi) DO UPDATE SET
+    total_net_fee_cents =
+        provider_net_fee_aggregate.total_net_fee_cents + EXCLUDED.total_net_fee_cents,
+    updated_at = EXCLUDED.updated_at
+""")
+
+# Rows per upsert statement: keeps bind parameters (up to 5 per row) under
+# SQLite's 32766 and PostgreSQL's 65535 limits
+UPSERT_CHUNK_ROWS = 5000
 
 
 def utc_now() -> datetime:
@@ -11,45 +47,294 @@ def utc_now() -> datetime:
 
 
 class ProviderAggregateRepository:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, shard_count: Optional[int] = None):
         self.session = session
         # Detect database type from engine URL
         self.is_postgres = "postgresql" in str(session.bind.url)
+        # With sharding, each repository (one per transaction) writes to a
+        # random sub-row, so concurrent claims for a hot provider rarely
+        # contend on the same row lock.
+        self.shard_count = shard_count or settings.aggregate_shard_count
+        self.sharded = self.shard_count > 1
+        self.shard = random.randrange(self.shard_count) if self.sharded else 0
 
     def increment_net_fee(
         self,
         provider_npi: str,
         delta_cents: int,
     ) -> None:
-        if self.is_postgres:
-            # PostgreSQL: Use INSERT ... ON CONFLICT DO UPDATE
-            stmt = pg_insert(ProviderNetFeeAggregate).values(
-                provider_npi=provider_npi,
-                total_net_fee_cents=delta_cents,
-                updated_at=utc_now(),
+        self.increment_many({provider_npi: delta_cents})
+
+    def increment_many(self, deltas: dict[str, int]) -> None:
+        """
+        Applies pre-summed net fee deltas for many providers at once.
+
+        Rows are written in NPI order so concurrent transactions acquire
+        row locks in the same order and cannot deadlock on each other.
+        """
+        if self.sharded:
+            self._upsert_totals(
+                ProviderNetFeeShard,
+                ("provider_npi", "shard"),
+                {
+                    (provider_npi, self.shard): delta
+                    for provider_npi, delta in deltas.items()
+                },
             )
+            return
+
+        now = utc_now()
+        self._upsert_totals(
+            ProviderNetFeeAggregate,
+            ("provider_npi",),
+            {(provider_npi,): delta for provider_npi, delta in deltas.items()},
+            extra={"updated_at": now},
+        )
+
+    def increment_daily_many(self, deltas: dict[tuple[str, date], int]) -> None:
+        """Applies net fee deltas keyed by (provider_npi, service day)."""
+        self._upsert_totals(
+            ProviderDailyNetFeeAggregate,
+            ("provider_npi", "bucket_date", "shard"),
+            {
+                (provider_npi, bucket_date, self.shard): delta
+                for (provider_npi, bucket_date), delta in deltas.items()
+            },
+        )
+
+    def fold_shards(self) -> int:
+        """
+        Moves shard totals into provider_net_fee_aggregate.
+
+        Returns the number of providers whose aggregate was updated.
+        """
+        if self.is_postgres:
+            return self.session.execute(FOLD_SHARDS_SQL).rowcount
+
+        shards = list(self.session.exec(select(ProviderNetFeeShard)))
+        deltas: dict[str, int] = {}
+        for row in shards:
+            deltas[row.provider_npi] = deltas.get(row.provider_npi, 0) + row.total_net_fee_cents
+            self.session.delete(row)
+        self._upsert_totals(
+            ProviderNetFeeAggregate,
+            ("provider_npi",),
+            {(provider_npi,): delta for provider_npi, delta in deltas.items()},
+            extra={"updated_at": utc_now()},
+        )
+        return len(deltas)
+
+    def totals_in_range(self, after_npi: Optional[str], upto_npi: Optional[str]) -> dict[str, int]:
+        """
+        All-time totals (aggregate row plus any unfolded shard rows) per
+        provider for NPIs in (after_npi, upto_npi].
+        """
+        totals: dict[str, int] = {}
+        for model in (ProviderNetFeeAggregate, ProviderNetFeeShard):
+            stmt = select(model.provider_npi, func.sum(model.total_net_fee_cents))
+            if after_npi is not None:
+                stmt = stmt.where(model.provider_npi > after_npi)
+            if upto_npi is not None:
+                stmt = stmt.where(model.provider_npi <= upto_npi)
+            stmt = stmt.group_by(model.provider_npi)
+            for provider_npi, total in self.session.exec(stmt):
+                totals[provider_npi] = totals.get(provider_npi, 0) + int(total)
+        return totals
+
+    def _upsert_totals(
+        self,
+        model: type,
+        key_fields: tuple[str, ...],
+        deltas: dict[tuple, int],
+        extra: Optional[dict] = None,
+    ) -> None:
+        """
+        Adds deltas to total_net_fee_cents of `model`, creating missing rows.
+
+        Keys are processed in sorted order, which fixes the row lock order.
+        """
+        if not deltas:
+            return
+
+        extra = extra or {}
+        keys = sorted(deltas)
+
+        # Multi-VALUES INSERT ... ON CONFLICT DO UPDATE (SQLite supports the
+        # same upsert syntax): one statement per UPSERT_CHUNK_ROWS keys
+        insert = pg_insert if self.is_postgres else sqlite_insert
+        for start in range(0, len(keys), UPSERT_CHUNK_ROWS):
+            stmt = insert(model).values([
+                {
+                    **dict(zip(key_fields, key)),
+                    "total_net_fee_cents": deltas[key],
+                    **extra,
+                }
+                for key in keys[start:start + UPSERT_CHUNK_ROWS]
+            ])
 
             stmt = stmt.on_conflict_do_update(
-                index_elements=["provider_npi"],
+                index_elements=list(key_fields),
                 set_={
                     "total_net_fee_cents":
-                        ProviderNetFeeAggregate.total_net_fee_cents
+                        model.total_net_fee_cents
                         + stmt.excluded.total_net_fee_cents,
-                    "updated_at": stmt.excluded.updated_at,
+                    **{name: stmt.excluded[name] for name in extra},
                 },
             )
             self.session.execute(stmt)
-        else:
-            # SQLite: Use INSERT OR REPLACE or manual upsert
-            existing = self.session.get(ProviderNetFeeAggregate, provider_npi)
-            if existing:
-                existing.total_net_fee_cents += delta_cents
-                existing.updated_at = utc_now()
-                self.session.add(existing)
-            else:
-                new_aggregate = ProviderNetFeeAggregate(
-                    provider_npi=provider_npi,
-                    total_net_fee_cents=delta_cents,
-                    updated_at=utc_now(),
+
+    def get_top(
+        self,
+        limit: int,
+        after_total: Optional[int] = None,
+        after_npi: Optional[str] = None,
+    ) -> list[tuple[str, int]]:
+        """
+        Returns (provider_npi, total_net_fee_cents) ranked highest first.
+
+        Ties are broken by provider_npi. Passing the last row's
+        (total_net_fee_cents, provider_npi) as the cursor returns the next
+        page by seeking the composite ranking index instead of using OFFSET.
+        With sharding enabled, unfolded shard rows are added in at read time.
+        """
+        if self.sharded:
+            return self._get_top_with_shards(limit, after_total, after_npi)
+        return self._get_top_unsharded(limit, after_total, after_npi)
+
+    def _get_top_unsharded(
+        self,
+        limit: int,
+        after_total: Optional[int],
+        after_npi: Optional[str],
+    ) -> list[tuple[str, int]]:
+        """Ranks provider_net_fee_aggregate rows alone, seeking the ranking index."""
+        stmt = select(
+            ProviderNetFeeAggregate.provider_npi,
+            ProviderNetFeeAggregate.total_net_fee_cents,
+        )
+        if after_total is not None and after_npi is not None:
+            # The first conjunct is implied by the second but gives the
+            # planner an index range starting at the cursor; the OR alone
+            # is filtered from the top of the index
+            stmt = stmt.where(
+                ProviderNetFeeAggregate.total_net_fee_cents <= after_total,
+                or_(
+                    ProviderNetFeeAggregate.total_net_fee_cents < after_total,
+                    and_(
+                        ProviderNetFeeAggregate.total_net_fee_cents == after_total,
+                        ProviderNetFeeAggregate.provider_npi > after_npi,
+                    ),
                 )
-                self.session.add(new_aggregate)
+            )
+        stmt = stmt.order_by(
+            ProviderNetFeeAggregate.total_net_fee_cents.desc(),
+            ProviderNetFeeAggregate.provider_npi,
+        ).limit(limit)
+        return [tuple(row) for row in self.session.exec(stmt).all()]
+
+    def _get_top_with_shards(
+        self,
+        limit: int,
+        after_total: Optional[int],
+        after_npi: Optional[str],
+    ) -> list[tuple[str, int]]:
+        """
+        get_top when shard rows may not be folded yet.
+
+        Only providers with shard rows have a total other than their
+        aggregate row, so the ranking index still yields everyone else in
+        order: the first limit + (providers with shards) index rows past
+        the cursor contain the top `limit` of them. Those are merged with
+        the exact totals of the providers with shards. Shard rows are
+        summed in full, so this costs O(unfolded shard rows) on top of the
+        index seek; compaction (app.cli.compact_aggregates) keeps that small.
+        """
+        # Exact totals of the providers with shard rows
+        shard_totals = {
+            provider_npi: int(shard_total) + (aggregate_total or 0)
+            for provider_npi, shard_total, aggregate_total in self.session.exec(
+                select(
+                    ProviderNetFeeShard.provider_npi,
+                    func.sum(ProviderNetFeeShard.total_net_fee_cents),
+                    ProviderNetFeeAggregate.total_net_fee_cents,
+                )
+                .outerjoin(
+                    ProviderNetFeeAggregate,
+                    ProviderNetFeeAggregate.provider_npi == ProviderNetFeeShard.provider_npi,
+                )
+                .group_by(
+                    ProviderNetFeeShard.provider_npi,
+                    ProviderNetFeeAggregate.total_net_fee_cents,
+                )
+            )
+        }
+
+        candidates = [
+            (provider_npi, total)
+            for provider_npi, total in self._get_top_unsharded(
+                limit + len(shard_totals), after_total, after_npi
+            )
+            if provider_npi not in shard_totals
+        ]
+        for provider_npi, total in shard_totals.items():
+            if after_total is None or after_npi is None or (
+                total < after_total or (total == after_total and provider_npi > after_npi)
+            ):
+                candidates.append((provider_npi, total))
+
+        candidates.sort(key=lambda row: (-row[1], row[0]))
+        return candidates[:limit]
+
+    def get_top_in_window(
+        self,
+        limit: int,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        after_total: Optional[int] = None,
+        after_npi: Optional[str] = None,
+    ) -> list[tuple[str, int]]:
+        """
+        Ranks providers by net fees for service days in [from_date, to_date].
+
+        Sums only the daily buckets (and their shards) inside the window, so
+        the cost is O(days x providers) rather than a scan of claim_lines.
+        Either bound may be omitted. Uses the same keyset cursor as get_top.
+        """
+        conditions = []
+        if from_date is not None:
+            conditions.append(ProviderDailyNetFeeAggregate.bucket_date >= from_date)
+        if to_date is not None:
+            conditions.append(ProviderDailyNetFeeAggregate.bucket_date <= to_date)
+        return self._ranked(
+            ProviderDailyNetFeeAggregate.provider_npi,
+            func.sum(ProviderDailyNetFeeAggregate.total_net_fee_cents),
+            limit,
+            after_total,
+            after_npi,
+            conditions,
+        )
+
+    def _ranked(
+        self,
+        provider_npi,
+        total,
+        limit: int,
+        after_total: Optional[int],
+        after_npi: Optional[str],
+        conditions: Optional[list] = None,
+    ) -> list[tuple[str, int]]:
+        """Ranks `total` grouped by `provider_npi`, with a keyset cursor on the sum."""
+        stmt = select(provider_npi, total)
+        if conditions:
+            stmt = stmt.where(*conditions)
+        stmt = stmt.group_by(provider_npi)
+        if after_total is not None and after_npi is not None:
+            stmt = stmt.having(
+                total <= after_total,
+                or_(
+                    total < after_total,
+                    and_(total == after_total, provider_npi > after_npi),
+                )
+            )
+        stmt = stmt.order_by(total.desc(), provider_npi).limit(limit)
+        return [tuple(row) for row in self.session.exec(stmt).all()]
@@ -0,0 +1,63 @@
+from sqlalchemy import delete, func, insert
+from sqlmodel import Session, select
+from datetime import date
+from typing import Optional
+
+from app.models.provider_fee_delta import ProviderFeeDelta, utc_now
+
+
+class ProviderFeeDeltaRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def append_many(self, deltas: dict[tuple[str, date], int]) -> None:
+        """Appends (provider_npi, service day) deltas; takes no row locks."""
+        if not deltas:
+            return
+        now = utc_now()
+        self.session.execute(
+            insert(ProviderFeeDelta.__table__),
+            [
+                {
+                    "provider_npi": provider_npi,
+                    "bucket_date": bucket_date,
+                    "delta_cents": delta,
+                    "created_at": now,
+                }
+                for (provider_npi, bucket_date), delta in deltas.items()
+            ],
+        )
+
+    def take_batch(self, limit: int) -> list[tuple[str, date, int]]:
+        """
+        Deletes up to `limit` of the oldest ledger rows and returns them.
+
+        Rows locked by a concurrent flusher are skipped, so several workers
+        can flush at once without blocking or double counting.
+        """
+        ids = (
+            select(ProviderFeeDelta.id)
+            .order_by(ProviderFeeDelta.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            delete(ProviderFeeDelta)
+            .where(ProviderFeeDelta.id.in_(ids.scalar_subquery()))
+            .returning(
+                ProviderFeeDelta.provider_npi,
+                ProviderFeeDelta.bucket_date,
+                ProviderFeeDelta.delta_cents,
+            )
+        )
+        return [tuple(row) for row in self.session.execute(stmt).all()]
+
+    def pending_sums(self, after_npi: Optional[str], upto_npi: Optional[str]) -> dict[str, int]:
+        """Unflushed deltas per provider for NPIs in (after_npi, upto_npi]."""
+        stmt = select(ProviderFeeDelta.provider_npi, func.sum(ProviderFeeDelta.delta_cents))
+        if after_npi is not None:
+            stmt = stmt.where(ProviderFeeDelta.provider_npi > after_npi)
+        if upto_npi is not None:
+            stmt = stmt.where(ProviderFeeDelta.provider_npi <= upto_npi)
+        stmt = stmt.group_by(ProviderFeeDelta.provider_npi)
+        return {provider_npi: int(total) for provider_npi, total in self.session.exec(stmt)}
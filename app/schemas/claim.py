@@ -3,6 +3,8 @@ from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
+from app.core.config import settings
+
 class ClaimLineInput(BaseModel):
     service_date: datetime
     submitted_procedure: str
@@ -24,3 +26,45 @@ class ClaimCreateRequest(BaseModel):
 class ClaimCreateResponse(BaseModel):
     claim_id: UUID
     message: str = "Claim processed successfully"
+
+
+class ClaimBatchCreateRequest(BaseModel):
+    claims: List[ClaimCreateRequest] = Field(
+        min_length=1,
+        max_length=settings.claim_batch_max_size,
+        description="Claims to ingest in a single transaction",
+    )
+
+
+class ClaimBatchResult(BaseModel):
+    index: int
+    claim_id: Optional[UUID] = None
+    error: Optional[str] = None
+
+
+class ClaimBatchCreateResponse(BaseModel):
+    processed: int
+    failed: int
+    results: List[ClaimBatchResult]
+
+
+class ClaimLineResponse(BaseModel):
+    id: int
+    service_date: datetime
+    submitted_procedure: str
+    quadrant: Optional[str] = None
+    plan_group: str
+    subscriber_id: str
+    provider_npi: str
+    provider_fees_cents: int
+    allowed_fees_cents: int
+    member_coinsurance_cents: int
+    member_copay_cents: int
+    net_fee_cents: int
+
+
+class ClaimResponse(BaseModel):
+    claim_id: UUID
+    claim_reference: Optional[str] = None
+    created_at: datetime
+    lines: List[ClaimLineResponse]
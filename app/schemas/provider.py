@@ -1,5 +1,16 @@
+from datetime import datetime
+from uuid import UUID
+
 from pydantic import BaseModel
 
 class TopProviderResponse(BaseModel):
     provider_npi: str
     total_net_fee_cents: int
+
+
+class ProviderLineResponse(BaseModel):
+    id: int
+    claim_id: UUID
+    service_date: datetime
+    submitted_procedure: str
+    net_fee_cents: int
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from datetime import date
+
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.session import engine
+from app.repositories.provider_aggregate_repo import ProviderAggregateRepository
+from app.repositories.provider_fee_delta_repo import ProviderFeeDeltaRepository
+from app.services.leaderboard_cache import mark_aggregates_dirty
+
+logger = logging.getLogger(__name__)
+
+
+def flush_ledger(session: Session, batch_size: int) -> int:
+    """
+    Folds the provider_fee_delta ledger into the aggregate tables.
+
+    Each batch is taken, summed per provider and per (provider, day), and
+    applied with one grouped upsert per table in its own transaction.
+    Returns the number of ledger rows folded.
+    """
+    folded = 0
+    while True:
+        with session.begin():
+            rows = ProviderFeeDeltaRepository(session).take_batch(batch_size)
+            if not rows:
+                break
+
+            totals: dict[str, int] = {}
+            daily: dict[tuple[str, date], int] = {}
+            for provider_npi, bucket_date, delta in rows:
+                totals[provider_npi] = totals.get(provider_npi, 0) + delta
+                key = (provider_npi, bucket_date)
+                daily[key] = daily.get(key, 0) + delta
+
+            # The flusher is the only writer of aggregates in ledger mode,
+            # so it bypasses sharding and writes the aggregate rows directly
+            agg_repo = ProviderAggregateRepository(session, shard_count=1)
+            agg_repo.increment_many(totals)
+            agg_repo.increment_daily_many(daily)
+            mark_aggregates_dirty(session)
+
+        folded += len(rows)
+        if len(rows) < batch_size:
+            break
+    return folded
+
+
+def _flush_ledger_with_engine() -> int:
+    with Session(engine) as session:
+        return flush_ledger(session, settings.aggregate_flush_batch_size)
+
+
+async def run_ledger_flusher(interval_seconds: float) -> None:
+    """Background loop that flushes the ledger every `interval_seconds`."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            folded = await run_in_threadpool(_flush_ledger_with_engine)
+            if folded:
+                logger.debug(f"Folded {folded} provider fee deltas")
+        except Exception as e:
+            logger.exception(f"Failed to flush provider fee ledger: {str(e)}")
@@ -0,0 +1,121 @@
+"""
+Detects and repairs drift between claim_lines and provider_net_fee_aggregate.
+
+Providers are checked in chunks of `chunk_size` consecutive NPIs. For each
+chunk, the expected totals (SUM(net_fee_cents) from claim_lines) and the
+recorded totals (aggregate + unfolded shard rows + unflushed ledger
+deltas) are read in one REPEATABLE READ snapshot on PostgreSQL. Claims
+write their lines and their aggregate deltas in the same transaction, so
+the two sides of a snapshot always agree unless there is real drift.
+
+Mismatches are patched in a second, short transaction by *adding* the
+difference (expected - recorded) through the regular aggregate upsert.
+Claims committed between the two transactions add their own deltas to
+both sides, so applying a difference stays correct under concurrent
+ingest. Reads take no locks, and each patch only locks the mismatched
+rows, in NPI order.
+
+Daily buckets (provider_net_fee_daily) are not checked; rebuild them
+with `python -m app.cli.backfill --rebuild-only`.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlmodel import Session
+
+from app.repositories.claim_service_line_repo import ClaimServiceLineRepository
+from app.repositories.provider_aggregate_repo import ProviderAggregateRepository
+from app.repositories.provider_fee_delta_repo import ProviderFeeDeltaRepository
+from app.services.leaderboard_cache import mark_aggregates_dirty
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReconcileStats:
+    chunks: int = 0
+    providers_checked: int = 0
+    # Providers whose recorded total differs from claim_lines
+    mismatched: int = 0
+    # ...of which had no aggregate row at all / no claim lines at all
+    missing: int = 0
+    orphaned: int = 0
+    # Sum of |expected - recorded| over mismatched providers
+    drift_cents: int = 0
+    max_drift_cents: int = 0
+    patched: int = 0
+
+
+def _read_chunk(
+    session: Session,
+    after_npi: Optional[str],
+    chunk_size: int,
+) -> tuple[Optional[str], dict[str, int], dict[str, int]]:
+    """
+    Returns (chunk upper bound, expected totals, recorded totals) for the
+    next chunk after `after_npi`. An upper bound of None means the chunk
+    is open-ended, i.e. the last one.
+    """
+    with session.begin():
+        if "postgresql" in str(session.bind.url):
+            # Both sides must come from one snapshot; must be set before
+            # the transaction's first statement
+            session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        line_repo = ClaimServiceLineRepository(session)
+        upto_npi = line_repo.provider_npi_at_offset(after_npi, chunk_size - 1)
+        expected = line_repo.net_fee_sums(after_npi, upto_npi)
+
+        recorded = ProviderAggregateRepository(session).totals_in_range(after_npi, upto_npi)
+        pending = ProviderFeeDeltaRepository(session).pending_sums(after_npi, upto_npi)
+        for provider_npi, delta in pending.items():
+            recorded[provider_npi] = recorded.get(provider_npi, 0) + delta
+
+    return upto_npi, expected, recorded
+
+
+def reconcile_aggregates(
+    session: Session,
+    chunk_size: int,
+    dry_run: bool = False,
+) -> ReconcileStats:
+    """
+    Compares every provider's aggregate with claim_lines and, unless
+    `dry_run`, patches the mismatched ones. The session must not have a
+    transaction in progress; each chunk uses its own short transactions.
+    """
+    stats = ReconcileStats()
+    after_npi: Optional[str] = None
+
+    while True:
+        upto_npi, expected, recorded = _read_chunk(session, after_npi, chunk_size)
+        stats.chunks += 1
+        stats.providers_checked += len(expected.keys() | recorded.keys())
+
+        diffs: dict[str, int] = {}
+        for provider_npi in expected.keys() | recorded.keys():
+            diff = expected.get(provider_npi, 0) - recorded.get(provider_npi, 0)
+            if diff == 0 and (provider_npi in recorded or provider_npi not in expected):
+                continue
+            diffs[provider_npi] = diff
+            stats.mismatched += 1
+            stats.missing += provider_npi not in recorded
+            stats.orphaned += provider_npi not in expected
+            stats.drift_cents += abs(diff)
+            stats.max_drift_cents = max(stats.max_drift_cents, abs(diff))
+            logger.warning(
+                f"Aggregate drift for provider {provider_npi}: "
+                f"expected {expected.get(provider_npi, 0)}, recorded {recorded.get(provider_npi, 0)}"
+            )
+
+        if diffs and not dry_run:
+            with session.begin():
+                # Patch the aggregate rows directly, whatever the shard setting
+                ProviderAggregateRepository(session, shard_count=1).increment_many(diffs)
+                mark_aggregates_dirty(session)
+            stats.patched += len(diffs)
+
+        if upto_npi is None:
+            return stats
+        after_npi = upto_npi
@@ -0,0 +1,287 @@
+"""
+Bulk loader for historical claim backfills.
+
+Claims are read from CSV or JSONL, validated and priced with the same
+rules as the API (see build_line_rows), and written to PostgreSQL with
+psycopg 3's COPY ... FROM STDIN in bounded chunks. Provider aggregates
+(all-time and daily) are rebuilt once at the end with INSERT ... SELECT
+... GROUP BY instead of being incremented per claim.
+"""
+import csv
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+
+from app.core.ids import new_claim_id
+from app.models.claim import utc_now
+from app.services.claim_service import parse_line_amounts, price_line_rows
+
+LINE_FIELDS = (
+    "service_date",
+    "submitted_procedure",
+    "quadrant",
+    "plan_group",
+    "subscriber_id",
+    "provider_npi",
+    "provider_fees",
+    "allowed_fees",
+    "member_coinsurance",
+    "member_copay",
+)
+
+CLAIM_COLUMNS = ("id", "claim_reference", "created_at")
+
+LINE_COLUMNS = (
+    "claim_id",
+    "service_date",
+    "plan_group",
+    "subscriber_id",
+    "provider_npi",
+    "submitted_procedure",
+    "quadrant",
+    "provider_fees_cents",
+    "allowed_fees_cents",
+    "member_coinsurance_cents",
+    "member_copay_cents",
+    "net_fee_cents",
+    "created_at",
+)
+
+REBUILD_AGGREGATES_SQL = """
+INSERT INTO provider_net_fee_aggregate (provider_npi, total_net_fee_cents, updated_at)
+SELECT provider_npi, SUM(net_fee_cents), now()
+FROM claim_lines
+GROUP BY provider_npi
+"""
+
+REBUILD_DAILY_AGGREGATES_SQL = """
+INSERT INTO provider_net_fee_daily (provider_npi, bucket_date, shard, total_net_fee_cents)
+SELECT provider_npi, CAST(service_date AS date), 0, SUM(net_fee_cents)
+FROM claim_lines
+GROUP BY provider_npi, CAST(service_date AS date)
+"""
+
+
+def _normalize_header(name: str) -> str:
+    return name.strip().lower().replace(" ", "_").replace("/", "_")
+
+
+def _parse_line(raw: dict) -> dict:
+    """Converts a raw CSV/JSON line into the shape build_line_rows expects."""
+    if not isinstance(raw, dict):
+        raise ValueError("lines must be a list of objects")
+    line = {}
+    for name in LINE_FIELDS:
+        value = raw.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, ""):
+            if name == "quadrant":
+                line[name] = None
+                continue
+            raise ValueError(f"{name} is required")
+        line[name] = value
+
+    # Checked here so a bad date rejects the claim instead of failing its COPY chunk
+    if not isinstance(line["service_date"], datetime):
+        try:
+            line["service_date"] = datetime.fromisoformat(line["service_date"])
+        except (TypeError, ValueError):
+            raise ValueError("service_date must be an ISO 8601 date or datetime") from None
+    return line
+
+
+def read_csv_claims(stream: TextIO) -> Iterator[dict]:
+    """
+    Yields claim payloads from a CSV file with one service line per row.
+
+    Consecutive rows sharing a claim_reference form one claim; rows without
+    a claim_reference column or value are loaded as single-line claims.
+    """
+    reader = csv.DictReader(stream)
+    reader.fieldnames = [_normalize_header(name) for name in reader.fieldnames or []]
+
+    current: Optional[dict] = None
+    for raw in reader:
+        reference = (raw.get("claim_reference") or "").strip() or None
+        if current is not None and reference is not None and reference == current["claim_reference"]:
+            current["lines"].append(raw)
+            continue
+        if current is not None:
+            yield current
+        current = {"claim_reference": reference, "lines": [raw]}
+
+    if current is not None:
+        yield current
+
+
+@dataclass
+class UnreadableClaim:
+    """Yielded by a reader for a record it cannot parse; prepare_claim rejects it."""
+    error: str
+
+
+def read_jsonl_claims(stream: TextIO) -> Iterator[dict]:
+    """
+    Yields claim payloads from JSONL shaped like ClaimCreateRequest.
+
+    A line that is not a JSON object yields an UnreadableClaim naming the
+    line number, so one bad line is rejected like an invalid claim instead
+    of aborting the load.
+    """
+    for number, raw in enumerate(stream, start=1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            payload = json.loads(raw)
+        except json.JSONDecodeError as e:
+            yield UnreadableClaim(f"line {number}: invalid JSON ({e.msg} at column {e.colno})")
+            continue
+        if not isinstance(payload, dict):
+            yield UnreadableClaim(f"line {number}: expected a JSON object")
+            continue
+        yield payload
+
+
+READERS: dict[str, Callable[[TextIO], Iterator[dict]]] = {
+    "csv": read_csv_claims,
+    "jsonl": read_jsonl_claims,
+}
+
+
+@dataclass
+class BackfillStats:
+    claims_loaded: int = 0
+    lines_loaded: int = 0
+    claims_rejected: int = 0
+    chunks: int = 0
+    aggregates_rebuilt: int = 0
+
+
+def parse_claim(payload: dict) -> tuple[Optional[str], list[dict], list[int]]:
+    """
+    Validates one claim payload; returns its claim_reference, parsed lines
+    and their amounts in cents (see parse_line_amounts).
+
+    Raises ValueError if any line is invalid; the whole claim is rejected,
+    matching POST /claims. An UnreadableClaim is rejected with its error.
+    """
+    if isinstance(payload, UnreadableClaim):
+        raise ValueError(payload.error)
+    lines = payload.get("lines") or []
+    if not lines:
+        raise ValueError("At least one claim line is required")
+    if not isinstance(lines, list):
+        raise ValueError("lines must be a list of objects")
+
+    parsed = [_parse_line(line) for line in lines]
+    return payload.get("claim_reference"), parsed, parse_line_amounts(parsed)
+
+
+def price_claims(
+    claims: list[tuple[Optional[str], list[dict], list[int]]],
+) -> tuple[list[tuple], list[tuple]]:
+    """
+    COPY rows (claims, lines) for claims returned by parse_claim.
+
+    Net fees are computed for all their lines at once, so the NumPy engine
+    applies per chunk rather than per (usually small) claim.
+    """
+    created_at = utc_now()
+    claim_rows = [(new_claim_id(), reference, created_at) for reference, _, _ in claims]
+    priced = price_line_rows(
+        [(claim_row[0], lines, amounts) for claim_row, (_, lines, amounts) in zip(claim_rows, claims)],
+        created_at,
+    )
+    line_rows = [tuple(row[c] for c in LINE_COLUMNS) for rows in priced for row in rows]
+    return claim_rows, line_rows
+
+
+def prepare_claim(payload: dict) -> tuple[tuple, list[tuple]]:
+    """Validates one claim payload and returns its COPY rows."""
+    claim_rows, line_rows = price_claims([parse_claim(payload)])
+    return claim_rows[0], line_rows
+
+
+class ClaimBackfillLoader:
+    """
+    Streams validated claims into PostgreSQL with COPY.
+
+    `connection` is a psycopg 3 connection. Each chunk of roughly
+    `chunk_size` lines is written with two COPY statements and committed,
+    so memory stays bounded and a failure only loses the current chunk.
+    """
+
+    def __init__(self, connection, chunk_size: int):
+        self.connection = connection
+        self.chunk_size = chunk_size
+
+    def load(
+        self,
+        payloads: Iterable[dict],
+        on_error: Optional[Callable[[int, str], None]] = None,
+    ) -> BackfillStats:
+        stats = BackfillStats()
+        claims: list[tuple[Optional[str], list[dict], list[int]]] = []
+        line_count = 0
+
+        for index, payload in enumerate(payloads):
+            try:
+                claim = parse_claim(payload)
+            except ValueError as e:
+                stats.claims_rejected += 1
+                if on_error is not None:
+                    on_error(index, str(e))
+                continue
+
+            claims.append(claim)
+            line_count += len(claim[1])
+            if line_count >= self.chunk_size:
+                self._copy_chunk(*price_claims(claims), stats)
+                claims, line_count = [], 0
+
+        if claims:
+            self._copy_chunk(*price_claims(claims), stats)
+
+        return stats
+
+    def rebuild_aggregates(self) -> int:
+        """
+        Replaces the all-time and daily provider aggregates with sums over
+        claim_lines. Returns the number of all-time aggregate rows.
+
+        Unflushed ledger deltas (AGGREGATE_WRITE_MODE=ledger) are deleted in
+        the same transaction, since the rebuilt sums already include their
+        lines. The ledger is locked first, so claims committed after the
+        rebuild's snapshot keep their deltas and in-flight flushes finish.
+        """
+        with self.connection.transaction():
+            with self.connection.cursor() as cur:
+                cur.execute("LOCK TABLE provider_fee_delta IN EXCLUSIVE MODE")
+                cur.execute("DELETE FROM provider_fee_delta")
+                cur.execute("DELETE FROM provider_net_fee_daily")
+                cur.execute(REBUILD_DAILY_AGGREGATES_SQL)
+                cur.execute("DELETE FROM provider_net_fee_shard")
+                cur.execute("DELETE FROM provider_net_fee_aggregate")
+                cur.execute(REBUILD_AGGREGATES_SQL)
+                return cur.rowcount
+
+    def _copy_chunk(self, claim_rows: list[tuple], line_rows: list[tuple], stats: BackfillStats) -> None:
+        with self.connection.transaction():
+            with self.connection.cursor() as cur:
+                with cur.copy(
+                    f"COPY claims ({', '.join(CLAIM_COLUMNS)}) FROM STDIN"
+                ) as copy:
+                    for row in claim_rows:
+                        copy.write_row(row)
+                with cur.copy(
+                    f"COPY claim_lines ({', '.join(LINE_COLUMNS)}) FROM STDIN"
+                ) as copy:
+                    for row in line_rows:
+                        copy.write_row(row)
+
+        stats.claims_loaded += len(claim_rows)
+        stats.lines_loaded += len(line_rows)
+        stats.chunks += 1
@@ -0,0 +1,123 @@
+"""
+Streaming export of claim_lines as NDJSON or CSV.
+
+Rows are read through a server-side cursor (stream_results + yield_per),
+so the database hands them over `batch_size` at a time and neither the
+driver nor the ORM ever holds the whole result set. Rows stay plain Core
+tuples; no ClaimLine instances are built. Each batch is encoded into one
+text chunk, so memory use depends on the batch size, not the export size.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Iterable, Iterator, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
+
+from app.models.claim_line import ClaimLine
+
+EXPORT_COLUMNS = (
+    "id",
+    "claim_id",
+    "service_date",
+    "plan_group",
+    "subscriber_id",
+    "provider_npi",
+    "submitted_procedure",
+    "quadrant",
+    "provider_fees_cents",
+    "allowed_fees_cents",
+    "member_coinsurance_cents",
+    "member_copay_cents",
+    "net_fee_cents",
+    "created_at",
+)
+
+
+def _export_query(from_date: Optional[date], to_date: Optional[date]):
+    table = ClaimLine.__table__
+    stmt = select(*(table.c[name] for name in EXPORT_COLUMNS))
+    if from_date is not None:
+        stmt = stmt.where(table.c.service_date >= datetime.combine(from_date, time.min))
+    if to_date is not None:
+        # `to_date` is inclusive
+        stmt = stmt.where(
+            table.c.service_date < datetime.combine(to_date + timedelta(days=1), time.min)
+        )
+    return stmt.order_by(table.c.id)
+
+
+def iter_line_batches(
+    connection: Connection,
+    batch_size: int,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+) -> Iterator[list[tuple]]:
+    """Yields claim_lines rows in id order, `batch_size` rows at a time."""
+    result = connection.execution_options(
+        stream_results=True,
+        yield_per=batch_size,
+    ).execute(_export_query(from_date, to_date))
+    for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode_ndjson(batches: Iterable[list[tuple]]) -> Iterator[str]:
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_default) + "\n"
+            for row in rows
+        )
+
+
+def encode_csv(batches: Iterable[list[tuple]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in rows
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+# format -> (media type, encoder)
+EXPORT_FORMATS: dict[str, tuple[str, Callable[[Iterable[list[tuple]]], Iterator[str]]]] = {
+    "ndjson": ("application/x-ndjson", encode_ndjson),
+    "csv": ("text/csv", encode_csv),
+}
+
+
+def stream_export(
+    engine: Engine,
+    fmt: str,
+    batch_size: int,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+) -> Iterator[str]:
+    """
+    Encodes every matching claim line in `fmt`, one chunk per batch.
+
+    Opens its own connection, held until the generator is exhausted or
+    closed, so it can outlive the request's session.
+    """
+    _, encode = EXPORT_FORMATS[fmt]
+    with engine.connect() as connection:
+        yield from encode(iter_line_batches(connection, batch_size, from_date, to_date))
@@ -1,16 +1,158 @@
+from datetime import date, datetime
 from sqlmodel import Session
-from uuid import uuid4
+from typing import Optional
+from uuid import UUID
 
-from app.models.claim import Claim
-from app.models.claim_line import ClaimLine
+from app.core.config import settings
+from app.core.metrics import time_claim_stage
+from app.core.ids import new_claim_id
+from app.models.claim import Claim, utc_now
 from app.repositories.claim_repo import ClaimRepository
 from app.repositories.claim_service_line_repo import ClaimServiceLineRepository
 from app.repositories.provider_aggregate_repo import ProviderAggregateRepository
-from app.services.money import dollars_to_cents
-from app.services.validation import (
-    SUBMITTED_PROCEDURE_RULE,
-    PROVIDER_NPI_RULE,
-)
+from app.repositories.outbox_repo import OutboxRepository
+from app.repositories.provider_fee_delta_repo import ProviderFeeDeltaRepository
+from app.services.leaderboard_cache import mark_aggregates_dirty
+from app.services.money import dollars_to_cents, dollars_to_cents_many
+from app.services.payments_integration import CLAIM_PROCESSED
+from app.services.validation import CLAIM_LINE_RULES, LineValidationError
+
+MONEY_FIELDS = ("provider_fees", "allowed_fees", "member_coinsurance", "member_copay")
+
+
+def use_numpy_engine(line_count: int) -> bool:
+    return (
+        settings.net_fee_engine == "numpy"
+        and line_count >= settings.net_fee_numpy_min_lines
+    )
+
+
+def _numpy_engine():
+    # Imported on first use, so NumPy is only loaded with NET_FEE_ENGINE=numpy
+    from app.services import net_fee_engine
+    return net_fee_engine
+
+
+def _money_errors(lines: list[dict]) -> list[tuple[int, str]]:
+    """Parses amounts one by one to report every malformed one (error path only)."""
+    errors = []
+    for index, line in enumerate(lines):
+        for field in MONEY_FIELDS:
+            try:
+                dollars_to_cents(line[field], settings.money_rounding)
+            except ValueError as e:
+                errors.append((index, f"{field}: {e}"))
+    return errors
+
+
+def build_line_rows(
+    claim_id: UUID,
+    lines: list[dict],
+    created_at: Optional[datetime] = None,
+) -> list[dict]:
+    """
+    Validates claim lines and computes their net fees.
+
+    Returns plain claim_lines column dicts ready for a bulk insert or COPY.
+    Raises LineValidationError (a ValueError) listing every invalid field
+    of every line, with line indexes.
+    """
+    amounts = parse_line_amounts(lines)
+    return price_line_rows([(claim_id, lines, amounts)], created_at)[0]
+
+
+def parse_line_amounts(lines: list[dict]) -> list[int]:
+    """
+    Validates claim lines and parses their amounts to cents, four per line
+    in MONEY_FIELDS order. Raises LineValidationError like build_line_rows.
+    """
+    # ---- Validation ----
+    with time_claim_stage("validation"):
+        errors = CLAIM_LINE_RULES.collect_errors(lines)
+
+    # ---- Money parsing (all four amounts of every line in one pass) ----
+    with time_claim_stage("money_parsing"):
+        try:
+            amounts = dollars_to_cents_many(
+                [line[field] for line in lines for field in MONEY_FIELDS],
+                settings.money_rounding,
+            )
+        except ValueError:
+            errors.extend(_money_errors(lines))
+            errors.sort(key=lambda error: error[0])
+
+    if errors:
+        raise LineValidationError(errors)
+    return amounts
+
+
+def price_line_rows(
+    claims: list[tuple[UUID, list[dict], list[int]]],
+    created_at: Optional[datetime] = None,
+) -> list[list[dict]]:
+    """
+    claim_lines rows per claim from (claim_id, lines, parse_line_amounts).
+
+    Net fees of all the claims' lines are computed together, so batches
+    and backfill chunks reach NET_FEE_NUMPY_MIN_LINES as a whole.
+    """
+    created_at = created_at or utc_now()
+    with time_claim_stage("net_fees"):
+        amounts = [amount for _, _, claim_amounts in claims for amount in claim_amounts]
+        if use_numpy_engine(len(amounts) // 4):
+            net_fees = _numpy_engine().net_fees_from_amounts(amounts)
+        else:
+            net_fees = None
+
+        priced: list[list[dict]] = []
+        offset = 0
+        for claim_id, lines, _ in claims:
+            priced.append(_priced_rows(claim_id, lines, amounts, offset, net_fees, created_at))
+            offset += len(lines)
+        return priced
+
+
+def _priced_rows(
+    claim_id: UUID,
+    lines: list[dict],
+    amounts: list[int],
+    offset: int,
+    net_fees: Optional[list[int]],
+    created_at: datetime,
+) -> list[dict]:
+    """
+    claim_lines rows for `lines`, whose amounts (and net fees, when
+    precomputed) start at line `offset` of `amounts` / `net_fees`.
+    """
+    line_rows: list[dict] = []
+
+    for index, line in enumerate(lines, start=offset):
+        provider_fees, allowed_fees, coinsurance, copay = amounts[4 * index:4 * index + 4]
+
+        # ---- Net fee computation ----
+        if net_fees is not None:
+            net_fee = net_fees[index]
+        else:
+            net_fee = provider_fees + coinsurance + copay - allowed_fees
+
+        line_rows.append({
+            "claim_id": claim_id,
+            "service_date": line["service_date"],
+            "plan_group": line["plan_group"],
+            "subscriber_id": line["subscriber_id"],
+            "provider_npi": line["provider_npi"],
+            "submitted_procedure": line["submitted_procedure"],
+            "quadrant": line.get("quadrant"),
+            "provider_fees_cents": provider_fees,
+            "allowed_fees_cents": allowed_fees,
+            "member_coinsurance_cents": coinsurance,
+            "member_copay_cents": copay,
+            "net_fee_cents": net_fee,
+            "created_at": created_at,
+        })
+
+    return line_rows
+
 
 class ClaimService:
     def __init__(self, session: Session):
@@ -18,64 +160,187 @@ class ClaimService:
         self.claim_repo = ClaimRepository(session)
         self.line_repo = ClaimServiceLineRepository(session)
         self.provider_agg_repo = ProviderAggregateRepository(session)
+        self.fee_delta_repo = ProviderFeeDeltaRepository(session)
+        self.outbox_repo = OutboxRepository(session)
 
     def process_claim(self, payload: dict) -> Claim:
         """
         Orchestrates full claim processing in a single transaction.
+
+        In idempotent mode, a claim_reference that was already ingested
+        returns the original claim without writing anything else.
         """
 
         claim = Claim(
-            id=uuid4(),
+            id=new_claim_id(),
             claim_reference=payload.get("claim_reference"),
         )
 
-        self.claim_repo.create(claim)
+        line_rows = build_line_rows(claim.id, payload["lines"])
 
-        service_lines: list[ClaimLine] = []
+        return self._persist([(claim, line_rows)])[0]
 
-        for line in payload["lines"]:
-            # ---- Validation ----
-            SUBMITTED_PROCEDURE_RULE.validate(line["submitted_procedure"])
-            PROVIDER_NPI_RULE.validate(line["provider_npi"])
-
-            # ---- Money parsing ----
-            provider_fees = dollars_to_cents(line["provider_fees"])
-            allowed_fees = dollars_to_cents(line["allowed_fees"])
-            coinsurance = dollars_to_cents(line["member_coinsurance"])
-            copay = dollars_to_cents(line["member_copay"])
+    def process_claims(self, payloads: list[dict]) -> list[Claim | ValueError]:
+        """
+        Batch counterpart of process_claim.
 
-            # ---- Net fee computation ----
-            net_fee = provider_fees + coinsurance + copay - allowed_fees
+        Each claim is validated independently; a claim that fails validation
+        is reported in its slot of the returned list and skipped, while all
+        valid claims are persisted together with one flush for the claims,
+        one bulk insert for the lines and one upsert per aggregate table.
+        """
+        results: list[Claim | ValueError] = []
+        parsed: list[tuple[UUID, list[dict], list[int]]] = []
+        claims: list[Claim] = []
 
-            service_line = ClaimLine(
-                claim_id=claim.id,
-                service_date=line["service_date"],
-                plan_group=line["plan_group"],
-                subscriber_id=line["subscriber_id"],
-                provider_npi=line["provider_npi"],
-                submitted_procedure=line["submitted_procedure"],
-                quadrant=line.get("quadrant"),
-                provider_fees_cents=provider_fees,
-                allowed_fees_cents=allowed_fees,
-                member_coinsurance_cents=coinsurance,
-                member_copay_cents=copay,
-                net_fee_cents=net_fee,
+        for payload in payloads:
+            claim = Claim(
+                id=new_claim_id(),
+                claim_reference=payload.get("claim_reference"),
             )
+            try:
+                amounts = parse_line_amounts(payload["lines"])
+            except ValueError as e:
+                results.append(e)
+                continue
+
+            parsed.append((claim.id, payload["lines"], amounts))
+            claims.append(claim)
+            results.append(claim)
+
+        if not claims:
+            return results
+
+        valid = list(zip(claims, price_line_rows(parsed)))
 
-            service_lines.append(service_line)
+        persisted = iter(self._persist(valid))
+        return [
+            result if isinstance(result, ValueError) else next(persisted)
+            for result in results
+        ]
+
+    def _persist(self, claims: list[tuple[Claim, list[dict]]]) -> list[Claim]:
+        """
+        Writes validated claims, their lines, aggregates and outbox events.
+
+        Returns the stored claim for each input: the input claim itself, or
+        in idempotent mode the originally ingested claim for a replayed
+        claim_reference, whose lines are then not written again.
+        """
+        with time_claim_stage("claim_insert"):
+            if settings.claim_idempotency_enabled:
+                persisted, claims = self._insert_claims_idempotently(claims)
+            else:
+                self.claim_repo.bulk_create([claim for claim, _ in claims])
+                persisted = [claim for claim, _ in claims]
+
+        line_rows = [row for _, rows in claims for row in rows]
+        if line_rows:
+            with time_claim_stage("line_insert"):
+                self.line_repo.bulk_insert_rows(line_rows)
 
             # ---- Aggregate update ----
-            self.provider_agg_repo.increment_net_fee(
-                provider_npi=line["provider_npi"],
-                delta_cents=net_fee,
+            with time_claim_stage("aggregate_upsert"):
+                self._update_aggregates(line_rows)
+
+            # ---- Payments notification ----
+            # Written to the outbox in this transaction; OutboxProcessor
+            # workers publish it after commit (see payments_integration.py)
+            with time_claim_stage("outbox"):
+                self._record_events(claims)
+
+        return persisted
+
+    def _insert_claims_idempotently(
+        self,
+        claims: list[tuple[Claim, list[dict]]],
+    ) -> tuple[list[Claim], list[tuple[Claim, list[dict]]]]:
+        """
+        Inserts claim rows, skipping claim_references that already exist.
+
+        Returns the stored claim for every input and the subset of inputs
+        that were newly inserted.
+        """
+        referenced = [claim for claim, _ in claims if claim.claim_reference is not None]
+        stored = self.claim_repo.create_many_idempotent(referenced)
+        unreferenced = [claim for claim, _ in claims if claim.claim_reference is None]
+        if unreferenced:
+            self.claim_repo.bulk_create(unreferenced)
+
+        persisted: list[Claim] = []
+        created: list[tuple[Claim, list[dict]]] = []
+        for claim, rows in claims:
+            if claim.claim_reference is not None:
+                claim_id = stored[claim.claim_reference]
+                if claim_id != claim.id:
+                    # Replay (or duplicate within this batch)
+                    persisted.append(Claim(id=claim_id, claim_reference=claim.claim_reference))
+                    continue
+            persisted.append(claim)
+            created.append((claim, rows))
+        return persisted, created
+
+    def _update_aggregates(self, line_rows: list[dict]) -> None:
+        """
+        Applies the lines' net fees to the all-time and daily aggregates,
+        or, in ledger mode, appends them to the delta ledger for the
+        background flusher.
+        """
+        if settings.aggregate_write_mode == "ledger":
+            self.fee_delta_repo.append_many(self._sum_daily_net_fees(line_rows))
+            return
+
+        self.provider_agg_repo.increment_many(self._sum_net_fees(line_rows))
+        self.provider_agg_repo.increment_daily_many(self._sum_daily_net_fees(line_rows))
+        mark_aggregates_dirty(self.session)
+
+    def _record_events(self, claims: list[tuple[Claim, list[dict]]]) -> None:
+        """Adds a claim.processed outbox event per claim, in one INSERT."""
+        if not settings.outbox_enabled:
+            return
+        self.outbox_repo.add_many(
+            CLAIM_PROCESSED,
+            [
+                (
+                    claim.id,
+                    {
+                        "claim_reference": claim.claim_reference,
+                        "net_fee_cents": sum(row["net_fee_cents"] for row in rows),
+                        "provider_net_fee_cents": self._sum_net_fees(rows),
+                    },
+                )
+                for claim, rows in claims
+            ],
+        )
+
+    @staticmethod
+    def _sum_net_fees(line_rows: list[dict]) -> dict[str, int]:
+        """Pre-sums net fees per provider so each NPI is upserted once."""
+        if use_numpy_engine(len(line_rows)):
+            return _numpy_engine().sum_by_provider(
+                [row["provider_npi"] for row in line_rows],
+                [row["net_fee_cents"] for row in line_rows],
             )
 
-        self.line_repo.bulk_create(service_lines)
+        deltas: dict[str, int] = {}
+        for row in line_rows:
+            deltas[row["provider_npi"]] = (
+                deltas.get(row["provider_npi"], 0) + row["net_fee_cents"]
+            )
+        return deltas
 
-        # After successful claim processing, a downstream payments service
-        # should be notified about computed net fees.
-        #
-        # Proposed approach: Outbox pattern with asynchronous message publishing
-        # to ensure reliability, idempotency, and safe retries.
+    @staticmethod
+    def _sum_daily_net_fees(line_rows: list[dict]) -> dict[tuple[str, date], int]:
+        """Pre-sums net fees per (provider, service day) bucket."""
+        if use_numpy_engine(len(line_rows)):
+            return _numpy_engine().sum_by_provider_day(
+                [row["provider_npi"] for row in line_rows],
+                [row["service_date"].date() for row in line_rows],
+                [row["net_fee_cents"] for row in line_rows],
+            )
 
-        return claim
+        deltas: dict[tuple[str, date], int] = {}
+        for row in line_rows:
+            key = (row["provider_npi"], row["service_date"].date())
+            deltas[key] = deltas.get(key, 0) + row["net_fee_cents"]
+        return deltas
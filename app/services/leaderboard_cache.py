@@ -0,0 +1,115 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import (
+    LEADERBOARD_CACHE_HITS,
+    LEADERBOARD_CACHE_INVALIDATIONS,
+    LEADERBOARD_CACHE_MISSES,
+)
+from app.models.provider_aggregate import ProviderNetFeeAggregate
+
+# session.info key set when a transaction changed provider aggregates
+AGGREGATES_DIRTY = "provider_aggregates_dirty"
+
+
+class LeaderboardCache:
+    """
+    In-process cache for the top providers leaderboard.
+
+    Entries expire after `ttl_seconds`, which bounds staleness for writes
+    made by other processes. Writes committed in this process invalidate
+    the entry immediately (see the session listeners below). A generation
+    counter makes sure a result loaded before an invalidation is never
+    stored after it.
+
+    Hits, misses and invalidations are counted per instance (see stats())
+    and exported process-wide on /metrics.
+    """
+
+    def __init__(self, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        self._value: Optional[Any] = None
+        self._expires_at = 0.0
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self) -> Optional[Any]:
+        with self._lock:
+            if self._value is not None and self.clock() < self._expires_at:
+                self.hits += 1
+                LEADERBOARD_CACHE_HITS.inc()
+                return self._value
+            self.misses += 1
+            LEADERBOARD_CACHE_MISSES.inc()
+            return None
+
+    def set(self, value: Any, generation: int) -> None:
+        """Stores a value loaded when `generation` was current."""
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._value = value
+            self._expires_at = self.clock() + self.ttl_seconds
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._value = None
+            self.invalidations += 1
+            LEADERBOARD_CACHE_INVALIDATIONS.inc()
+
+    def clear(self) -> None:
+        """Drops the cached value and resets the counters."""
+        with self._lock:
+            self._generation += 1
+            self._value = None
+            self.hits = self.misses = self.invalidations = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+leaderboard_cache = LeaderboardCache(settings.leaderboard_cache_ttl_seconds)
+
+
+def mark_aggregates_dirty(session: Session) -> None:
+    """Flags the session so its next commit invalidates the leaderboard."""
+    session.info[AGGREGATES_DIRTY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_aggregate_flush(session: Session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, ProviderNetFeeAggregate):
+            mark_aggregates_dirty(session)
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if session.info.pop(AGGREGATES_DIRTY, False):
+        leaderboard_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_on_rollback(session: Session) -> None:
+    session.info.pop(AGGREGATES_DIRTY, None)
@@ -1,8 +1,119 @@
-from decimal import Decimal
+from typing import Iterable, Literal
 
-def dollars_to_cents(value: str) -> int:
+# What to do with amounts carrying more than two decimal places
+# (non-zero digits past the cent): reject them, or round to the cent.
+# "half_up" rounds halves away from zero, "half_even" to the even cent
+# (banker's rounding), "truncate" drops the extra digits (toward zero).
+Rounding = Literal["reject", "half_up", "half_even", "truncate"]
+ROUNDING_POLICIES = ("reject", "half_up", "half_even", "truncate")
+
+
+def _is_digits(text: str) -> bool:
+    # str.isdigit alone also accepts non-ASCII digits such as '²'
+    return text.isdigit() and text.isascii()
+
+
+def _round_extra(cents: int, extra: str, rounding: str, value: str) -> int:
+    """Applies the rounding policy to digits past the cent (`extra`)."""
+    extra = extra.rstrip("0")
+    if not extra:
+        return cents
+    if rounding == "reject":
+        raise ValueError(f"money amount has fractional cents: {value!r}")
+    if rounding == "half_up":
+        return cents + (extra[0] >= "5")
+    if rounding == "half_even":
+        if extra > "5" or (extra == "5" and cents % 2):
+            return cents + 1
+        return cents
+    if rounding == "truncate":
+        return cents
+    raise ValueError(f"unknown rounding policy: {rounding}")
+
+
+def _parse_cents(value: str, rounding: str) -> int:
+    """General parser behind dollars_to_cents; see its docstring."""
+    if not isinstance(value, str):
+        value = str(value)
+
+    text = value.strip()
+    negative = False
+    signed = False
+    if text[:1] in ("+", "-"):
+        negative = text[0] == "-"
+        signed = True
+        text = text[1:].lstrip()
+    if text[:1] == "$":
+        text = text[1:].lstrip()
+    if text[:1] in ("+", "-") and not signed:
+        negative = text[0] == "-"
+        text = text[1:].lstrip()
+
+    whole, _, fraction = text.partition(".")
+    if "," in whole:
+        groups = whole.split(",")
+        if not 1 <= len(groups[0]) <= 3 or any(len(group) != 3 for group in groups[1:]):
+            raise ValueError(f"invalid money amount: {value!r}")
+        whole = "".join(groups)
+
+    if (
+        not (whole or fraction)
+        or (whole and not _is_digits(whole))
+        or (fraction and not _is_digits(fraction))
+    ):
+        raise ValueError(f"invalid money amount: {value!r}")
+
+    # One int() over the digits, already scaled to cents
+    cents = int((whole or "0") + (fraction[:2] + "00")[:2])
+    if len(fraction) > 2:
+        cents = _round_extra(cents, fraction[2:], rounding, value)
+    return -cents if negative else cents
+
+
+def dollars_to_cents(value: str, rounding: Rounding = "reject") -> int:
     """
-    Converts '$130.00 ' -> 13000
+    Converts '$130.00 ' -> 13000, '-$1,234.5' -> -123450
+
+    Parses with string and integer operations only, no Decimal. Accepts
+    surrounding whitespace, one '+' or '-' before or after an optional
+    '$', comma thousands separators and any number of decimals; digits
+    past the cent are handled according to `rounding`. Raises ValueError
+    for anything else.
     """
-    cleaned = value.replace("$", "").strip()
-    return int(Decimal(cleaned) * 100)
+    # Fast path for the usual '130.00' / '$130.00' shape
+    if type(value) is str:
+        text = value.strip()
+        if text[:1] == "$":
+            text = text[1:]
+        if text[-3:-2] == ".":
+            digits = text.replace(".", "", 1)
+            if digits.isdecimal() and digits.isascii():
+                return int(digits)
+    return _parse_cents(value, rounding)
+
+
+def dollars_to_cents_many(values: Iterable[str], rounding: Rounding = "reject") -> list[int]:
+    """
+    Converts a batch of amounts with the same rules as dollars_to_cents.
+
+    For the bulk paths: amounts in the usual '130.00' shape are parsed
+    inline in one loop with no per-value function call; anything else
+    (signs, separators, sub-cent digits, errors) takes the general parser.
+    """
+    if rounding not in ROUNDING_POLICIES:
+        raise ValueError(f"unknown rounding policy: {rounding}")
+
+    results = []
+    append = results.append
+    for value in values:
+        if type(value) is str:
+            text = value.strip()
+            if text[:1] == "$":
+                text = text[1:]
+            if text[-3:-2] == ".":
+                digits = text.replace(".", "", 1)
+                if digits.isdecimal() and digits.isascii():
+                    append(int(digits))
+                    continue
+        append(_parse_cents(value, rounding))
+    return results
@@ -0,0 +1,102 @@
+"""
+Columnar net fee computation with NumPy.
+
+Used by build_line_rows and ClaimService when NET_FEE_ENGINE=numpy and
+the input has at least NET_FEE_NUMPY_MIN_LINES lines. Below that, array
+setup costs more than the Python loops it replaces.
+
+Money strings are still parsed in Python (dollars_to_cents_many). Net fees
+and per-provider / per-(provider, day) sums are then computed on int64
+arrays. NPIs and days are factorized into integer codes, and groups are
+summed with np.bincount. That is exact while the total magnitude stays
+below 2**53 cents. Larger inputs fall back to np.add.reduceat over
+sorted codes, which sums int64 exactly.
+
+benchmarks/bench_net_fees.py compares the two engines. When lines arrive
+as Python objects (JSON bodies, CSV rows), converting them to arrays
+costs about as much as the arithmetic saves: the engine breaks even
+around a million lines and is still level at ten million (191k vs 193k
+lines/s end to end, see README). It is opt-in for that reason, and
+claim_service only imports this module once it is used. The arrays pay
+off for callers that already hold the columns.
+"""
+from datetime import date
+
+import numpy as np
+
+# Coefficients of (provider_fees, allowed_fees, member_coinsurance,
+# member_copay) in net_fee = provider_fees + coinsurance + copay - allowed_fees
+NET_FEE_COEFFICIENTS = np.array([1, -1, 1, 1], dtype=np.int64)
+
+
+def net_fees_from_amounts(amounts: list[int]) -> list[int]:
+    """
+    Net fee per line from amounts interleaved four per line, in the
+    order of NET_FEE_COEFFICIENTS (as build_line_rows parses them).
+    """
+    matrix = np.array(amounts, dtype=np.int64).reshape(-1, 4)
+    return (matrix @ NET_FEE_COEFFICIENTS).tolist()
+
+
+def factorize(values: list) -> tuple[list, np.ndarray]:
+    """
+    Returns (distinct values in first-seen order, int64 code per value).
+
+    A dict pass is O(n); np.unique would sort the strings instead, which
+    is several times slower for NPIs.
+    """
+    index: dict = {}
+    setdefault = index.setdefault
+    codes = np.fromiter(
+        (setdefault(value, len(index)) for value in values),
+        dtype=np.int64,
+        count=len(values),
+    )
+    return list(index), codes
+
+
+def _group_sums(codes: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """Exact int64 sum of `values` per code in range(size)."""
+    if int(np.abs(values).sum()) < 2 ** 53:
+        # Every partial sum is an integer below 2**53, so float64 is exact
+        return np.bincount(codes, weights=values, minlength=size).astype(np.int64)
+
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    sums = np.zeros(size, dtype=np.int64)
+    sums[sorted_codes[starts]] = np.add.reduceat(values[order], starts)
+    return sums
+
+
+def sum_by_provider(npis: list[str], net_fees: list[int]) -> dict[str, int]:
+    """Pre-sums net fees per provider NPI."""
+    if not npis:
+        return {}
+    uniques, codes = factorize(npis)
+    sums = _group_sums(codes, np.asarray(net_fees, dtype=np.int64), len(uniques))
+    return dict(zip(uniques, sums.tolist()))
+
+
+def sum_by_provider_day(
+    npis: list[str],
+    days: list[date],
+    net_fees: list[int],
+) -> dict[tuple[str, date], int]:
+    """Pre-sums net fees per (provider NPI, service day) bucket."""
+    if not npis:
+        return {}
+    npi_uniques, npi_codes = factorize(npis)
+    day_uniques, day_codes = factorize(days)
+
+    # One integer code per (provider, day) pair, compacted to the pairs
+    # that actually occur
+    pair_codes = npi_codes * len(day_uniques) + day_codes
+    pairs, codes = np.unique(pair_codes, return_inverse=True)
+    sums = _group_sums(codes, np.asarray(net_fees, dtype=np.int64), len(pairs))
+
+    npi_index, day_index = np.divmod(pairs, len(day_uniques))
+    return {
+        (npi_uniques[n], day_uniques[d]): total
+        for n, d, total in zip(npi_index.tolist(), day_index.tolist(), sums.tolist())
+    }
@@ -1,36 +1,186 @@
+import json
+import logging
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Protocol
+
+from sqlmodel import Session
+
+from app.models.outbox_event import (
+    OUTBOX_FAILED,
+    OUTBOX_PUBLISHED,
+    OutboxEvent,
+    utc_now,
+)
+from app.repositories.outbox_repo import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+CLAIM_PROCESSED = "claim.processed"
+
+
+class EventSink(Protocol):
+    """Destination for outbox messages (message broker, file, memory...)."""
+    def publish(self, message: dict) -> None: ...
+
+
+class InMemoryEventSink:
+    """Collects published messages in a list; for tests and local runs."""
+
+    def __init__(self):
+        self.messages: list[dict] = []
+        self._lock = threading.Lock()
+
+    def publish(self, message: dict) -> None:
+        with self._lock:
+            self.messages.append(message)
+
+
+class FileEventSink:
+    """Appends published messages as JSON lines to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def publish(self, message: dict) -> None:
+        line = json.dumps(message, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
 class PaymentsPublisher:
     """
-    Abstraction for publishing claim processed events to a payments system.
-    
+    Publishes claim processed events to a payments system.
+
     INTEGRATION PATTERN: Transactional Outbox
-    
-    Instead of directly calling payments service here, we use the outbox pattern:
-    
-    1. When claim is processed, an OutboxEvent is created in the SAME database 
-       transaction as the claim data (see process_claim endpoint)
-    
-    2. A background worker (OutboxProcessor) polls the outbox table using:
-       SELECT * FROM outbox_events 
-       WHERE status = 'PENDING' 
+
+    Instead of calling the payments service from the request path:
+
+    1. When a claim is processed, an OutboxEvent is created in the SAME
+       database transaction as the claim data (see ClaimService)
+
+    2. OutboxProcessor workers poll the outbox table using:
+       SELECT * FROM outbox_events
+       WHERE status = 'PENDING' AND next_attempt_at <= now()
+       ORDER BY id LIMIT :batch_size
        FOR UPDATE SKIP LOCKED
-       
-    3. Worker publishes events to message broker (Kafka/SQS/RabbitMQ)
-    
-    4. Payments service consumes from broker with idempotency protection
-    
+
+    3. Each event is handed to this publisher, which forwards it to the
+       configured EventSink (message broker, file, memory)
+
+    4. Payments service consumes with idempotency protection, keyed on
+       the message's idempotency_key
+
     FAILURE HANDLING:
     - If claim processing fails: transaction rolls back, no event created
-    - If event creation fails: transaction rolls back, no claim persisted  
-    - If publishing fails: event stays in outbox, worker retries with backoff
-    - If payments service fails: message goes to DLQ, ops team alerted
-    
+    - If event creation fails: transaction rolls back, no claim persisted
+    - If publishing fails: event stays PENDING, retried with exponential
+      backoff until outbox_max_attempts, then marked FAILED for ops
+
     CONCURRENCY:
-    - Multiple claim_process instances can run concurrently
-    - FOR UPDATE SKIP LOCKED prevents race conditions in outbox polling
-    - Each instance processes different events in parallel
-    - Idempotency keys prevent duplicate payment processing
-    
-    NOTE: For full implementation see design doc in payments_integration_design.py
+    - Multiple claim_process instances and worker threads run concurrently
+    - FOR UPDATE SKIP LOCKED gives each worker a disjoint batch
+    - Delivery is at-least-once; idempotency keys prevent duplicate payments
     """
-    def publish_claim_processed(self, claim_id: str) -> None:
-        raise NotImplementedError("Uses outbox pattern - see class docstring")
\ No newline at end of file
+
+    def __init__(self, sink: EventSink):
+        self.sink = sink
+
+    def publish_claim_processed(self, event: OutboxEvent) -> None:
+        self.sink.publish({
+            "idempotency_key": f"outbox-{event.id}",
+            "event_type": event.event_type,
+            "claim_id": str(event.aggregate_id),
+            "payload": event.payload,
+        })
+
+
+def build_sink(kind: Optional[str], file_path: Optional[str] = None) -> EventSink:
+    if kind is None:
+        raise ValueError("OUTBOX_SINK is not configured")
+    if kind == "memory":
+        return InMemoryEventSink()
+    if kind == "file":
+        if not file_path:
+            raise ValueError("outbox_file_path is required for the file sink")
+        return FileEventSink(file_path)
+    raise ValueError(f"Unknown outbox sink: {kind}")
+
+
+class OutboxProcessor:
+    """
+    Drains the outbox in batches and publishes events.
+
+    Each batch is claimed, published and marked in one transaction, so the
+    row locks keep other workers off these events until the outcome is
+    committed. Failed events are rescheduled with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        publisher: PaymentsPublisher,
+        batch_size: int,
+        max_attempts: int,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+        clock: Callable[[], datetime] = utc_now,
+    ):
+        self.session_factory = session_factory
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.clock = clock
+
+    def backoff_delay(self, attempts: int) -> float:
+        """Seconds to wait before retry number `attempts` (1-based)."""
+        return min(
+            self.backoff_base_seconds * 2 ** (attempts - 1),
+            self.backoff_max_seconds,
+        )
+
+    def process_batch(self) -> int:
+        """Publishes one batch of due events; returns how many were claimed."""
+        with self.session_factory() as session:
+            with session.begin():
+                now = self.clock()
+                events = OutboxRepository(session).claim_batch(self.batch_size, now)
+                for event in events:
+                    self._publish(event, now)
+                return len(events)
+
+    def run(self, stop: threading.Event, poll_interval_seconds: float) -> None:
+        """Loops until `stop` is set, sleeping only when the outbox is drained."""
+        while not stop.is_set():
+            try:
+                claimed = self.process_batch()
+            except Exception as e:
+                logger.exception(f"Outbox batch failed: {str(e)}")
+                claimed = 0
+            if claimed < self.batch_size:
+                # Jitter keeps concurrent workers from polling in lockstep
+                stop.wait(poll_interval_seconds * random.uniform(0.5, 1.5))
+
+    def _publish(self, event: OutboxEvent, now: datetime) -> None:
+        try:
+            self.publisher.publish_claim_processed(event)
+        except Exception as e:
+            event.attempts += 1
+            event.last_error = str(e)[:1000]
+            if event.attempts >= self.max_attempts:
+                event.status = OUTBOX_FAILED
+                logger.error(f"Outbox event {event.id} failed permanently: {str(e)}")
+            else:
+                delay = self.backoff_delay(event.attempts)
+                event.next_attempt_at = now + timedelta(seconds=delay)
+                logger.warning(f"Outbox event {event.id} failed, retrying in {delay}s: {str(e)}")
+            return
+
+        event.attempts += 1
+        event.status = OUTBOX_PUBLISHED
+        event.published_at = now
@@ -1,11 +1,16 @@
 import re
-from typing import Protocol, Any, Optional
+from typing import Protocol, Any, Callable, Optional
+
+# Compiled form of a rule: returns an error message, or None if valid
+Check = Callable[[Any], Optional[str]]
 
 
 class ValidationRule(Protocol):
     """Protocol for validation rules - allows extensible validation framework."""
     def validate(self, value: Any) -> None: ...
 
+    def compile(self) -> Check: ...
+
 
 class RegexRule:
     """Validates a string value against a regex pattern."""
@@ -18,6 +23,70 @@ class RegexRule:
         if not self.pattern.match(value):
             raise ValueError(self.message)
 
+    def compile(self) -> Check:
+        match = self.pattern.match
+        message = self.message
+
+        def check(value: Any) -> Optional[str]:
+            if not isinstance(value, str) or not match(value):
+                return message
+            return None
+
+        return check
+
+
+class PrefixRule:
+    """Validates that a string starts with a fixed prefix (no regex)."""
+
+    def __init__(self, prefix: str, message: str):
+        self.prefix = prefix
+        self.message = message
+
+    def validate(self, value: str) -> None:
+        message = self.compile()(value)
+        if message is not None:
+            raise ValueError(message)
+
+    def compile(self) -> Check:
+        prefix = self.prefix
+        message = self.message
+
+        def check(value: Any) -> Optional[str]:
+            if not isinstance(value, str) or not value.startswith(prefix):
+                return message
+            return None
+
+        return check
+
+
+class DigitsRule:
+    """Validates that a string is exactly `length` ASCII digits (no regex)."""
+
+    def __init__(self, length: int, message: str):
+        self.length = length
+        self.message = message
+
+    def validate(self, value: str) -> None:
+        message = self.compile()(value)
+        if message is not None:
+            raise ValueError(message)
+
+    def compile(self) -> Check:
+        length = self.length
+        message = self.message
+
+        def check(value: Any) -> Optional[str]:
+            if (
+                not isinstance(value, str)
+                or len(value) != length
+                or not value.isdigit()
+                or not value.isascii()
+            ):
+                return message
+            return None
+
+        return check
+
 
 class RequiredFieldRule:
     """Validates that a required field is present and not empty."""
@@ -31,6 +100,19 @@ class RequiredFieldRule:
         if isinstance(value, str) and not value.strip():
             raise ValueError(f"{self.field_name} cannot be empty")
 
+    def compile(self) -> Check:
+        missing = f"{self.field_name} is required"
+        empty = f"{self.field_name} cannot be empty"
+
+        def check(value: Any) -> Optional[str]:
+            if value is None:
+                return missing
+            if isinstance(value, str) and not value.strip():
+                return empty
+            return None
+
+        return check
+
 
 class FieldValidator:
     """Composite validator that applies multiple rules to a field."""
@@ -44,15 +126,102 @@ class FieldValidator:
         for rule in self.rules:
             rule.validate(value)
 
+    def compile(self) -> Check:
+        """Returns a check reporting the first failing rule, in order."""
+        checks = tuple(rule.compile() for rule in self.rules)
+        if len(checks) == 1:
+            return checks[0]
+
+        def check(value: Any) -> Optional[str]:
+            for rule_check in checks:
+                message = rule_check(value)
+                if message is not None:
+                    return message
+            return None
+
+        return check
+
+
+class LineValidationError(ValueError):
+    """
+    Raised with every rule violation found in a claim's lines.
+
+    `errors` holds (line index, message) pairs in line order. It is a
+    ValueError, so callers that report validation errors keep working.
+    """
+
+    def __init__(self, errors: list[tuple[int, str]]):
+        self.errors = errors
+        super().__init__("; ".join(f"lines[{index}]: {message}" for index, message in errors))
+
+
+class RuleRegistry:
+    """
+    Per-field rules for claim lines, compiled once into one line check.
+
+    Rules are registered by field name. compile() resolves every field's
+    rules into a flat tuple of (field, check) closures; the resulting
+    callable walks that tuple for each line and collects every failing
+    field instead of stopping at the first one.
+    """
+
+    def __init__(self):
+        self._fields: dict[str, FieldValidator] = {}
+        self._compiled: Optional[Callable[[dict], list[str]]] = None
+
+    def register(self, field_name: str, *rules: ValidationRule) -> None:
+        validator = self._fields.setdefault(field_name, FieldValidator(field_name, []))
+        validator.rules.extend(rules)
+        self._compiled = None
+
+    def compile(self) -> Callable[[dict], list[str]]:
+        """Returns a callable giving all error messages for one line."""
+        if self._compiled is None:
+            checks = tuple(
+                (field_name, validator.compile())
+                for field_name, validator in self._fields.items()
+            )
+
+            def validate_line(line: dict) -> list[str]:
+                errors = []
+                get = line.get
+                for field_name, check in checks:
+                    message = check(get(field_name))
+                    if message is not None:
+                        errors.append(message)
+                return errors
+
+            self._compiled = validate_line
+        return self._compiled
+
+    def collect_errors(self, lines: list[dict]) -> list[tuple[int, str]]:
+        """Validates every line; returns (line index, message) pairs."""
+        validate_line = self.compile()
+        errors = []
+        for index, line in enumerate(lines):
+            for message in validate_line(line):
+                errors.append((index, message))
+        return errors
+
+    def validate_lines(self, lines: list[dict]) -> None:
+        """Raises LineValidationError listing every violation in `lines`."""
+        errors = self.collect_errors(lines)
+        if errors:
+            raise LineValidationError(errors)
+
 
 # Predefined validation rules
-SUBMITTED_PROCEDURE_RULE = RegexRule(
-    r"^D.*",
+SUBMITTED_PROCEDURE_RULE = PrefixRule(
+    "D",
     "submitted_procedure must start with 'D'",
 )
 
-PROVIDER_NPI_RULE = RegexRule(
-    r"^\d{10}$",
+PROVIDER_NPI_RULE = DigitsRule(
+    10,
     "provider_npi must be a 10 digit number",
 )
 
+# Rules applied to every claim line by build_line_rows
+CLAIM_LINE_RULES = RuleRegistry()
+CLAIM_LINE_RULES.register("submitted_procedure", SUBMITTED_PROCEDURE_RULE)
+CLAIM_LINE_RULES.register("provider_npi", PROVIDER_NPI_RULE)
@@ -0,0 +1,92 @@
+"""
+Compare uuid4 and uuid7 claim ids for insert throughput and index size.
+
+Loads the same number of rows into two scratch tables shaped like claims
+(uuid primary key) and claim_lines (indexed uuid foreign key), once per
+id strategy. It reports rows/s and the on-disk size of each index.
+Requires PostgreSQL, since it uses COPY and pg_relation_size.
+
+Usage:
+    python -m benchmarks.bench_claim_ids --rows 10000000
+"""
+import argparse
+import sys
+import time
+from uuid import uuid4
+
+from app.core.ids import uuid7
+from app.db.session import engine
+
+GENERATORS = {"uuid4": uuid4, "uuid7": uuid7}
+
+
+def bench(conn, name: str, rows: int, chunk: int) -> dict:
+    generate = GENERATORS[name]
+    claims = f"bench_claims_{name}"
+    lines = f"bench_claim_lines_{name}"
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {lines}, {claims}")
+        cur.execute(f"CREATE UNLOGGED TABLE {claims} (id uuid PRIMARY KEY, created_at timestamptz DEFAULT now())")
+        cur.execute(f"CREATE UNLOGGED TABLE {lines} (id bigserial PRIMARY KEY, claim_id uuid NOT NULL)")
+        cur.execute(f"CREATE INDEX ix_{lines}_claim_id ON {lines} (claim_id)")
+    conn.commit()
+
+    started = time.perf_counter()
+    written = 0
+    while written < rows:
+        batch = [generate() for _ in range(min(chunk, rows - written))]
+        with conn.cursor() as cur:
+            with cur.copy(f"COPY {claims} (id) FROM STDIN") as copy:
+                for claim_id in batch:
+                    copy.write_row((claim_id,))
+            with cur.copy(f"COPY {lines} (claim_id) FROM STDIN") as copy:
+                for claim_id in batch:
+                    copy.write_row((claim_id,))
+        conn.commit()
+        written += len(batch)
+    elapsed = time.perf_counter() - started
+
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT pg_relation_size(%s), pg_relation_size(%s)",
+            (f"{claims}_pkey", f"ix_{lines}_claim_id"),
+        )
+        pkey_size, fk_index_size = cur.fetchone()
+        cur.execute(f"DROP TABLE {lines}, {claims}")
+    conn.commit()
+
+    return {
+        "strategy": name,
+        "rows_per_s": rows / elapsed,
+        "pkey_mb": pkey_size / 2**20,
+        "fk_index_mb": fk_index_size / 2**20,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunk", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    if "postgresql" not in str(engine.url):
+        print("This benchmark requires a PostgreSQL DATABASE_URL", file=sys.stderr)
+        return 2
+
+    raw = engine.raw_connection()
+    try:
+        conn = raw.driver_connection
+        print(f"{'strategy':<10}{'rows/s':>14}{'pkey MB':>12}{'fk index MB':>14}")
+        for name in GENERATORS:
+            result = bench(conn, name, args.rows, args.chunk)
+            print(
+                f"{result['strategy']:<10}{result['rows_per_s']:>14,.0f}"
+                f"{result['pkey_mb']:>12.1f}{result['fk_index_mb']:>14.1f}"
+            )
+    finally:
+        raw.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Micro-benchmarks for the claim ingest hot path.
+
+Times dollars_to_cents, the claim line rules, build_line_rows and
+ClaimService.process_claim (against DATABASE_URL, one transaction per
+claim as in POST /claims) for several line counts, and counts the SQL
+statements each claim sends. Each figure is the median of --rounds
+rounds. --save writes the results as JSON; --baseline compares against
+such a file and exits with status 1 on a regression beyond --tolerance.
+
+Usage:
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.bench_ingest
+    python -m benchmarks.bench_ingest --lines 1 10 100 --save baseline.json
+    python -m benchmarks.bench_ingest --baseline baseline.json --tolerance 0.2
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from typing import Callable
+
+from sqlmodel import Session
+
+from app.db.init_db import init_db
+from app.db.session import engine
+from app.schemas.claim import ClaimCreateRequest
+from app.services.claim_service import ClaimService, build_line_rows
+from app.services.money import dollars_to_cents, dollars_to_cents_many
+from app.services.validation import CLAIM_LINE_RULES
+from benchmarks.workload import (
+    StatementCounter,
+    compare_with_baseline,
+    make_claim,
+    save_results,
+)
+
+
+def measure(fn: Callable[[], object], rounds: int, min_round_time: float) -> float:
+    """Median seconds per call over `rounds` rounds of at least `min_round_time`."""
+    calls = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        if time.perf_counter() - started >= min_round_time:
+            break
+        calls *= 2
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        timings.append((time.perf_counter() - started) / calls)
+    return statistics.median(timings)
+
+
+def parsed_lines(rng: random.Random, lines: int, reference: str = "bench") -> list[dict]:
+    """Claim lines as routes hand them to the service (validated, dumped)."""
+    payload = make_claim(rng, lines, providers=1000, reference=reference)
+    return ClaimCreateRequest.model_validate(payload).model_dump()["lines"]
+
+
+def bench_pure(rng: random.Random, line_counts: list[int], rounds: int, round_time: float) -> dict[str, float]:
+    results = {
+        "dollars_to_cents.fast_us": measure(lambda: dollars_to_cents("1234.56"), rounds, round_time),
+        "dollars_to_cents.general_us": measure(
+            lambda: dollars_to_cents("$1,234.5", "half_up"), rounds, round_time
+        ),
+    }
+
+    amounts = [f"{rng.randrange(0, 500_000) / 100:.2f}" for _ in range(1000)]
+    results["dollars_to_cents_many.per_value_us"] = (
+        measure(lambda: dollars_to_cents_many(amounts), rounds, round_time) / len(amounts)
+    )
+
+    lines = parsed_lines(rng, 100)
+    results["claim_line_rules.per_line_us"] = (
+        measure(lambda: CLAIM_LINE_RULES.collect_errors(lines), rounds, round_time) / len(lines)
+    )
+
+    for count in line_counts:
+        lines = parsed_lines(rng, count)
+        results[f"build_line_rows.lines_{count}_us"] = measure(
+            lambda: build_line_rows(None, lines), rounds, round_time
+        )
+    return {name: seconds * 1e6 if name.endswith("_us") else seconds for name, seconds in results.items()}
+
+
+def bench_process_claim(rng: random.Random, line_counts: list[int], claims: int) -> dict[str, float]:
+    init_db()
+    counter = StatementCounter(engine)
+    results = {}
+    for count in line_counts:
+        payloads = [
+            {"claim_reference": f"bench-{count}-{i}-{rng.randrange(10**9)}", "lines": parsed_lines(rng, count)}
+            for i in range(claims)
+        ]
+        timings = []
+        with counter.counting():
+            counter.count = 0
+            for payload in payloads:
+                started = time.perf_counter()
+                with Session(engine) as session, session.begin():
+                    ClaimService(session).process_claim(payload)
+                timings.append(time.perf_counter() - started)
+        results[f"process_claim.lines_{count}_us"] = statistics.median(timings) * 1e6
+        results[f"process_claim.lines_{count}_statements"] = counter.count / claims
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--claims", type=int, default=200, help="Claims per line count for process_claim")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--round-time", type=float, default=0.1, help="Minimum seconds per round")
+    parser.add_argument("--no-db", action="store_true", help="Skip process_claim")
+    parser.add_argument("--save", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare with results saved by --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(1)
+    results = bench_pure(rng, args.lines, args.rounds, args.round_time)
+    if not args.no_db:
+        results.update(bench_process_claim(rng, args.lines, args.claims))
+
+    print(f"{'benchmark':<42}{'value':>14}")
+    for name, value in results.items():
+        print(f"{name:<42}{value:>14,.2f}")
+
+    if args.save:
+        save_results(results, args.save)
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
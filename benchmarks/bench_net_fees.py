@@ -0,0 +1,104 @@
+"""
+Compare the per-line net fee loop with the NumPy columnar engine.
+
+For each size, synthetic lines (money strings, NPIs, service days) are
+priced both ways: parse, net fee, and per-provider / per-(provider, day)
+sums. Reports lines/s for each step. The two engines share the money
+parser, so the "compute" rows isolate what NumPy changes. No database
+needed. 10M lines need a few GB of RAM for the input columns.
+
+Usage:
+    python -m benchmarks.bench_net_fees
+    python -m benchmarks.bench_net_fees --sizes 1000 100000 10000000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from app.services import net_fee_engine
+from app.services.money import dollars_to_cents, dollars_to_cents_many
+
+
+def make_columns(size: int, providers: int, seed: int = 1) -> dict[str, list]:
+    rng = random.Random(seed)
+    # Draw from small pools so 10M lines share string objects
+    amounts = [f"{rng.randrange(0, 500_000) / 100:.2f}" for _ in range(1000)]
+    npis = [f"{i:010d}" for i in range(providers)]
+    days = [date(2024, 1, 1) + timedelta(days=i) for i in range(365)]
+    pick = rng.choices
+    return {
+        "provider_fees": pick(amounts, k=size),
+        "allowed_fees": pick(amounts, k=size),
+        "member_coinsurance": pick(amounts, k=size),
+        "member_copay": pick(amounts, k=size),
+        "provider_npi": pick(npis, k=size),
+        "service_day": pick(days, k=size),
+    }
+
+
+def run_loop(columns: dict[str, list]) -> tuple[float, float]:
+    """The current path: parse and price line by line, sum into dicts."""
+    started = time.perf_counter()
+    net_fees = [
+        dollars_to_cents(provider) + dollars_to_cents(coinsurance)
+        + dollars_to_cents(copay) - dollars_to_cents(allowed)
+        for provider, allowed, coinsurance, copay in zip(
+            columns["provider_fees"],
+            columns["allowed_fees"],
+            columns["member_coinsurance"],
+            columns["member_copay"],
+        )
+    ]
+    parsed = time.perf_counter()
+
+    totals: dict[str, int] = {}
+    daily: dict[tuple[str, date], int] = {}
+    for npi, day, fee in zip(columns["provider_npi"], columns["service_day"], net_fees):
+        totals[npi] = totals.get(npi, 0) + fee
+        daily[(npi, day)] = daily.get((npi, day), 0) + fee
+    return parsed - started, time.perf_counter() - parsed
+
+
+def run_columnar(columns: dict[str, list]) -> tuple[float, float]:
+    """Batch parse, then vectorized net fees and group sums."""
+    started = time.perf_counter()
+    amounts = dollars_to_cents_many([
+        value
+        for line in zip(
+            columns["provider_fees"],
+            columns["allowed_fees"],
+            columns["member_coinsurance"],
+            columns["member_copay"],
+        )
+        for value in line
+    ])
+    parsed = time.perf_counter()
+
+    net_fees = net_fee_engine.net_fees_from_amounts(amounts)
+    net_fee_engine.sum_by_provider(columns["provider_npi"], net_fees)
+    net_fee_engine.sum_by_provider_day(columns["provider_npi"], columns["service_day"], net_fees)
+    return parsed - started, time.perf_counter() - parsed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--providers", type=int, default=5_000)
+    args = parser.parse_args(argv)
+
+    print(f"{'lines':>10} {'engine':>8} {'parse l/s':>12} {'compute l/s':>12} {'total l/s':>12}")
+    for size in args.sizes:
+        columns = make_columns(size, args.providers)
+        for name, run in (("loop", run_loop), ("numpy", run_columnar)):
+            parse, compute = run(columns)
+            print(
+                f"{size:>10} {name:>8} {size / parse:>12,.0f} "
+                f"{size / compute:>12,.0f} {size / (parse + compute):>12,.0f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Load test POST /claims and GET /providers/top concurrently.
+
+By default the app runs in-process (ASGI, no network) against
+DATABASE_URL, with rate limits lifted, and the SQL statements per claim
+and per leaderboard read are counted in a short sequential warm-up. With
+--url it drives a running server instead; statement counts then come
+from the X-DB-Statements header (server started with
+QUERY_STATS_ENABLED=true), and 429s from the server's rate limits are
+reported as such.
+Reports throughput and p50/p95/p99 latency per endpoint. --save and
+--baseline work as in bench_ingest (throughput is saved as seconds per
+request, so lower is better throughout).
+
+Usage:
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.load_test --duration 10
+    python -m benchmarks.load_test --ingest-workers 32 --read-workers 8 --lines 5
+    python -m benchmarks.load_test --url http://localhost:8000 --duration 60
+"""
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+from benchmarks.workload import (
+    StatementCounter,
+    compare_with_baseline,
+    make_claim,
+    percentile,
+    save_results,
+)
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    rate_limited: int = 0
+    # From X-DB-Statements, when the server runs with QUERY_STATS_ENABLED
+    statements: list[int] = field(default_factory=list)
+
+
+async def ingest_worker(client, rng, args, deadline, stats: EndpointStats, worker: int) -> None:
+    sequence = 0
+    while time.perf_counter() < deadline:
+        sequence += 1
+        payload = make_claim(rng, args.lines, args.providers, f"load-{args.run_id}-{worker}-{sequence}")
+        started = time.perf_counter()
+        response = await client.post("/claims/", json=payload)
+        record(stats, response, time.perf_counter() - started)
+
+
+async def read_worker(client, args, deadline, stats: EndpointStats) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/providers/top", params={"limit": args.top_limit})
+        record(stats, response, time.perf_counter() - started)
+
+
+def record(stats: EndpointStats, response: httpx.Response, seconds: float) -> None:
+    if response.status_code == 200:
+        stats.latencies.append(seconds)
+        if "X-DB-Statements" in response.headers:
+            stats.statements.append(int(response.headers["X-DB-Statements"]))
+    elif response.status_code == 429:
+        stats.rate_limited += 1
+    else:
+        stats.errors += 1
+
+
+async def count_statements(client, engine, clear_cache, rng, args, samples: int = 20) -> dict[str, float]:
+    """Statements per request, measured one request at a time."""
+    counter = StatementCounter(engine)
+    results = {}
+    with counter.counting():
+        for i in range(samples):
+            payload = make_claim(rng, args.lines, args.providers, f"load-{args.run_id}-warmup-{i}")
+            (await client.post("/claims/", json=payload)).raise_for_status()
+        results["statements_per_claim"] = counter.count / samples
+
+        counter.count = 0
+        for _ in range(samples):
+            # Bypass the leaderboard cache so the query itself is counted
+            (await client.get("/providers/top", params={"limit": args.top_limit})).raise_for_status()
+            clear_cache()
+        results["statements_per_read"] = counter.count / samples
+    return results
+
+
+async def run(args) -> dict[str, float]:
+    rng = random.Random(args.seed)
+    results: dict[str, float] = {}
+
+    count = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30)
+    else:
+        from app.core.config import settings
+        from app.db.init_db import init_db
+        from app.db.session import async_engine, engine
+        from app.main import app
+        from app.services.leaderboard_cache import leaderboard_cache
+
+        init_db()
+        settings.rate_limit_per_minute = 10**9
+        settings.rate_limit_ingest_per_minute = 0
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://load-test",
+            timeout=30,
+        )
+        bench_engine = async_engine.sync_engine if async_engine is not None else engine
+        count = (bench_engine, leaderboard_cache.clear)
+
+    ingest, read = EndpointStats(), EndpointStats()
+    async with client:
+        if count is not None:
+            results.update(await count_statements(client, *count, rng, args))
+
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            *(ingest_worker(client, random.Random(rng.random()), args, deadline, ingest, i)
+              for i in range(args.ingest_workers)),
+            *(read_worker(client, args, deadline, read) for _ in range(args.read_workers)),
+        )
+
+    print(f"{'endpoint':<20}{'ok':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'429':>7}{'errors':>8}")
+    for name, stats in (("POST /claims", ingest), ("GET /providers/top", read)):
+        latencies = sorted(stats.latencies)
+        throughput = len(latencies) / args.duration
+        p50, p95, p99 = (percentile(latencies, pct) * 1000 for pct in (50, 95, 99))
+        print(
+            f"{name:<20}{len(latencies):>8}{throughput:>10,.1f}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}"
+            f"{stats.rate_limited:>7}{stats.errors:>8}"
+        )
+        key = "claims" if stats is ingest else "top"
+        if stats.statements and count is None:
+            per_request = sum(stats.statements) / len(stats.statements)
+            results["statements_per_claim" if stats is ingest else "statements_per_read"] = per_request
+        if throughput:
+            results[f"{key}.seconds_per_request"] = 1 / throughput
+            results[f"{key}.p50_ms"], results[f"{key}.p95_ms"], results[f"{key}.p99_ms"] = p50, p95, p99
+
+    if ingest.latencies:
+        print(f"claim lines/s: {len(ingest.latencies) * args.lines / args.duration:,.0f}")
+    for name in ("statements_per_claim", "statements_per_read"):
+        if name in results:
+            print(f"{name.replace('_', ' ')}: {results[name]:.1f}")
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--ingest-workers", type=int, default=8)
+    parser.add_argument("--read-workers", type=int, default=2)
+    parser.add_argument("--lines", type=int, default=2, help="Lines per claim")
+    parser.add_argument("--providers", type=int, default=10_000)
+    parser.add_argument("--top-limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare with results saved by --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown")
+    args = parser.parse_args(argv)
+    # Keeps claim_references unique across runs against the same database
+    args.run_id = f"{time.time_ns():x}"
+    # Per-request INFO logs (app and httpx) would dominate the timings
+    logging.disable(logging.INFO)
+
+    results = asyncio.run(run(args))
+
+    if args.save:
+        save_results(results, args.save)
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Shared pieces of the ingest and load benchmarks: synthetic claims,
+statement counting, percentiles, and comparison against a saved baseline.
+"""
+import json
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROCEDURES = ("D0120", "D0140", "D0180", "D0210", "D0330", "D1110", "D2740", "D4341")
+
+
+def make_claim(rng: random.Random, lines: int, providers: int, reference: str) -> dict:
+    """A valid claim payload with `lines` lines for random providers."""
+    service_date = datetime(2024, 1, 1) + timedelta(days=rng.randrange(365), hours=9)
+    return {
+        "claim_reference": reference,
+        "lines": [
+            {
+                "service_date": service_date.isoformat(),
+                "submitted_procedure": rng.choice(PROCEDURES),
+                "quadrant": None,
+                "plan_group": "GRP-1000",
+                "subscriber_id": f"{rng.randrange(10**10):010d}",
+                "provider_npi": f"{rng.randrange(providers):010d}",
+                "provider_fees": f"{rng.randrange(5_000, 200_000) / 100:.2f}",
+                "allowed_fees": f"{rng.randrange(2_000, 150_000) / 100:.2f}",
+                "member_coinsurance": f"{rng.randrange(0, 5_000) / 100:.2f}",
+                "member_copay": f"{rng.randrange(0, 2_500) / 100:.2f}",
+            }
+            for _ in range(lines)
+        ],
+    }
+
+
+class StatementCounter:
+    """Counts statements sent to the database by `engine` while active."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.count = 0
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.count += 1
+
+    @contextmanager
+    def counting(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._record)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def compare_with_baseline(results: dict[str, float], path: str, tolerance: float) -> list[str]:
+    """
+    Regressions of `results` (lower is better) against the baseline saved
+    at `path`, beyond the relative `tolerance`. Metrics missing from
+    either side are ignored.
+    """
+    with open(path) as f:
+        baseline = json.load(f)
+    return [
+        f"{name}: {results[name]:.3f} vs baseline {baseline[name]:.3f} "
+        f"(+{(results[name] / baseline[name] - 1) * 100:.0f}%)"
+        for name in sorted(results.keys() & baseline.keys())
+        if baseline[name] > 0 and results[name] > baseline[name] * (1 + tolerance)
+    ]
+
+
+def save_results(results: dict[str, float], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
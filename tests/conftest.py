@@ -13,10 +13,12 @@ from sqlmodel import SQLModel, Session, create_engine
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.core.rate_limiter import limiter
 from app.db.session import get_session
 from app.models.claim import Claim
 from app.models.claim_line import ClaimLine
 from app.models.provider_aggregate import ProviderNetFeeAggregate
+from app.services.leaderboard_cache import leaderboard_cache
 
 
 # Use file-based SQLite for testing (in-memory doesn't work with multiple connections)
@@ -27,6 +29,22 @@ _test_db_file.close()
 TEST_DATABASE_URL = f"sqlite:///{_test_db_file.name}"
 
 
+@pytest.fixture(autouse=True)
+def reset_leaderboard_cache():
+    """Each test gets a fresh database, so cached leaderboards must not leak."""
+    leaderboard_cache.clear()
+    yield
+    leaderboard_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_limiter():
+    """Rate limit counters are process wide, so each test starts with a full budget."""
+    limiter.reset()
+    yield
+    limiter.reset()
+
+
 @pytest.fixture(scope="function")
 def test_engine():
     """Create a test database engine."""
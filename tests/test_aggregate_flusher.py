@@ -0,0 +1,45 @@
+"""
+Tests for write-behind (ledger) aggregate mode.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.provider_aggregate import ProviderNetFeeAggregate
+from app.models.provider_fee_delta import ProviderFeeDelta
+from app.services.aggregate_flusher import flush_ledger
+from app.services.leaderboard_cache import leaderboard_cache
+
+
+@pytest.fixture
+def ledger_mode(monkeypatch):
+    monkeypatch.setattr(settings, "aggregate_write_mode", "ledger")
+
+
+def test_ledger_mode_defers_aggregate_updates(ledger_mode, client: TestClient, test_session: Session, sample_claim_data):
+    """Test that claims only append deltas until the ledger is flushed."""
+    response = client.post("/claims/", json=sample_claim_data)
+    assert response.status_code == 200
+
+    assert test_session.get(ProviderNetFeeAggregate, "1234567890") is None
+    deltas = list(test_session.exec(select(ProviderFeeDelta)))
+    assert [(d.provider_npi, d.delta_cents) for d in deltas] == [("1234567890", 8125)]
+    test_session.rollback()
+
+    assert flush_ledger(test_session, batch_size=100) == 1
+
+    assert test_session.get(ProviderNetFeeAggregate, "1234567890").total_net_fee_cents == 8125
+    assert list(test_session.exec(select(ProviderFeeDelta))) == []
+
+
+def test_flush_ledger_in_batches(ledger_mode, client: TestClient, test_session: Session, sample_claim_data):
+    """Test that the flusher drains the ledger in bounded batches and invalidates the cache."""
+    for _ in range(5):
+        assert client.post("/claims/", json=sample_claim_data).status_code == 200
+
+    assert flush_ledger(test_session, batch_size=2) == 5
+    assert test_session.get(ProviderNetFeeAggregate, "1234567890").total_net_fee_cents == 5 * 8125
+    assert leaderboard_cache.invalidations == 3
+    test_session.rollback()
+    assert flush_ledger(test_session, batch_size=2) == 0
@@ -0,0 +1,121 @@
+"""
+Tests for the aggregate drift check and repair.
+"""
+from datetime import date
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, delete, select
+
+from app.models.claim_line import ClaimLine
+from app.models.provider_aggregate import ProviderNetFeeAggregate
+from app.models.provider_aggregate_shard import ProviderNetFeeShard
+from app.models.provider_fee_delta import ProviderFeeDelta
+from app.services.aggregate_reconciler import reconcile_aggregates
+
+
+def _claim(reference: str, npi: str, provider_fees: str) -> dict:
+    return {
+        "claim_reference": reference,
+        "lines": [
+            {
+                "service_date": "2024-01-15T10:00:00",
+                "submitted_procedure": "D0180",
+                "plan_group": "GRP-1000",
+                "subscriber_id": "1234567890",
+                "provider_npi": npi,
+                "provider_fees": provider_fees,
+                "allowed_fees": "0.00",
+                "member_coinsurance": "0.00",
+                "member_copay": "0.00",
+            }
+        ],
+    }
+
+
+def _ingest(client: TestClient, count: int) -> None:
+    claims = [_claim(f"c-{i}", f"{i:010d}", f"{i + 1}.00") for i in range(count)]
+    assert client.post("/claims/batch", json={"claims": claims}).json()["processed"] == count
+
+
+def _totals(session: Session) -> dict[str, int]:
+    return {
+        row.provider_npi: row.total_net_fee_cents
+        for row in session.exec(select(ProviderNetFeeAggregate))
+    }
+
+
+def test_reconcile_clean_aggregates(client: TestClient, test_session: Session):
+    """Test that consistent aggregates are left alone."""
+    _ingest(client, 5)
+
+    stats = reconcile_aggregates(test_session, chunk_size=2)
+
+    assert stats.chunks == 3
+    assert stats.providers_checked == 5
+    assert stats.mismatched == 0
+    assert stats.patched == 0
+
+
+def test_reconcile_patches_only_drifted_rows(client: TestClient, test_session: Session):
+    """Test that wrong, missing and orphaned aggregates are repaired."""
+    _ingest(client, 5)
+
+    test_session.get(ProviderNetFeeAggregate, "0000000001").total_net_fee_cents += 50
+    test_session.delete(test_session.get(ProviderNetFeeAggregate, "0000000003"))
+    test_session.add(ProviderNetFeeAggregate(provider_npi="9999999999", total_net_fee_cents=700))
+    untouched = test_session.get(ProviderNetFeeAggregate, "0000000004").updated_at
+    test_session.commit()
+
+    dry = reconcile_aggregates(test_session, chunk_size=2, dry_run=True)
+    assert (dry.mismatched, dry.patched) == (3, 0)
+
+    stats = reconcile_aggregates(test_session, chunk_size=2)
+    assert stats.mismatched == 3
+    assert stats.missing == 1
+    assert stats.orphaned == 1
+    assert stats.drift_cents == 50 + 400 + 700
+    assert stats.max_drift_cents == 700
+    assert stats.patched == 3
+
+    test_session.expire_all()
+    assert _totals(test_session) == {
+        "0000000000": 100,
+        "0000000001": 200,
+        "0000000002": 300,
+        "0000000003": 400,
+        "0000000004": 500,
+        "9999999999": 0,
+    }
+    assert test_session.get(ProviderNetFeeAggregate, "0000000004").updated_at == untouched
+    test_session.rollback()
+
+    assert reconcile_aggregates(test_session, chunk_size=2).mismatched == 0
+
+
+def test_reconcile_counts_shards_and_ledger(client: TestClient, test_session: Session):
+    """Test that unfolded shard rows and unflushed ledger deltas are not drift."""
+    _ingest(client, 2)
+
+    # Move part of each total into a shard row and the ledger
+    test_session.get(ProviderNetFeeAggregate, "0000000000").total_net_fee_cents -= 60
+    test_session.add(ProviderNetFeeShard(provider_npi="0000000000", shard=1, total_net_fee_cents=40))
+    test_session.get(ProviderNetFeeAggregate, "0000000001").total_net_fee_cents -= 200
+    test_session.add(ProviderFeeDelta(
+        provider_npi="0000000000",
+        bucket_date=date(2024, 1, 15),
+        delta_cents=20,
+    ))
+    test_session.add(ProviderFeeDelta(
+        provider_npi="0000000001",
+        bucket_date=date(2024, 1, 15),
+        delta_cents=200,
+    ))
+    test_session.commit()
+
+    assert reconcile_aggregates(test_session, chunk_size=10).mismatched == 0
+
+    # Lines written outside ClaimService are drift
+    test_session.exec(delete(ClaimLine).where(ClaimLine.provider_npi == "0000000001"))
+    test_session.commit()
+    stats = reconcile_aggregates(test_session, chunk_size=10)
+    assert (stats.mismatched, stats.orphaned, stats.drift_cents) == (1, 1, 200)
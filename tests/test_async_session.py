@@ -0,0 +1,80 @@
+"""
+Tests for the async database mode (AsyncSession-backed SessionRunner).
+"""
+import asyncio
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.db.session import SessionRunner, get_session_runner
+from app.main import app
+from app.models.provider_aggregate import ProviderNetFeeAggregate
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def async_db():
+    """Create a file-backed SQLite database reachable from sync and async engines."""
+    db_file = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+    db_file.close()
+    sync_engine = create_engine(f"sqlite:///{db_file.name}")
+    SQLModel.metadata.create_all(sync_engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_file.name}")
+    yield sync_engine, async_engine
+    asyncio.run(async_engine.dispose())
+    sync_engine.dispose()
+    os.unlink(db_file.name)
+
+
+@pytest.fixture
+def async_client(async_db):
+    """Create a test client whose routes run on an AsyncSession."""
+    _, async_engine = async_db
+
+    async def override_get_session_runner():
+        async with AsyncSession(async_engine) as session:
+            yield SessionRunner(session)
+
+    app.dependency_overrides[get_session_runner] = override_get_session_runner
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_session_runner_runs_sync_work_on_async_session(async_db):
+    """Test that run() executes sync ORM code through AsyncSession.run_sync."""
+    sync_engine, async_engine = async_db
+
+    def add_aggregate(session: Session, npi: str) -> str:
+        with session.begin():
+            session.add(ProviderNetFeeAggregate(provider_npi=npi, total_net_fee_cents=1))
+        return npi
+
+    async def run():
+        async with AsyncSession(async_engine) as session:
+            return await SessionRunner(session).run(add_aggregate, "1111111111")
+
+    assert asyncio.run(run()) == "1111111111"
+    with Session(sync_engine) as session:
+        assert session.get(ProviderNetFeeAggregate, "1111111111") is not None
+
+
+def test_async_mode_claim_and_top_providers(async_client: TestClient, async_db, sample_claim_data):
+    """Test claim ingest and top providers end to end in async mode."""
+    response = async_client.post("/claims/", json=sample_claim_data)
+    assert response.status_code == 200
+
+    response = async_client.post("/claims/batch", json={"claims": [sample_claim_data]})
+    assert response.status_code == 200
+    assert response.json()["processed"] == 1
+
+    response = async_client.get("/providers/top")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"provider_npi": "1234567890", "total_net_fee_cents": 16250},
+    ]
@@ -0,0 +1,235 @@
+"""
+Tests for the historical claim backfill loader.
+"""
+import io
+from contextlib import contextmanager
+
+import pytest
+
+from app.cli.backfill import parse_args
+from app.core.config import settings
+from app.services import net_fee_engine
+from app.services.backfill import (
+    LINE_COLUMNS,
+    REBUILD_AGGREGATES_SQL,
+    ClaimBackfillLoader,
+    prepare_claim,
+    read_csv_claims,
+    read_jsonl_claims,
+)
+
+CSV_DATA = """claim_reference,service date,submitted procedure,quadrant,Plan/Group,subscriber_id,provider_npi,provider_fees,allowed_fees,member_coinsurance,member_copay
+A,2024-01-15T10:00:00,D0180,,GRP-1000,1234567890,1234567890,$100.00,$100.00,$0.00,$0.00
+A,2024-01-15T10:00:00,D0210,UR,GRP-1000,1234567890,1234567890,$130.00,$65.00,$16.25,$0.00
+B,2024-01-16T10:00:00,D0180,,GRP-1000,1234567890,1111111111,$50.00,$25.00,$0.00,$0.00
+"""
+
+
+class FakeCopy:
+    def __init__(self, sink):
+        self.sink = sink
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write_row(self, row):
+        self.sink.append(row)
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement):
+        self.conn.statements.append((self.conn.transactions, statement))
+        self.rowcount = 0
+
+    def copy(self, statement):
+        sink = []
+        self.conn.copies.append((statement, sink))
+        return FakeCopy(sink)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.copies = []
+        self.statements = []
+        self.transactions = 0
+
+    @contextmanager
+    def transaction(self):
+        self.transactions += 1
+        yield
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+def test_read_csv_claims_groups_by_reference():
+    """Test that consecutive rows with the same reference form one claim."""
+    claims = list(read_csv_claims(io.StringIO(CSV_DATA)))
+    assert [c["claim_reference"] for c in claims] == ["A", "B"]
+    assert len(claims[0]["lines"]) == 2
+    assert claims[0]["lines"][0]["plan_group"] == "GRP-1000"
+
+
+def test_read_jsonl_claims():
+    """Test that JSONL lines are parsed as claim payloads."""
+    data = '{"claim_reference": "A", "lines": []}\n\n{"claim_reference": "B", "lines": []}\n'
+    claims = list(read_jsonl_claims(io.StringIO(data)))
+    assert [c["claim_reference"] for c in claims] == ["A", "B"]
+
+
+def test_read_jsonl_claims_rejects_bad_lines_by_number():
+    """Test that malformed JSONL lines are rejected with their line number and the load continues."""
+    data = '{"claim_reference": "bad", "lines": [\n[1, 2]\n\n{"claim_reference": "B", "lines": []}\n'
+    claims = list(read_jsonl_claims(io.StringIO(data)))
+    errors = []
+
+    stats = ClaimBackfillLoader(FakeConnection(), chunk_size=10).load(
+        claims, on_error=lambda index, msg: errors.append((index, msg))
+    )
+
+    assert stats.claims_rejected == 3
+    assert errors[0][0] == 0 and errors[0][1].startswith("line 1: invalid JSON")
+    assert errors[1] == (1, "line 2: expected a JSON object")
+    assert errors[2] == (2, "At least one claim line is required")
+
+
+def test_loader_prices_each_chunk_with_the_numpy_engine(monkeypatch):
+    """Test that the NumPy engine threshold applies to a whole chunk, not to each small claim."""
+    monkeypatch.setattr(settings, "net_fee_engine", "numpy")
+    monkeypatch.setattr(settings, "net_fee_numpy_min_lines", 3)
+    calls = []
+    original = net_fee_engine.net_fees_from_amounts
+
+    def net_fees_from_amounts(amounts):
+        calls.append(len(amounts) // 4)
+        return original(amounts)
+
+    monkeypatch.setattr(net_fee_engine, "net_fees_from_amounts", net_fees_from_amounts)
+    conn = FakeConnection()
+
+    ClaimBackfillLoader(conn, chunk_size=10).load(read_csv_claims(io.StringIO(CSV_DATA)))
+
+    assert calls == [3]
+    net_fee = LINE_COLUMNS.index("net_fee_cents")
+    assert [row[net_fee] for row in conn.copies[1][1]] == [0, 8125, 2500]
+
+
+def test_prepare_claim_computes_net_fee():
+    """Test that backfill rows use the same money parsing and net fee logic as the API."""
+    claim = next(read_csv_claims(io.StringIO(CSV_DATA)))
+    claim_row, line_rows = prepare_claim(claim)
+
+    assert claim_row[1] == "A"
+    net_fee = LINE_COLUMNS.index("net_fee_cents")
+    assert [row[net_fee] for row in line_rows] == [0, 8125]
+    assert line_rows[0][LINE_COLUMNS.index("quadrant")] is None
+    assert all(row[0] == claim_row[0] for row in line_rows)
+
+
+@pytest.mark.parametrize(
+    "override, message",
+    [
+        ({"provider_npi": "123"}, "provider_npi"),
+        ({"submitted_procedure": "C0180"}, "submitted_procedure"),
+        ({"provider_fees": "abc"}, "money"),
+        ({"plan_group": ""}, "plan_group is required"),
+    ],
+)
+def test_prepare_claim_rejects_invalid_lines(override, message):
+    """Test that an invalid line rejects the whole claim with a ValueError."""
+    claim = next(read_csv_claims(io.StringIO(CSV_DATA)))
+    claim["lines"][1].update(override)
+    with pytest.raises(ValueError, match=message):
+        prepare_claim(claim)
+
+
+@pytest.mark.parametrize(
+    "service_date",
+    [20240115, "15/01/2024", ["2024-01-15"]],
+)
+def test_prepare_claim_rejects_bad_service_dates(service_date):
+    """Test that a service_date that is not an ISO string rejects the claim before COPY."""
+    claim = next(read_csv_claims(io.StringIO(CSV_DATA)))
+    claim["lines"][0]["service_date"] = service_date
+    with pytest.raises(ValueError, match="service_date must be an ISO 8601"):
+        prepare_claim(claim)
+
+
+def test_loader_rejects_badly_shaped_lines_and_continues():
+    """Test that claims whose lines are not a list of objects are rejected without aborting the load."""
+    data = (
+        '{"claim_reference": "A", "lines": ["D0180"]}\n'
+        '{"claim_reference": "B", "lines": {"provider_npi": "1234567890"}}\n'
+    )
+    claims = list(read_jsonl_claims(io.StringIO(data)))
+    claims.append(next(read_csv_claims(io.StringIO(CSV_DATA))))
+    conn = FakeConnection()
+    errors = []
+
+    stats = ClaimBackfillLoader(conn, chunk_size=10).load(
+        claims, on_error=lambda index, msg: errors.append((index, msg))
+    )
+
+    assert errors == [
+        (0, "lines must be a list of objects"),
+        (1, "lines must be a list of objects"),
+    ]
+    assert stats.claims_rejected == 2
+    assert stats.claims_loaded == 1
+
+
+def test_loader_copies_in_chunks_and_reports_rejects():
+    """Test that the loader writes bounded COPY chunks and skips invalid claims."""
+    claims = list(read_csv_claims(io.StringIO(CSV_DATA)))
+    claims.insert(1, {"claim_reference": "bad", "lines": []})
+    conn = FakeConnection()
+    errors = []
+
+    stats = ClaimBackfillLoader(conn, chunk_size=2).load(
+        claims, on_error=lambda index, msg: errors.append(index)
+    )
+
+    assert stats.claims_loaded == 2
+    assert stats.lines_loaded == 3
+    assert stats.claims_rejected == 1
+    assert stats.chunks == 2
+    assert conn.transactions == 2
+    assert errors == [1]
+    assert conn.copies[0][0].startswith("COPY claims ")
+    assert conn.copies[1][0].startswith("COPY claim_lines ")
+    assert len(conn.copies[1][1]) == 2
+
+
+def test_rebuild_aggregates_drops_unflushed_ledger_deltas(monkeypatch):
+    """Test that a rebuild in ledger mode deletes pending deltas in the same transaction."""
+    monkeypatch.setattr(settings, "aggregate_write_mode", "ledger")
+    conn = FakeConnection()
+
+    ClaimBackfillLoader(conn, chunk_size=10).rebuild_aggregates()
+
+    assert conn.transactions == 1
+    statements = [statement for _, statement in conn.statements]
+    assert statements[:2] == [
+        "LOCK TABLE provider_fee_delta IN EXCLUSIVE MODE",
+        "DELETE FROM provider_fee_delta",
+    ]
+    assert REBUILD_AGGREGATES_SQL in statements[2:]
+
+
+def test_rebuild_only_needs_no_input_path():
+    """Test that the CLI takes --rebuild-only without a path but requires a path otherwise."""
+    assert parse_args(["--rebuild-only"]).path is None
+    with pytest.raises(SystemExit):
+        parse_args([])
@@ -0,0 +1,70 @@
+"""
+Tests for the streaming claim_lines export.
+"""
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.services.claim_export import EXPORT_COLUMNS, encode_csv, stream_export
+
+
+def _post_claims(client: TestClient, sample_claim_data, count: int) -> None:
+    for i in range(count):
+        data = dict(sample_claim_data, claim_reference=f"export-{i}")
+        assert client.post("/claims/", json=data).status_code == 200
+
+
+def test_export_ndjson(client: TestClient, sample_claim_data, monkeypatch):
+    """Test NDJSON export streams every line across several batches."""
+    monkeypatch.setattr(settings, "export_batch_size", 3)
+    _post_claims(client, sample_claim_data, 4)
+
+    response = client.get("/claims/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 8
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+    assert set(rows[0]) == set(EXPORT_COLUMNS)
+    assert rows[1]["net_fee_cents"] == 8125
+    assert rows[0]["service_date"] == "2024-01-15T10:00:00"
+
+
+def test_export_csv_with_window(client: TestClient, sample_claim_data):
+    """Test CSV export with a service-date window."""
+    _post_claims(client, sample_claim_data, 2)
+
+    response = client.get("/claims/export", params={"format": "csv", "from": "2024-01-15"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 4
+    assert rows[0]["provider_npi"] == "1234567890"
+
+    response = client.get("/claims/export", params={"format": "csv", "to": "2024-01-14"})
+    assert response.text == ",".join(EXPORT_COLUMNS) + "\n"
+
+
+def test_export_rejects_unknown_format(client: TestClient):
+    """Test that only ndjson and csv are accepted."""
+    assert client.get("/claims/export", params={"format": "xml"}).status_code == 422
+
+
+def test_stream_export_yields_one_chunk_per_batch(client: TestClient, test_engine, sample_claim_data):
+    """Test that the encoder emits one chunk per fetched batch."""
+    _post_claims(client, sample_claim_data, 3)
+
+    chunks = list(stream_export(test_engine, "ndjson", 2))
+    assert [chunk.count("\n") for chunk in chunks] == [2, 2, 2]
+
+
+def test_encode_csv_writes_header_first():
+    """Test the CSV header is emitted with the first batch."""
+    chunks = list(encode_csv([[tuple(range(len(EXPORT_COLUMNS)))]]))
+    assert len(chunks) == 1
+    assert chunks[0].splitlines()[0] == ",".join(EXPORT_COLUMNS)
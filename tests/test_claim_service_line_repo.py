@@ -0,0 +1,55 @@
+"""
+Tests for the claim line repository.
+"""
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlmodel import Session
+
+from app.models.claim import Claim
+from app.repositories.claim_repo import ClaimRepository
+from app.repositories.claim_service_line_repo import ClaimServiceLineRepository
+from app.schemas.claim import ClaimCreateRequest
+from app.services.claim_service import build_line_rows
+
+
+def test_bulk_insert_rows_stores_every_column(test_session: Session, sample_claim_data):
+    """Test that the Core bulk insert stores each row's values, including cents and net fee columns."""
+    claim = Claim(id=uuid4(), claim_reference="bulk")
+    lines = ClaimCreateRequest.model_validate(sample_claim_data).model_dump()["lines"]
+    lines[1]["quadrant"] = "UR"
+    created_at = datetime(2024, 2, 1, 12, tzinfo=timezone.utc)
+    rows = build_line_rows(claim.id, lines, created_at)
+
+    with test_session.begin():
+        ClaimRepository(test_session).bulk_create([claim])
+        ClaimServiceLineRepository(test_session).bulk_insert_rows(rows)
+
+    stored = ClaimServiceLineRepository(test_session).get_by_claim_id(claim.id)
+    assert [
+        (
+            line.submitted_procedure,
+            line.quadrant,
+            line.provider_fees_cents,
+            line.allowed_fees_cents,
+            line.member_coinsurance_cents,
+            line.member_copay_cents,
+            line.net_fee_cents,
+        )
+        for line in stored
+    ] == [
+        ("D0180", None, 10000, 10000, 0, 0, 0),
+        ("D0210", "UR", 13000, 6500, 1625, 0, 8125),
+    ]
+    assert all(line.id is not None for line in stored)
+    assert stored[0].service_date == datetime(2024, 1, 15, 10)
+    assert stored[0].provider_npi == "1234567890"
+    assert stored[0].plan_group == "GRP-1000"
+    assert stored[0].subscriber_id == "1234567890"
+    assert stored[0].created_at.replace(tzinfo=timezone.utc) == created_at
+
+
+def test_bulk_insert_rows_empty_is_noop(test_session: Session):
+    """Test that an empty row list sends no INSERT."""
+    ClaimServiceLineRepository(test_session).bulk_insert_rows([])
+    assert not test_session.in_transaction()
@@ -204,3 +204,93 @@ def test_create_claim_increments_existing_aggregate(client: TestClient, test_ses
     # First claim: 8125, Second claim: 2500, Total: 10625
     assert aggregate.total_net_fee_cents == 10625
 
+
+def test_create_claims_batch_success(client: TestClient, test_session: Session, sample_claim_data):
+    """Test that a batch of claims is persisted and aggregated together."""
+    second_claim = {
+        "claim_reference": "test_claim_002",
+        "lines": [
+            {
+                "service_date": "2024-01-16T10:00:00",
+                "submitted_procedure": "D0180",
+                "plan_group": "GRP-1000",
+                "subscriber_id": "1234567890",
+                "provider_npi": "1234567890",
+                "provider_fees": "50.00",
+                "allowed_fees": "25.00",
+                "member_coinsurance": "0.00",
+                "member_copay": "0.00",
+            }
+        ],
+    }
+
+    response = client.post("/claims/batch", json={"claims": [sample_claim_data, second_claim]})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["processed"] == 2
+    assert data["failed"] == 0
+    assert [r["index"] for r in data["results"]] == [0, 1]
+    assert all(r["claim_id"] and r["error"] is None for r in data["results"])
+
+    lines = list(test_session.exec(select(ClaimLine)).all())
+    assert len(lines) == 3
+
+    aggregate = test_session.get(ProviderNetFeeAggregate, "1234567890")
+    assert aggregate.total_net_fee_cents == 10625  # 8125 + 2500
+
+
+def test_create_claims_batch_reports_invalid_claims(client: TestClient, test_session: Session, sample_claim_data):
+    """Test that invalid claims are reported per index without failing the batch."""
+    invalid_claim = {
+        "claim_reference": "invalid",
+        "lines": [dict(sample_claim_data["lines"][0], provider_npi="123")],
+    }
+
+    response = client.post("/claims/batch", json={"claims": [invalid_claim, sample_claim_data]})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["processed"] == 1
+    assert data["failed"] == 1
+    assert data["results"][0]["claim_id"] is None
+    assert "provider_npi" in data["results"][0]["error"]
+    assert data["results"][1]["claim_id"] is not None
+
+    claims = list(test_session.exec(select(Claim)).all())
+    assert [c.claim_reference for c in claims] == ["test_claim_001"]
+
+
+def test_create_claims_batch_empty(client: TestClient):
+    """Test that an empty batch is rejected."""
+    response = client.post("/claims/batch", json={"claims": []})
+    assert response.status_code == 422
+
+
+def test_get_claim_returns_lines(client: TestClient, sample_claim_data):
+    """Test reading a claim back with its service lines."""
+    claim_id = client.post("/claims/", json=sample_claim_data).json()["claim_id"]
+
+    response = client.get(f"/claims/{claim_id}")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["claim_id"] == claim_id
+    assert data["claim_reference"] == "test_claim_001"
+    assert [line["submitted_procedure"] for line in data["lines"]] == ["D0180", "D0210"]
+    assert [line["net_fee_cents"] for line in data["lines"]] == [0, 8125]
+
+
+def test_get_claim_not_found(client: TestClient):
+    """Test that an unknown claim id returns 404."""
+    response = client.get("/claims/3fa85f64-5717-4562-b3fc-2c963f66afa6")
+    assert response.status_code == 404
+
+
+def test_create_claim_rejects_fractional_cents(client: TestClient, sample_claim_data):
+    """Test that amounts with digits past the cent are rejected by default."""
+    sample_claim_data["lines"][0]["provider_fees"] = "100.005"
+
+    response = client.post("/claims/", json=sample_claim_data)
+    assert response.status_code == 400
+    assert "fractional cents" in response.json()["detail"]
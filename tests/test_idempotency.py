@@ -0,0 +1,65 @@
+"""
+Tests for idempotent claim ingest keyed on claim_reference.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.claim import Claim
+from app.models.claim_line import ClaimLine
+from app.models.outbox_event import OutboxEvent
+from app.models.provider_aggregate import ProviderNetFeeAggregate
+from app.repositories.claim_repo import CLAIM_REFERENCE_UNIQUE_INDEX
+
+
+@pytest.fixture
+def idempotent(monkeypatch, test_engine):
+    """Enable idempotency mode and add the unique index init_db would create."""
+    monkeypatch.setattr(settings, "claim_idempotency_enabled", True)
+    with test_engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX {CLAIM_REFERENCE_UNIQUE_INDEX} ON claims (claim_reference)"
+        ))
+
+
+def test_replay_returns_original_claim(idempotent, client: TestClient, test_session: Session, sample_claim_data, monkeypatch):
+    """Test that a retried claim returns the same id without double counting."""
+    monkeypatch.setattr(settings, "outbox_enabled", True)
+    first = client.post("/claims/", json=sample_claim_data)
+    second = client.post("/claims/", json=sample_claim_data)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["claim_id"] == second.json()["claim_id"]
+
+    assert len(list(test_session.exec(select(Claim)))) == 1
+    assert len(list(test_session.exec(select(ClaimLine)))) == 2
+    assert len(list(test_session.exec(select(OutboxEvent)))) == 1
+    assert test_session.get(ProviderNetFeeAggregate, "1234567890").total_net_fee_cents == 8125
+
+
+def test_claims_without_reference_are_not_deduplicated(idempotent, client: TestClient, test_session: Session, sample_claim_data):
+    """Test that claims without a claim_reference are always ingested."""
+    del sample_claim_data["claim_reference"]
+    first = client.post("/claims/", json=sample_claim_data)
+    second = client.post("/claims/", json=sample_claim_data)
+
+    assert first.json()["claim_id"] != second.json()["claim_id"]
+    assert test_session.get(ProviderNetFeeAggregate, "1234567890").total_net_fee_cents == 2 * 8125
+
+
+def test_batch_replays_and_in_batch_duplicates(idempotent, client: TestClient, test_session: Session, sample_claim_data):
+    """Test that batches skip known references and duplicates within the batch."""
+    original = client.post("/claims/", json=sample_claim_data).json()["claim_id"]
+
+    new_claim = dict(sample_claim_data, claim_reference="test_claim_002")
+    response = client.post("/claims/batch", json={
+        "claims": [sample_claim_data, new_claim, new_claim],
+    })
+    results = response.json()["results"]
+
+    assert results[0]["claim_id"] == original
+    assert results[1]["claim_id"] == results[2]["claim_id"] != original
+    assert len(list(test_session.exec(select(Claim)))) == 2
+    assert test_session.get(ProviderNetFeeAggregate, "1234567890").total_net_fee_cents == 2 * 8125
@@ -0,0 +1,33 @@
+"""
+Tests for time-ordered claim id generation.
+"""
+import time
+
+from app.core.config import settings
+from app.core.ids import new_claim_id, uuid7
+
+
+def test_uuid7_layout():
+    """Test version/variant bits and the embedded millisecond timestamp."""
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+    assert before <= value.int >> 80 <= after + 1
+
+
+def test_uuid7_strictly_increasing():
+    """Test that ids generated in a tight loop are unique and sorted."""
+    ids = [uuid7() for _ in range(20000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_new_claim_id_follows_strategy(monkeypatch):
+    """Test that claim_id_strategy selects the generator."""
+    monkeypatch.setattr(settings, "claim_id_strategy", "uuid4")
+    assert new_claim_id().version == 4
+    monkeypatch.setattr(settings, "claim_id_strategy", "uuid7")
+    assert new_claim_id().version == 7
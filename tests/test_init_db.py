@@ -0,0 +1,39 @@
+"""
+Tests for schema creation and upgrades in init_db.
+"""
+from sqlalchemy import inspect, text
+
+import app.db.init_db as init_db_module
+from app.core.config import settings
+from app.db.init_db import init_db
+from app.repositories.claim_repo import CLAIM_REFERENCE_INDEX, CLAIM_REFERENCE_UNIQUE_INDEX
+
+
+def index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_init_db_drops_the_superseded_provider_npi_index(test_engine, monkeypatch):
+    """Test that upgrading drops the single-column provider_npi index the covering index replaced."""
+    with test_engine.begin() as conn:
+        conn.execute(text("CREATE INDEX ix_claim_lines_provider_npi ON claim_lines (provider_npi)"))
+    monkeypatch.setattr(init_db_module, "engine", test_engine)
+
+    init_db()
+
+    names = index_names(test_engine, "claim_lines")
+    assert "ix_claim_lines_provider_npi" not in names
+    assert "ix_claim_lines_provider_service_date" in names
+
+
+def test_init_db_replaces_the_claim_reference_index_in_idempotency_mode(test_engine, monkeypatch):
+    """Test that idempotency mode leaves claim_reference with only its unique index."""
+    monkeypatch.setattr(init_db_module, "engine", test_engine)
+    monkeypatch.setattr(settings, "claim_idempotency_enabled", True)
+
+    init_db()
+    init_db()
+
+    names = index_names(test_engine, "claims")
+    assert CLAIM_REFERENCE_UNIQUE_INDEX in names
+    assert CLAIM_REFERENCE_INDEX not in names
@@ -0,0 +1,86 @@
+"""
+Tests for the in-process top providers leaderboard cache.
+"""
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.models.provider_aggregate import ProviderNetFeeAggregate
+from app.services.leaderboard_cache import LeaderboardCache, leaderboard_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_hit_until_ttl_expires():
+    """Test that a stored value is served until the TTL elapses."""
+    clock = FakeClock()
+    cache = LeaderboardCache(ttl_seconds=5, clock=clock)
+
+    assert cache.get() is None
+    cache.set(["a"], cache.generation)
+    assert cache.get() == ["a"]
+
+    clock.now = 5.0
+    assert cache.get() is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "invalidations": 0}
+
+
+def test_cache_ignores_values_loaded_before_invalidation():
+    """Test that a load racing with an invalidation does not store stale data."""
+    cache = LeaderboardCache(ttl_seconds=5)
+    generation = cache.generation
+    cache.invalidate()
+    cache.set(["stale"], generation)
+    assert cache.get() is None
+
+
+def test_cache_disabled_with_zero_ttl():
+    """Test that a TTL of zero disables caching."""
+    cache = LeaderboardCache(ttl_seconds=0)
+    cache.set(["a"], cache.generation)
+    assert cache.get() is None
+
+
+def test_top_providers_served_from_cache(client: TestClient):
+    """Test that repeated reads hit the cache."""
+    client.get("/providers/top")
+    client.get("/providers/top")
+    assert leaderboard_cache.hits == 1
+    assert leaderboard_cache.misses == 1
+
+
+def test_claim_commit_invalidates_cache(client: TestClient, sample_claim_data):
+    """Test that committing claim deltas refreshes the leaderboard immediately."""
+    assert client.get("/providers/top").json() == []
+
+    response = client.post("/claims/", json=sample_claim_data)
+    assert response.status_code == 200
+    assert leaderboard_cache.invalidations == 1
+
+    data = client.get("/providers/top").json()
+    assert data == [{"provider_npi": "1234567890", "total_net_fee_cents": 8125}]
+
+
+def test_direct_aggregate_write_invalidates_cache(client: TestClient, test_session: Session):
+    """Test that any committed ORM write to the aggregate table invalidates the cache."""
+    assert client.get("/providers/top").json() == []
+
+    test_session.add(ProviderNetFeeAggregate(provider_npi="1111111111", total_net_fee_cents=100))
+    test_session.commit()
+
+    assert len(client.get("/providers/top").json()) == 1
+
+
+def test_rolled_back_claim_keeps_cache(client: TestClient, sample_claim_data):
+    """Test that a failed claim does not invalidate the cache."""
+    client.get("/providers/top")
+    sample_claim_data["lines"][1]["provider_npi"] = "bad"
+
+    response = client.post("/claims/", json=sample_claim_data)
+    assert response.status_code == 400
+    assert leaderboard_cache.invalidations == 0
@@ -0,0 +1,95 @@
+"""
+Tests for the Prometheus /metrics endpoint and its instrumentation.
+"""
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+
+from app.core.metrics import CLAIM_STAGES, TimedQueuePool
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_exposes_request_latency(client: TestClient):
+    """Test that /metrics serves the request latency histogram in text format."""
+    before = sample("http_request_duration_seconds_count", method="GET", route="/health", status="200")
+    client.get("/health")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds_bucket" in response.text
+    assert sample(
+        "http_request_duration_seconds_count", method="GET", route="/health", status="200"
+    ) == before + 1
+
+
+def test_request_latency_is_labelled_by_route_template(client: TestClient):
+    """Test that requests are labelled by route template, and unknown paths as unmatched."""
+    labels = dict(method="GET", route="/claims/{claim_id}", status="404")
+    before = sample("http_request_duration_seconds_count", **labels)
+    unmatched = sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404")
+
+    client.get("/claims/00000000-0000-0000-0000-000000000001")
+    client.get("/no-such-route")
+
+    assert sample("http_request_duration_seconds_count", **labels) == before + 1
+    assert sample(
+        "http_request_duration_seconds_count", method="GET", route="unmatched", status="404"
+    ) == unmatched + 1
+
+
+def test_claim_ingestion_records_every_stage(client: TestClient, sample_claim_data):
+    """Test that one claim records a timing for every ingest stage."""
+    before = {stage: sample("claim_stage_duration_seconds_count", stage=stage) for stage in CLAIM_STAGES}
+
+    assert client.post("/claims/", json=sample_claim_data).status_code == 200
+
+    for stage in CLAIM_STAGES:
+        assert sample("claim_stage_duration_seconds_count", stage=stage) == before[stage] + 1, stage
+
+
+def test_rate_limit_rejections_are_counted(client: TestClient):
+    """Test that each 429 increments the rejection counter for its route."""
+    before = sample("rate_limit_rejections_total", route="/providers/top")
+    statuses = [client.get("/providers/top").status_code for _ in range(12)]
+
+    assert statuses.count(429) == 2
+    assert sample("rate_limit_rejections_total", route="/providers/top") == before + 2
+
+
+def test_leaderboard_cache_lookups_are_counted(client: TestClient, sample_claim_data):
+    """Test that /metrics reports leaderboard cache hits, misses and invalidations."""
+    hits = sample("leaderboard_cache_lookups_total", result="hit")
+    misses = sample("leaderboard_cache_lookups_total", result="miss")
+    invalidations = sample("leaderboard_cache_invalidations_total")
+
+    client.get("/providers/top")
+    client.get("/providers/top")
+    client.post("/claims/", json=sample_claim_data)
+
+    assert sample("leaderboard_cache_lookups_total", result="hit") == hits + 1
+    assert sample("leaderboard_cache_lookups_total", result="miss") == misses + 1
+    assert sample("leaderboard_cache_invalidations_total") == invalidations + 1
+    assert "leaderboard_cache_lookups_total" in client.get("/metrics").text
+
+
+def test_pool_checkout_wait_and_occupancy(tmp_path):
+    """Test that TimedQueuePool reports checkout waits, checked out connections and pool size."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=3,
+        max_overflow=0,
+    )
+    before = sample("db_pool_checkout_wait_seconds_count", engine="sync")
+    try:
+        with engine.connect():
+            assert sample("db_pool_checked_out", engine="sync") == 1
+            assert sample("db_pool_size", engine="sync") == 3
+        assert sample("db_pool_checked_out", engine="sync") == 0
+        assert sample("db_pool_checkout_wait_seconds_count", engine="sync") == before + 1
+    finally:
+        engine.dispose()
@@ -2,7 +2,7 @@
 Tests for money conversion utilities.
 """
 import pytest
-from app.services.money import dollars_to_cents
+from app.services.money import dollars_to_cents, dollars_to_cents_many
 
 
 def test_dollars_to_cents_basic():
@@ -43,3 +43,43 @@ def test_dollars_to_cents_single_decimal():
     assert dollars_to_cents("100.5") == 10050
     assert dollars_to_cents("50.1") == 5010
 
+
+def test_dollars_to_cents_signs_and_separators():
+    """Test signs on either side of the dollar sign and thousands separators."""
+    assert dollars_to_cents("-$1,234.50") == -123450
+    assert dollars_to_cents("$-5.00") == -500
+    assert dollars_to_cents("+ $ 3") == 300
+    assert dollars_to_cents("1,000,000") == 100000000
+    assert dollars_to_cents(".5") == 50
+
+
+@pytest.mark.parametrize("value", ["", "$", ".", "abc", "1,00", "1000,000", "--1", "-$-1", "1.2.34", "1e5", "²"])
+def test_dollars_to_cents_rejects_malformed(value):
+    """Test that malformed amounts raise ValueError."""
+    with pytest.raises(ValueError):
+        dollars_to_cents(value)
+
+
+def test_dollars_to_cents_extra_precision_policies():
+    """Test the explicit policies for digits past the cent."""
+    with pytest.raises(ValueError, match="fractional cents"):
+        dollars_to_cents("16.255")
+
+    assert dollars_to_cents("1.000") == 100  # trailing zeros are exact
+    assert dollars_to_cents("16.255", "half_up") == 1626
+    assert dollars_to_cents("-16.255", "half_up") == -1626
+    assert dollars_to_cents("16.255", "half_even") == 1626
+    assert dollars_to_cents("16.245", "half_even") == 1624
+    assert dollars_to_cents("16.2451", "half_even") == 1625
+    assert dollars_to_cents("16.259", "truncate") == 1625
+
+
+def test_dollars_to_cents_many_matches_scalar():
+    """Test the batch variant agrees with the scalar parser."""
+    values = ["$130.00", " 100.5 ", "-$1,234.56", "0.015", "7"]
+    assert dollars_to_cents_many(values, "half_up") == [
+        dollars_to_cents(value, "half_up") for value in values
+    ]
+
+    with pytest.raises(ValueError):
+        dollars_to_cents_many(["1.00", "oops"])
@@ -0,0 +1,76 @@
+"""
+Tests for the NumPy net fee engine.
+"""
+import random
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models.provider_aggregate import ProviderNetFeeAggregate
+from app.services.claim_service import ClaimService
+from app.services.net_fee_engine import (
+    net_fees_from_amounts,
+    sum_by_provider,
+    sum_by_provider_day,
+)
+
+
+def _random_rows(count: int) -> list[dict]:
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1, 9)
+    return [
+        {
+            "provider_npi": f"{rng.randrange(20):010d}",
+            "service_date": start + timedelta(days=rng.randrange(10), hours=rng.randrange(8)),
+            "net_fee_cents": rng.randrange(-50_000, 500_000),
+        }
+        for _ in range(count)
+    ]
+
+
+def test_net_fees_from_amounts():
+    """Test net_fee = provider_fees + coinsurance + copay - allowed_fees per line."""
+    amounts = [10000, 10000, 0, 0, 13000, 6500, 1625, 0, 0, 2500, 0, 100]
+    assert net_fees_from_amounts(amounts) == [0, 8125, -2400]
+
+
+def test_sums_match_python_engine(monkeypatch):
+    """Test the vectorized group sums match the per-row Python loops."""
+    rows = _random_rows(2000)
+
+    monkeypatch.setattr(settings, "net_fee_engine", "python")
+    expected_totals = ClaimService._sum_net_fees(rows)
+    expected_daily = ClaimService._sum_daily_net_fees(rows)
+
+    npis = [row["provider_npi"] for row in rows]
+    fees = [row["net_fee_cents"] for row in rows]
+    assert sum_by_provider(npis, fees) == expected_totals
+    assert sum_by_provider_day(npis, [row["service_date"].date() for row in rows], fees) == expected_daily
+
+    monkeypatch.setattr(settings, "net_fee_engine", "numpy")
+    monkeypatch.setattr(settings, "net_fee_numpy_min_lines", 1)
+    assert ClaimService._sum_net_fees(rows) == expected_totals
+    assert ClaimService._sum_daily_net_fees(rows) == expected_daily
+
+
+def test_sums_are_exact_for_large_values():
+    """Test int64 sums stay exact beyond float64 precision."""
+    big = 2 ** 53 + 1
+    assert sum_by_provider(["1", "1"], [big, 2]) == {"1": big + 2}
+    assert sum_by_provider_day(["1"], [date(2024, 1, 1)], [big]) == {("1", date(2024, 1, 1)): big}
+    assert sum_by_provider([], []) == {}
+
+
+def test_batch_with_numpy_engine(client: TestClient, test_session: Session, sample_claim_data, monkeypatch):
+    """Test batch ingest produces the same aggregates with the NumPy engine."""
+    monkeypatch.setattr(settings, "net_fee_engine", "numpy")
+    monkeypatch.setattr(settings, "net_fee_numpy_min_lines", 1)
+
+    claims = [dict(sample_claim_data, claim_reference=f"np-{i}") for i in range(3)]
+    response = client.post("/claims/batch", json={"claims": claims})
+    assert response.json()["processed"] == 3
+
+    aggregate = test_session.get(ProviderNetFeeAggregate, "1234567890")
+    assert aggregate.total_net_fee_cents == 3 * 8125
@@ -0,0 +1,172 @@
+"""
+Tests for the transactional outbox and its publisher worker.
+"""
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.cli import outbox_worker
+from app.core.config import Settings, settings
+from app.models.outbox_event import (
+    OUTBOX_FAILED,
+    OUTBOX_PENDING,
+    OUTBOX_PUBLISHED,
+    OutboxEvent,
+    utc_now,
+)
+from app.repositories.outbox_repo import OutboxRepository
+from app.services.payments_integration import (
+    InMemoryEventSink,
+    OutboxProcessor,
+    PaymentsPublisher,
+)
+
+
+@pytest.fixture(autouse=True)
+def outbox_enabled(monkeypatch):
+    """The outbox is off by default."""
+    monkeypatch.setattr(settings, "outbox_enabled", True)
+
+
+class FlakySink(InMemoryEventSink):
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    def publish(self, message: dict) -> None:
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("broker unavailable")
+        super().publish(message)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = utc_now()
+
+    def __call__(self):
+        return self.now
+
+
+def _processor(test_engine, sink, clock=None, max_attempts=3):
+    return OutboxProcessor(
+        session_factory=lambda: Session(test_engine),
+        publisher=PaymentsPublisher(sink),
+        batch_size=10,
+        max_attempts=max_attempts,
+        backoff_base_seconds=1.0,
+        backoff_max_seconds=60.0,
+        clock=clock or utc_now,
+    )
+
+
+def test_claim_writes_outbox_event(client: TestClient, test_session: Session, sample_claim_data):
+    """Test that a processed claim records a pending event in the same transaction."""
+    response = client.post("/claims/", json=sample_claim_data)
+    claim_id = response.json()["claim_id"]
+
+    events = list(test_session.exec(select(OutboxEvent)))
+    assert len(events) == 1
+    assert str(events[0].aggregate_id) == claim_id
+    assert events[0].status == OUTBOX_PENDING
+    assert events[0].payload == {
+        "claim_reference": "test_claim_001",
+        "net_fee_cents": 8125,
+        "provider_net_fee_cents": {"1234567890": 8125},
+    }
+
+
+def test_outbox_is_off_by_default(client: TestClient, test_session: Session, sample_claim_data, monkeypatch):
+    """Test that claims record no event unless the outbox is enabled, and the worker needs a sink."""
+    monkeypatch.setattr(settings, "outbox_enabled", Settings.model_fields["outbox_enabled"].default)
+    assert client.post("/claims/", json=sample_claim_data).status_code == 200
+    assert list(test_session.exec(select(OutboxEvent))) == []
+
+    monkeypatch.setattr(settings, "outbox_sink", None)
+    assert outbox_worker.main([]) == 2
+
+
+def test_claim_batch_takes_earliest_due_first(test_session: Session):
+    """Test that workers claim due events by next_attempt_at, then id, as the pending index is ordered."""
+    now = utc_now()
+    for minutes_ago in (1, 5, 3):
+        test_session.add(OutboxEvent(
+            event_type="claim.processed",
+            aggregate_id=uuid4(),
+            payload={},
+            next_attempt_at=now - timedelta(minutes=minutes_ago),
+        ))
+    test_session.add(OutboxEvent(
+        event_type="claim.processed",
+        aggregate_id=uuid4(),
+        payload={},
+        next_attempt_at=now + timedelta(minutes=1),
+    ))
+    test_session.commit()
+
+    events = OutboxRepository(test_session).claim_batch(10, now)
+    assert [event.id for event in events] == [2, 3, 1]
+
+
+def test_invalid_claim_writes_no_event(client: TestClient, test_session: Session, sample_claim_data):
+    """Test that a rolled back claim leaves no outbox event behind."""
+    sample_claim_data["lines"][0]["provider_npi"] = "bad"
+    assert client.post("/claims/", json=sample_claim_data).status_code == 400
+    assert list(test_session.exec(select(OutboxEvent))) == []
+
+
+def test_batch_writes_event_per_claim(client: TestClient, test_session: Session, sample_claim_data):
+    """Test that batch ingest records one event per accepted claim."""
+    client.post("/claims/batch", json={"claims": [sample_claim_data, sample_claim_data]})
+    assert len(list(test_session.exec(select(OutboxEvent)))) == 2
+
+
+def test_processor_publishes_and_marks_events(client: TestClient, test_engine, sample_claim_data):
+    """Test that the worker publishes pending events once."""
+    client.post("/claims/", json=sample_claim_data)
+    sink = InMemoryEventSink()
+    processor = _processor(test_engine, sink)
+
+    assert processor.process_batch() == 1
+    assert processor.process_batch() == 0
+
+    assert len(sink.messages) == 1
+    assert sink.messages[0]["event_type"] == "claim.processed"
+    assert sink.messages[0]["payload"]["net_fee_cents"] == 8125
+    with Session(test_engine) as session:
+        event = session.exec(select(OutboxEvent)).one()
+        assert event.status == OUTBOX_PUBLISHED
+        assert event.published_at is not None
+
+
+def test_processor_retries_with_backoff_then_fails(client: TestClient, test_engine, sample_claim_data):
+    """Test exponential backoff on publish failures and the FAILED terminal state."""
+    client.post("/claims/", json=sample_claim_data)
+    clock = FakeClock()
+    sink = FlakySink(failures=10)
+    processor = _processor(test_engine, sink, clock=clock, max_attempts=3)
+
+    assert processor.process_batch() == 1
+    # Not due again until the 1s backoff has elapsed
+    assert processor.process_batch() == 0
+
+    clock.now += timedelta(seconds=1)
+    assert processor.process_batch() == 1
+    clock.now += timedelta(seconds=2)
+    assert processor.process_batch() == 1
+
+    with Session(test_engine) as session:
+        event = session.exec(select(OutboxEvent)).one()
+        assert event.status == OUTBOX_FAILED
+        assert event.attempts == 3
+        assert "broker unavailable" in event.last_error
+    assert sink.messages == []
+
+
+def test_backoff_delay_is_capped():
+    """Test that backoff doubles per attempt up to the configured maximum."""
+    processor = _processor(None, InMemoryEventSink())
+    assert [processor.backoff_delay(n) for n in (1, 2, 3, 7, 8)] == [1, 2, 4, 60, 60]
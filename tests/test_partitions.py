@@ -0,0 +1,138 @@
+"""
+Tests for monthly claim_lines partition management.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+import app.db.init_db as init_db_module
+from app.core.config import settings
+from app.db.init_db import init_db
+from app.db.partitions import (
+    add_months,
+    create_partition_sql,
+    detach_claim_line_partitions,
+    ensure_claim_line_partitions,
+    partition_month,
+    partition_name,
+    partitioned_claim_lines_table,
+)
+
+
+class FakeConnection:
+    """Records statements; answers the partition listing query."""
+
+    def __init__(self, partitions, partitioned=True):
+        self.partitions = list(partitions)
+        self.partitioned = partitioned
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "pg_partitioned_table" in sql:
+            return [(1,)] if self.partitioned else []
+        if "pg_inherits" in sql:
+            return [(name,) for name in self.partitions]
+        self.statements.append(sql)
+        return []
+
+
+def test_partition_names_round_trip():
+    """Test that partition names map to and from their month."""
+    assert partition_name(date(2024, 3, 1)) == "claim_lines_p2024_03"
+    assert partition_month("claim_lines_p2024_03") == date(2024, 3, 1)
+    assert partition_month("claim_lines_default") is None
+
+
+def test_add_months_crosses_years():
+    """Test that month arithmetic wraps across year boundaries."""
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+
+
+def test_create_partition_sql_uses_month_bounds():
+    """Test that a partition covers its month up to the next month's start."""
+    sql = create_partition_sql(date(2024, 12, 1))
+
+    assert "claim_lines_p2024_12 PARTITION OF claim_lines" in sql
+    assert "FROM ('2024-12-01') TO ('2025-01-01')" in sql
+
+
+def test_partitioned_table_ddl():
+    """Test that the partitioned table keeps the model's columns with a composite key."""
+    ddl = str(CreateTable(partitioned_claim_lines_table()).compile(dialect=postgresql.dialect()))
+
+    assert "PRIMARY KEY (id, service_date)" in ddl
+    assert "PARTITION BY RANGE (service_date)" in ddl
+    assert "id SERIAL" in ddl
+    assert "REFERENCES claims (id)" in ddl
+
+
+def test_ensure_creates_only_missing_months():
+    """Test that ensure creates only the partitions missing from the range."""
+    conn = FakeConnection(["claim_lines_p2024_05", "claim_lines_default"])
+
+    created = ensure_claim_line_partitions(conn, 1, 2, today=date(2024, 5, 20))
+
+    assert created == [
+        "claim_lines_p2024_04",
+        "claim_lines_p2024_06",
+        "claim_lines_p2024_07",
+    ]
+    assert len(conn.statements) == 3
+
+
+def test_ensure_refuses_a_plain_table():
+    """Test that ensure creates nothing when claim_lines is not partitioned."""
+    conn = FakeConnection([], partitioned=False)
+
+    with pytest.raises(ValueError, match="not a partitioned table"):
+        ensure_claim_line_partitions(conn, 1, 2, today=date(2024, 5, 20))
+
+    assert conn.statements == []
+
+
+def test_init_db_keeps_an_existing_plain_table(test_engine, monkeypatch, caplog):
+    """Test that init_db warns instead of adding partitions to a plain claim_lines."""
+    # Stand-ins for the PostgreSQL catalogs, holding no partitioned tables
+    with test_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE pg_class (oid INTEGER, relname TEXT)"))
+        conn.execute(text("CREATE TABLE pg_partitioned_table (partrelid INTEGER)"))
+    monkeypatch.setattr(test_engine.dialect, "name", "postgresql")
+    monkeypatch.setattr(init_db_module, "engine", test_engine)
+    monkeypatch.setattr(settings, "claim_lines_partitioned", True)
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", record)
+    try:
+        init_db()
+    finally:
+        event.remove(test_engine, "before_cursor_execute", record)
+
+    assert "claim_lines is not partitioned" in caplog.text
+    assert not any("PARTITION OF" in sql for sql in statements)
+
+
+def test_detach_only_months_ending_before_cutoff():
+    """Test that detach keeps months ending after the cutoff."""
+    conn = FakeConnection([
+        "claim_lines_p2024_02",
+        "claim_lines_p2023_12",
+        "claim_lines_p2024_01",
+        "claim_lines_default",
+    ])
+
+    detached = detach_claim_line_partitions(conn, date(2024, 2, 1))
+
+    assert detached == ["claim_lines_p2023_12", "claim_lines_p2024_01"]
+    assert conn.statements == [
+        "ALTER TABLE claim_lines DETACH PARTITION claim_lines_p2023_12",
+        "ALTER TABLE claim_lines DETACH PARTITION claim_lines_p2024_01",
+    ]
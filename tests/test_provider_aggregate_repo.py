@@ -0,0 +1,176 @@
+"""
+Tests for the provider aggregate repository.
+"""
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, select
+
+from datetime import date
+
+from app.models.provider_aggregate import ProviderNetFeeAggregate
+from app.models.provider_aggregate_shard import ProviderNetFeeShard
+from app.models.provider_daily_aggregate import ProviderDailyNetFeeAggregate
+from app.repositories import provider_aggregate_repo
+from app.repositories.provider_aggregate_repo import ProviderAggregateRepository
+
+
+def test_increment_many_inserts_and_updates(test_session: Session):
+    """Test that increment_many creates missing rows and adds to existing ones."""
+    test_session.add(ProviderNetFeeAggregate(provider_npi="1111111111", total_net_fee_cents=100))
+    test_session.commit()
+
+    repo = ProviderAggregateRepository(test_session)
+    repo.increment_many({"2222222222": 50, "1111111111": 25})
+    test_session.commit()
+
+    assert test_session.get(ProviderNetFeeAggregate, "1111111111").total_net_fee_cents == 125
+    assert test_session.get(ProviderNetFeeAggregate, "2222222222").total_net_fee_cents == 50
+
+
+def test_increment_many_empty_is_noop(test_session: Session):
+    """Test that an empty delta map issues no writes."""
+    repo = ProviderAggregateRepository(test_session)
+    repo.increment_many({})
+    assert not test_session.new
+
+
+def test_increment_many_postgres_single_sorted_statement(test_session: Session, monkeypatch):
+    """Test that PostgreSQL gets one multi-VALUES upsert with rows in NPI order."""
+    statements = []
+    monkeypatch.setattr(test_session, "execute", lambda stmt: statements.append(stmt))
+
+    repo = ProviderAggregateRepository(test_session)
+    repo.is_postgres = True
+    repo.increment_many({"3333333333": 1, "1111111111": 2, "2222222222": 3})
+
+    assert len(statements) == 1
+    compiled = statements[0].compile(dialect=postgresql.dialect())
+    npis = [v for k, v in compiled.params.items() if k.startswith("provider_npi")]
+    assert npis == ["1111111111", "2222222222", "3333333333"]
+    assert "ON CONFLICT" in str(compiled)
+
+
+def test_increment_many_sqlite_upserts_in_chunks(test_session: Session, monkeypatch):
+    """Test that SQLite also upserts with INSERT ... ON CONFLICT, one statement per chunk of rows."""
+    monkeypatch.setattr(provider_aggregate_repo, "UPSERT_CHUNK_ROWS", 2)
+    test_session.add(ProviderNetFeeAggregate(provider_npi="1111111111", total_net_fee_cents=100))
+    test_session.commit()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_session.bind, "before_cursor_execute", record)
+    try:
+        ProviderAggregateRepository(test_session).increment_many(
+            {"1111111111": 1, "2222222222": 2, "3333333333": 3}
+        )
+        test_session.commit()
+    finally:
+        event.remove(test_session.bind, "before_cursor_execute", record)
+
+    assert len(statements) == 2
+    assert all("ON CONFLICT" in statement for statement in statements)
+    totals = dict(test_session.exec(select(
+        ProviderNetFeeAggregate.provider_npi, ProviderNetFeeAggregate.total_net_fee_cents
+    )).all())
+    assert totals == {"1111111111": 101, "2222222222": 2, "3333333333": 3}
+
+
+def test_get_top_cursor_seeks_ranking_index(test_session: Session):
+    """Test that a keyset page searches the ranking index from the cursor instead of scanning it."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(test_session.bind, "before_cursor_execute", record)
+    try:
+        ProviderAggregateRepository(test_session).get_top(10, after_total=500, after_npi="1111111111")
+    finally:
+        event.remove(test_session.bind, "before_cursor_execute", record)
+
+    statement, parameters = statements[-1]
+    plan = test_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    assert "SEARCH provider_net_fee_aggregate USING COVERING INDEX ix_provider_net_fee_aggregate_ranking" in plan[0][-1]
+
+
+def test_increment_daily_many(test_session: Session):
+    """Test that daily buckets are keyed by provider and service day."""
+    repo = ProviderAggregateRepository(test_session)
+    repo.increment_daily_many({("1111111111", date(2024, 1, 1)): 10})
+    test_session.commit()
+    repo.increment_daily_many({
+        ("1111111111", date(2024, 1, 1)): 5,
+        ("1111111111", date(2024, 1, 2)): 7,
+    })
+    test_session.commit()
+
+    assert test_session.get(ProviderDailyNetFeeAggregate, ("1111111111", date(2024, 1, 1), 0)).total_net_fee_cents == 15
+    assert test_session.get(ProviderDailyNetFeeAggregate, ("1111111111", date(2024, 1, 2), 0)).total_net_fee_cents == 7
+
+
+def test_sharded_increments_spread_and_fold(test_session: Session):
+    """Test that sharded writes avoid the aggregate row and compaction folds them back."""
+    test_session.add(ProviderNetFeeAggregate(provider_npi="1111111111", total_net_fee_cents=100))
+    test_session.commit()
+
+    for shard in range(3):
+        repo = ProviderAggregateRepository(test_session, shard_count=4)
+        repo.shard = shard
+        repo.increment_many({"1111111111": 10, "2222222222": 1})
+        test_session.commit()
+
+    shards = list(test_session.exec(select(ProviderNetFeeShard)))
+    assert len(shards) == 6
+    assert test_session.get(ProviderNetFeeAggregate, "1111111111").total_net_fee_cents == 100
+
+    repo = ProviderAggregateRepository(test_session, shard_count=4)
+    assert repo.get_top(10) == [("1111111111", 130), ("2222222222", 3)]
+    assert repo.get_top(10, after_total=130, after_npi="1111111111") == [("2222222222", 3)]
+
+    assert repo.fold_shards() == 2
+    test_session.commit()
+
+    assert list(test_session.exec(select(ProviderNetFeeShard))) == []
+    assert test_session.get(ProviderNetFeeAggregate, "1111111111").total_net_fee_cents == 130
+    assert test_session.get(ProviderNetFeeAggregate, "2222222222").total_net_fee_cents == 3
+    assert repo.get_top(10) == [("1111111111", 130), ("2222222222", 3)]
+
+
+def test_sharded_get_top_pages_match_exact_totals(test_session: Session):
+    """Test that sharded rankings, page by page, equal aggregate plus shard totals."""
+    for i in range(20):
+        test_session.add(ProviderNetFeeAggregate(provider_npi=f"{i:010d}", total_net_fee_cents=100 * (i % 7)))
+    test_session.commit()
+    # Shard rows lift low ranked providers, tie others, and add new ones
+    shard_deltas = {"0000000000": 900, "0000000003": 300, "0000000007": 500, "0000000099": 250}
+    for shard in range(2):
+        repo = ProviderAggregateRepository(test_session, shard_count=4)
+        repo.shard = shard
+        repo.increment_many({npi: delta // 2 for npi, delta in shard_deltas.items()})
+        test_session.commit()
+
+    expected = {f"{i:010d}": 100 * (i % 7) for i in range(20)}
+    for npi, delta in shard_deltas.items():
+        expected[npi] = expected.get(npi, 0) + delta
+    ranking = sorted(expected.items(), key=lambda row: (-row[1], row[0]))
+
+    repo = ProviderAggregateRepository(test_session, shard_count=4)
+    pages = [repo.get_top(4)]
+    while len(pages[-1]) == 4:
+        total_cents, npi = pages[-1][-1][1], pages[-1][-1][0]
+        pages.append(repo.get_top(4, after_total=total_cents, after_npi=npi))
+    assert [row for page in pages for row in page] == ranking
+
+
+def test_sharded_daily_buckets_sum_in_window(test_session: Session):
+    """Test that windowed rankings sum daily shard rows."""
+    for shard in range(2):
+        repo = ProviderAggregateRepository(test_session, shard_count=2)
+        repo.shard = shard
+        repo.increment_daily_many({("1111111111", date(2024, 1, 1)): 5})
+        test_session.commit()
+
+    repo = ProviderAggregateRepository(test_session)
+    assert repo.get_top_in_window(10, date(2024, 1, 1), date(2024, 1, 1)) == [("1111111111", 10)]
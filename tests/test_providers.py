@@ -184,3 +184,141 @@ def test_top_providers_integration_with_claims(client: TestClient, test_session:
     assert data[1]["provider_npi"] == "1111111111"
     assert data[1]["total_net_fee_cents"] == 5000
 
+
+def _seed_ranking(test_session: Session, count: int):
+    """Create `count` providers, with pairs of equal totals to exercise tie-breaking."""
+    for i in range(count):
+        test_session.add(ProviderNetFeeAggregate(
+            provider_npi=f"{i:010d}",
+            total_net_fee_cents=100000 - (i // 2) * 1000,
+        ))
+    test_session.commit()
+
+
+def test_top_providers_custom_limit(client: TestClient, test_session: Session):
+    """Test that limit controls the page size beyond the default 10."""
+    _seed_ranking(test_session, 150)
+
+    response = client.get("/providers/top", params={"limit": 120})
+    assert response.status_code == 200
+    assert len(response.json()) == 120
+
+    response = client.get("/providers/top", params={"limit": 3})
+    assert [p["provider_npi"] for p in response.json()] == ["0000000000", "0000000001", "0000000002"]
+
+
+def test_top_providers_keyset_pagination(client: TestClient, test_session: Session):
+    """Test that following the cursor walks the full ranking without gaps or repeats."""
+    _seed_ranking(test_session, 25)
+
+    seen = []
+    params = {"limit": 4}
+    while True:
+        page = client.get("/providers/top", params=params).json()
+        if not page:
+            break
+        seen.extend(page)
+        params = {
+            "limit": 4,
+            "after_total": page[-1]["total_net_fee_cents"],
+            "after_npi": page[-1]["provider_npi"],
+        }
+
+    assert [p["provider_npi"] for p in seen] == [f"{i:010d}" for i in range(25)]
+
+
+def test_top_providers_invalid_paging_params(client: TestClient):
+    """Test that partial cursors and out-of-range limits are rejected."""
+    assert client.get("/providers/top", params={"after_total": 100}).status_code == 422
+    assert client.get("/providers/top", params={"limit": 0}).status_code == 422
+    assert client.get("/providers/top", params={"limit": 100000}).status_code == 422
+
+
+def _windowed_claim(reference: str, npi: str, service_date: str, provider_fees: str):
+    return {
+        "claim_reference": reference,
+        "lines": [
+            {
+                "service_date": service_date,
+                "submitted_procedure": "D0180",
+                "plan_group": "GRP-1000",
+                "subscriber_id": "1234567890",
+                "provider_npi": npi,
+                "provider_fees": provider_fees,
+                "allowed_fees": "0.00",
+                "member_coinsurance": "0.00",
+                "member_copay": "0.00",
+            }
+        ],
+    }
+
+
+def test_top_providers_time_window(client: TestClient):
+    """Test that from/to rank providers only by net fees inside the window."""
+    claims = [
+        _windowed_claim("jan", "1111111111", "2024-01-10T09:00:00", "500.00"),
+        _windowed_claim("feb-1", "2222222222", "2024-02-03T09:00:00", "100.00"),
+        _windowed_claim("feb-2", "1111111111", "2024-02-20T09:00:00", "40.00"),
+        _windowed_claim("feb-3", "2222222222", "2024-02-29T23:00:00", "10.00"),
+    ]
+    response = client.post("/claims/batch", json={"claims": claims})
+    assert response.json()["processed"] == 4
+
+    # All-time: provider 1 leads on the January claim
+    data = client.get("/providers/top").json()
+    assert data[0] == {"provider_npi": "1111111111", "total_net_fee_cents": 54000}
+
+    # February only: provider 2 leads
+    data = client.get("/providers/top", params={"from": "2024-02-01", "to": "2024-02-29"}).json()
+    assert data == [
+        {"provider_npi": "2222222222", "total_net_fee_cents": 11000},
+        {"provider_npi": "1111111111", "total_net_fee_cents": 4000},
+    ]
+
+    # Open-ended window with a keyset cursor
+    data = client.get("/providers/top", params={
+        "from": "2024-02-01", "after_total": 11000, "after_npi": "2222222222",
+    }).json()
+    assert data == [{"provider_npi": "1111111111", "total_net_fee_cents": 4000}]
+
+    assert client.get("/providers/top", params={"to": "2023-12-31"}).json() == []
+
+
+def test_top_providers_invalid_window(client: TestClient):
+    """Test that an inverted window is rejected."""
+    response = client.get("/providers/top", params={"from": "2024-02-01", "to": "2024-01-01"})
+    assert response.status_code == 422
+
+
+def test_provider_lines_paging_and_window(client: TestClient):
+    """Test listing a provider's lines newest first with keyset pages."""
+    claims = [
+        _windowed_claim("jan", "1111111111", "2024-01-10T09:00:00", "540.00"),
+        _windowed_claim("feb-1", "1111111111", "2024-02-05T09:00:00", "40.00"),
+        _windowed_claim("feb-2", "1111111111", "2024-02-05T09:00:00", "30.00"),
+        _windowed_claim("other", "2222222222", "2024-02-06T09:00:00", "10.00"),
+    ]
+    response = client.post("/claims/batch", json={"claims": claims})
+    assert response.json()["processed"] == 4
+
+    first = client.get("/providers/1111111111/lines", params={"limit": 2}).json()
+    assert [line["net_fee_cents"] for line in first] == [3000, 4000]
+
+    last = first[-1]
+    rest = client.get("/providers/1111111111/lines", params={
+        "limit": 2, "after_service_date": last["service_date"], "after_id": last["id"],
+    }).json()
+    assert [line["net_fee_cents"] for line in rest] == [54000]
+
+    january = client.get("/providers/1111111111/lines", params={
+        "from": "2024-01-01", "to": "2024-01-31",
+    }).json()
+    assert [line["net_fee_cents"] for line in january] == [54000]
+
+    assert client.get("/providers/3333333333/lines").json() == []
+
+
+def test_provider_lines_partial_cursor(client: TestClient):
+    """Test that after_service_date and after_id must be given together."""
+    response = client.get("/providers/1111111111/lines", params={"after_id": 5})
+    assert response.status_code == 422
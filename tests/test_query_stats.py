@@ -0,0 +1,120 @@
+"""
+Tests for per-request statement tracking and the route statement budgets.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db import query_stats
+from app.db.query_stats import track_queries
+from app.schemas.claim import ClaimCreateRequest
+from app.services.claim_service import ClaimService
+
+# Statements per request, whatever the number of lines or providers:
+# claim, lines, aggregate upsert, daily aggregate upsert, outbox event
+STATEMENT_BUDGETS = {
+    ("POST", "/claims/"): 5,
+    ("GET", "/providers/top"): 1,
+    ("GET", "/claims/{claim_id}"): 2,
+}
+
+
+@pytest.fixture(autouse=True)
+def query_stats_enabled(monkeypatch, test_engine):
+    """Tracks the test engine, as QUERY_STATS_ENABLED does for every engine at startup."""
+    monkeypatch.setattr(settings, "query_stats_enabled", True)
+    # Budgets include the outbox event
+    monkeypatch.setattr(settings, "outbox_enabled", True)
+    query_stats.instrument(test_engine)
+    yield
+    query_stats.uninstrument(test_engine)
+
+
+def make_claim(sample_claim_data, lines: int, reference: str) -> dict:
+    template = sample_claim_data["lines"][0]
+    return {
+        "claim_reference": reference,
+        "lines": [
+            {
+                **template,
+                "provider_npi": f"{i:010d}",
+                "service_date": f"2024-01-{1 + i % 28:02d}T10:00:00",
+            }
+            for i in range(lines)
+        ],
+    }
+
+
+def statements(response) -> int:
+    assert response.status_code == 200, response.text
+    return int(response.headers["X-DB-Statements"])
+
+
+@pytest.mark.parametrize("lines", [1, 10, 100])
+def test_post_claim_statement_budget(client: TestClient, sample_claim_data, lines):
+    """Test that POST /claims stays within its statement budget for any line count."""
+    response = client.post("/claims/", json=make_claim(sample_claim_data, lines, f"budget_{lines}"))
+    assert statements(response) <= STATEMENT_BUDGETS[("POST", "/claims/")]
+    assert float(response.headers["X-DB-Time-Ms"]) > 0
+    assert int(response.headers["X-DB-Rows"]) >= 1 + lines
+
+
+def test_post_claim_statements_do_not_grow_with_lines(client: TestClient, sample_claim_data):
+    """Test that a claim's statement count does not depend on its number of lines."""
+    # Second claim per size, so the aggregate upserts hit existing rows
+    counts = []
+    for lines in (1, 50):
+        client.post("/claims/", json=make_claim(sample_claim_data, lines, f"first_{lines}"))
+        counts.append(statements(
+            client.post("/claims/", json=make_claim(sample_claim_data, lines, f"second_{lines}"))
+        ))
+    assert counts[0] == counts[1]
+
+
+def test_read_statement_budgets(client: TestClient, sample_claim_data):
+    """Test that the leaderboard and claim reads stay within their statement budgets."""
+    claim_id = client.post("/claims/", json=sample_claim_data).json()["claim_id"]
+
+    assert statements(client.get("/providers/top")) <= STATEMENT_BUDGETS[("GET", "/providers/top")]
+    assert statements(client.get(f"/claims/{claim_id}")) <= STATEMENT_BUDGETS[("GET", "/claims/{claim_id}")]
+
+
+def test_headers_are_off_by_default(client: TestClient, monkeypatch):
+    """Test that no X-DB headers are sent unless query stats are enabled."""
+    monkeypatch.setattr(settings, "query_stats_enabled", False)
+    response = client.get("/providers/top")
+    assert "X-DB-Statements" not in response.headers
+
+
+def test_process_claim_statements_within_budget(test_session, sample_claim_data):
+    """Test that process_claim stays within budget and repeats no statement."""
+    service = ClaimService(test_session)
+    for lines in (1, 100):
+        with track_queries() as stats:
+            with test_session.begin():
+                payload = make_claim(sample_claim_data, lines, f"service_{lines}")
+                service.process_claim(ClaimCreateRequest.model_validate(payload).model_dump())
+        assert stats.statements <= STATEMENT_BUDGETS[("POST", "/claims/")]
+        assert stats.repeated(threshold=2) == []
+
+
+def test_repeated_statements_are_reported(test_engine):
+    """Test that statements run at least the threshold number of times are reported."""
+    with track_queries() as stats:
+        with test_engine.connect() as conn:
+            for i in range(12):
+                conn.execute(text("SELECT :i"), {"i": i})
+            conn.execute(text("SELECT 1"))
+
+    assert stats.statements == 13
+    assert stats.repeated(threshold=10) == [("SELECT ?", 12)]
+
+
+def test_statements_outside_tracking_are_not_counted(test_engine):
+    """Test that statements after track_queries exits are not counted."""
+    with track_queries() as stats:
+        pass
+    with test_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert stats.statements == 0
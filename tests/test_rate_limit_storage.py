@@ -0,0 +1,208 @@
+"""
+Tests for the shared "database://" rate limit storage.
+
+Two DatabaseStorage instances on one SQLite file stand in for two
+workers sharing the application database.
+"""
+import pytest
+from limits import RateLimitItemPerMinute, parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+from sqlalchemy import event, select
+
+from app.core.rate_limit_storage import COUNTERS, PURGE_INTERVAL_SECONDS, DatabaseStorage
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_040.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def make_storage(test_engine, clock):
+    storages = []
+
+    def make(sync_interval: float = 0.0) -> DatabaseStorage:
+        storage = DatabaseStorage(engine=test_engine, sync_interval=sync_interval, clock=clock)
+        storages.append(storage)
+        return storage
+
+    yield make
+    for storage in storages:
+        storage.close()
+
+
+@pytest.fixture
+def statements(test_engine):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(test_engine, "before_cursor_execute", record)
+
+
+def test_registered_as_database_scheme(test_engine):
+    """Test that database:// resolves to DatabaseStorage."""
+    storage = storage_from_string("database://", engine=test_engine)
+    assert isinstance(storage, DatabaseStorage)
+    assert storage.check()
+
+
+def test_limit_is_shared_between_workers(make_storage):
+    """Test that hits from two storages count against one limit."""
+    item = RateLimitItemPerMinute(5)
+    first = FixedWindowRateLimiter(make_storage())
+    second = FixedWindowRateLimiter(make_storage())
+
+    assert [first.hit(item, "client") for _ in range(3)] == [True] * 3
+    assert [second.hit(item, "client") for _ in range(2)] == [True] * 2
+    assert not first.hit(item, "client")
+    assert not second.hit(item, "client")
+    # Other clients have their own budget
+    assert second.hit(item, "other")
+
+
+def test_window_restarts_after_expiry(make_storage, clock):
+    """Test that an expired window starts again from zero."""
+    item = RateLimitItemPerMinute(2)
+    limiter = FixedWindowRateLimiter(make_storage())
+    assert limiter.hit(item, "client") and limiter.hit(item, "client")
+    assert not limiter.hit(item, "client")
+
+    clock.now += 60
+    assert limiter.hit(item, "client")
+    assert limiter.get_window_stats(item, "client").remaining == 1
+
+
+def test_hits_are_counted_locally_and_flushed_in_one_statement(
+    make_storage, clock, statements
+):
+    """Test that hits stay in process until a flush writes them in one statement."""
+    item = RateLimitItemPerMinute(100)
+    storage = make_storage(sync_interval=10.0)
+    limiter = FixedWindowRateLimiter(storage)
+
+    # First hit per key syncs inline, the rest stay in process
+    for key in ("a", "b", "c"):
+        limiter.hit(item, key)
+    synced = len(statements)
+    for _ in range(20):
+        for key in ("a", "b", "c"):
+            assert limiter.hit(item, key)
+    assert len(statements) == synced
+
+    assert storage.flush() == 3
+    assert len(statements) == synced + 1
+    assert storage.flush() == 0
+
+    other = make_storage()
+    assert other.get(item.key_for("a")) == 21
+
+
+def test_other_workers_hits_are_seen_after_sync_interval(make_storage, clock):
+    """Test that another storage's hits become visible once the local view is stale."""
+    item = RateLimitItemPerMinute(10)
+    first = make_storage(sync_interval=1.0)
+    second = make_storage(sync_interval=1.0)
+    first_limiter = FixedWindowRateLimiter(first)
+
+    for _ in range(5):
+        FixedWindowRateLimiter(second).hit(item, "client")
+    second.flush()
+
+    # `first` synced when it saw the key, then decides locally
+    assert first_limiter.hit(item, "client")
+    assert first.get(item.key_for("client")) == 6
+
+    for _ in range(3):
+        FixedWindowRateLimiter(second).hit(item, "client")
+    second.flush()
+    assert first.get(item.key_for("client")) == 6
+
+    clock.now += 1.0
+    assert first.get(item.key_for("client")) == 9
+
+
+def test_failed_flush_keeps_hits_pending(make_storage, test_engine, clock):
+    """Test that hits from a failed flush are retried by the next one."""
+    item = RateLimitItemPerMinute(10)
+    storage = make_storage(sync_interval=10.0)
+    limiter = FixedWindowRateLimiter(storage)
+    for _ in range(4):
+        limiter.hit(item, "client")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    upsert = storage._upsert
+    storage._upsert = fail
+    with pytest.raises(RuntimeError):
+        storage.flush()
+    storage._upsert = upsert
+
+    assert storage.get(item.key_for("client")) == 4
+    assert storage.flush() == 1
+    assert make_storage().get(item.key_for("client")) == 4
+
+
+def test_sliding_window_counter(make_storage, clock):
+    """Test that the sliding window counter weighs the previous window."""
+    item = parse("2/minute")
+    storage = make_storage()
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    clock.now = 1_700_000_040.0  # start of a 60s window
+
+    assert limiter.hit(item, "client") and limiter.hit(item, "client")
+    assert not limiter.hit(item, "client")
+
+    # Half way into the next window the previous one still weighs 50%
+    clock.now += 90
+    assert limiter.hit(item, "client")
+    assert not limiter.hit(item, "client")
+
+    clock.now += 120
+    assert limiter.hit(item, "client") and limiter.hit(item, "client")
+
+
+def test_reset_and_clear(make_storage):
+    """Test that clear drops one key and reset drops them all."""
+    item = RateLimitItemPerMinute(1)
+    storage = make_storage()
+    limiter = FixedWindowRateLimiter(storage)
+    limiter.hit(item, "a")
+    limiter.hit(item, "b")
+
+    storage.clear(item.key_for("a"))
+    assert limiter.hit(item, "a")
+    assert not limiter.hit(item, "b")
+
+    assert storage.reset() == 2
+    assert limiter.hit(item, "b")
+
+
+def test_write_through_mode_purges_expired_windows(make_storage, test_engine, clock):
+    """Test that without a flusher, incr drops expired windows and rows every purge interval."""
+    item = RateLimitItemPerMinute(10)
+    storage = make_storage()
+    limiter = FixedWindowRateLimiter(storage)
+    for key in ("a", "b", "c"):
+        limiter.hit(item, key)
+    assert len(storage.windows) == 3
+
+    clock.now += PURGE_INTERVAL_SECONDS
+    limiter.hit(item, "d")
+
+    assert list(storage.windows) == [item.key_for("d")]
+    with test_engine.connect() as conn:
+        assert conn.execute(select(COUNTERS.c.key)).scalars().all() == [item.key_for("d")]
@@ -4,6 +4,7 @@ Tests for rate limiting functionality.
 import pytest
 from fastapi.testclient import TestClient
 from time import sleep
+from app.core.config import settings
 from app.core.rate_limiter import limiter
 
 
@@ -63,3 +64,17 @@ def test_rate_limiting_error_message(client: TestClient):
             assert "rate limit" in response.json()["detail"].lower()
             break
 
+
+def test_ingest_budget_is_separate_from_read_budget(client: TestClient, sample_claim_data, monkeypatch):
+    """Test that with an ingest budget set, claim submissions are limited on their own."""
+    monkeypatch.setattr(settings, "rate_limit_ingest_per_minute", 3)
+
+    statuses = [
+        client.post("/claims/", json={**sample_claim_data, "claim_reference": f"ingest_{i}"}).status_code
+        for i in range(4)
+    ]
+    assert statuses == [200, 200, 200, 429]
+    assert client.post("/claims/batch", json={"claims": [sample_claim_data]}).status_code == 200
+
+    # Reads still have their full budget
+    assert all(client.get("/providers/top").status_code == 200 for _ in range(10))
@@ -0,0 +1,57 @@
+"""
+Tests for per-worker connection pool sizing.
+"""
+import pytest
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.session import connect_args, pool_options
+
+
+def test_default_pool_without_budget(monkeypatch):
+    """Test that without a budget the configured pool size and overflow apply."""
+    monkeypatch.setattr(settings, "database_connection_budget", None)
+    monkeypatch.setattr(settings, "database_pool_size", 7)
+    monkeypatch.setattr(settings, "database_max_overflow", 3)
+    assert pool_options() == {"pool_size": 7, "max_overflow": 3}
+
+
+def test_budget_is_split_across_workers_and_engines(monkeypatch):
+    """Test that the budget is divided by workers and engines with no overflow."""
+    monkeypatch.setattr(settings, "database_connection_budget", 80)
+    monkeypatch.setattr(settings, "web_workers", 6)
+    assert pool_options() == {"pool_size": 13, "max_overflow": 0}
+    assert pool_options(engines=2) == {"pool_size": 6, "max_overflow": 0}
+
+
+def test_zero_workers_means_one_per_core(monkeypatch):
+    """Test that zero workers sizes the pool for one worker per core."""
+    monkeypatch.setattr(settings, "database_connection_budget", 64)
+    monkeypatch.setattr(settings, "web_workers", 0)
+    monkeypatch.setattr("os.cpu_count", lambda: 16)
+    assert pool_options()["pool_size"] == 4
+
+
+def test_budget_smaller_than_worker_count_is_rejected(monkeypatch):
+    """Test that a budget below one connection per worker raises ValueError."""
+    monkeypatch.setattr(settings, "database_connection_budget", 3)
+    monkeypatch.setattr(settings, "web_workers", 4)
+    with pytest.raises(ValueError, match="too small"):
+        pool_options()
+
+
+def test_null_pool_for_pgbouncer(monkeypatch):
+    """Test that the null pool setting ignores the budget and uses NullPool."""
+    monkeypatch.setattr(settings, "database_pool", "null")
+    monkeypatch.setattr(settings, "database_connection_budget", 80)
+    assert pool_options() == {"poolclass": NullPool}
+
+
+def test_prepared_statements_can_be_disabled(monkeypatch):
+    """Test that disabling prepared statements only affects PostgreSQL URLs."""
+    url = "postgresql+psycopg://postgres:postgres@db:5432/claims"
+    assert connect_args(url) == {}
+
+    monkeypatch.setattr(settings, "database_prepared_statements", False)
+    assert connect_args(url) == {"prepare_threshold": None}
+    assert connect_args("sqlite:///claims.db") == {}
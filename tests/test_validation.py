@@ -4,6 +4,15 @@ Tests for data validation rules.
 import pytest
 from fastapi.testclient import TestClient
 
+from app.services.validation import (
+    DigitsRule,
+    LineValidationError,
+    PrefixRule,
+    RegexRule,
+    RequiredFieldRule,
+    RuleRegistry,
+)
+
 
 def test_validation_submitted_procedure_must_start_with_d(client: TestClient):
     """Test that submitted_procedure must start with 'D'."""
@@ -176,3 +185,71 @@ def test_validation_quadrant_is_optional(client: TestClient):
     response = client.post("/claims/", json=claim_data)
     assert response.status_code == 200
 
+
+def test_validation_reports_all_errors_with_line_indexes(client: TestClient):
+    """Test that every invalid field of every line is reported at once."""
+    line = {
+        "service_date": "2024-01-15T10:00:00",
+        "submitted_procedure": "D0180",
+        "plan_group": "GRP-1000",
+        "subscriber_id": "1234567890",
+        "provider_npi": "1234567890",
+        "provider_fees": "100.00",
+        "allowed_fees": "100.00",
+        "member_coinsurance": "0.00",
+        "member_copay": "0.00",
+    }
+    claim_data = {
+        "claim_reference": "test_validation",
+        "lines": [
+            dict(line, submitted_procedure="C1234", provider_npi="12345"),
+            line,
+            dict(line, allowed_fees="abc"),
+        ],
+    }
+
+    response = client.post("/claims/", json=claim_data)
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        "lines[0]: submitted_procedure must start with 'D'; "
+        "lines[0]: provider_npi must be a 10 digit number; "
+        "lines[2]: allowed_fees: invalid money amount: 'abc'"
+    )
+
+
+def test_rule_registry_compiles_and_collects():
+    """Test that registered rules run in order and stop per field at the first failure."""
+    registry = RuleRegistry()
+    registry.register("npi", RequiredFieldRule("npi"), DigitsRule(10, "npi must be 10 digits"))
+    registry.register("code", PrefixRule("D", "code must start with 'D'"))
+
+    lines = [
+        {"npi": "1234567890", "code": "D0120"},
+        {"npi": "", "code": "X"},
+        {"code": "D0120"},
+    ]
+    assert registry.collect_errors(lines) == [
+        (1, "npi cannot be empty"),
+        (1, "code must start with 'D'"),
+        (2, "npi is required"),
+    ]
+
+    with pytest.raises(LineValidationError) as exc_info:
+        registry.validate_lines(lines)
+    assert len(exc_info.value.errors) == 3
+
+
+def test_compiled_rules_match_regex_rules():
+    """Test the regex-free rules agree with their regex equivalents."""
+    npi_regex = RegexRule(r"^\d{10}$", "bad").compile()
+    npi_digits = DigitsRule(10, "bad").compile()
+    for value in ["1234567890", "123456789", "123456789a", "", None]:
+        assert npi_regex(value) == npi_digits(value)
+    # Stricter than \d: non-ASCII digits and a trailing newline are rejected
+    assert npi_digits("１２３４５６７８９０") == "bad"
+    assert npi_digits("1234567890\n") == "bad"
+
+    procedure_regex = RegexRule(r"^D.*", "bad").compile()
+    procedure_prefix = PrefixRule("D", "bad").compile()
+    for value in ["D0120", "d0120", "C1234", "", None]:
+        assert procedure_regex(value) == procedure_prefix(value)